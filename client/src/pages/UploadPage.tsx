@@ -11,6 +11,7 @@ const UploadPage = () => {
   const [file, setFile] = useState<File | null>(null);
   const [uploading, setUploading] = useState(false);
   const [status, setStatus] = useState<'idle' | 'success'>('idle');
+  const [progress, setProgress] = useState<{ pages_parsed: number; vectors_upserted: number; chunks_created: number } | null>(null);
 
   const handleProcess = async () => {
     if (!file || !token || !orgId) return;
@@ -31,13 +32,31 @@ const UploadPage = () => {
       if (!response.ok) throw new Error('Upload failed');
 
       const data = await response.json();
-      console.log('Upload success:', data);
+      console.log('Upload queued:', data);
+
+      // Ingestion runs in the background; poll the job until it finishes
+      while (true) {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const jobResponse = await fetch(`${API_URL}/documents/${orgId}/jobs/${data.job_id}`, {
+          headers: {
+            'Authorization': `Bearer ${token}`
+          }
+        });
+        if (!jobResponse.ok) throw new Error('Failed to fetch ingestion status');
+
+        const job = await jobResponse.json();
+        setProgress(job.progress);
+        if (job.status === 'failed') throw new Error(job.error || 'Ingestion failed');
+        if (job.status === 'completed') break;
+      }
+
       setStatus('success');
     } catch (error) {
       console.error('Upload error:', error);
       alert('Failed to upload. Make sure backend is running on http://localhost:8000');
     } finally {
       setUploading(false);
+      setProgress(null);
     }
   };
 
@@ -72,7 +91,11 @@ const UploadPage = () => {
         {file && status === 'idle' && (
           <button onClick={handleProcess} disabled={uploading} className="w-full max-w-xl mt-8 bg-indigo-600 text-white py-5 rounded-3xl font-bold text-lg shadow-xl shadow-indigo-600/20 hover:bg-indigo-700 transition-all flex items-center justify-center gap-3 disabled:opacity-50">
             {uploading ? <Loader2 className="animate-spin" /> : <Database size={20} />}
-            {uploading ? 'Processing & Indexing Chunks...' : 'Ingest to RuleBook'}
+            {uploading
+              ? progress
+                ? `Indexing Chunks... ${progress.vectors_upserted}/${progress.chunks_created || '?'} (${progress.pages_parsed} pages)`
+                : 'Processing & Indexing Chunks...'
+              : 'Ingest to RuleBook'}
           </button>
         )}
 
@@ -5,11 +5,13 @@ from .firebase_auth import (
     remove_admin_claim,
     get_user_by_email
 )
+from .membership import membership_cache
 
 __all__ = [
     "verify_firebase_token",
     "verify_admin",
     "set_admin_claim",
     "remove_admin_claim",
-    "get_user_by_email"
+    "get_user_by_email",
+    "membership_cache"
 ]
@@ -1,9 +1,19 @@
 import os
+import sys
+import asyncio
 import firebase_admin
 from firebase_admin import credentials, auth
 from fastapi import HTTPException, Header
 from typing import Optional
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import SIGNING_KEY_REFRESH_INTERVAL
+
+from .token_cache import token_cache
+
+# Google's published signing certificates for Firebase ID tokens
+ID_TOKEN_CERT_URI = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
 # Initialize Firebase Admin SDK
 cred_path = os.path.join(
     os.path.dirname(os.path.dirname(__file__)),
@@ -36,10 +46,12 @@ async def verify_firebase_token(authorization: str = Header(None)) -> dict:
         
         token = authorization.split("Bearer ")[1]
         
-        # Verify the token
-        decoded_token = auth.verify_id_token(token)
+        # Verify the token (cached until exp; misses verify off the event loop)
+        decoded_token = await token_cache.verify(token, auth.verify_id_token)
         return decoded_token
     
+    except HTTPException:
+        raise
     except auth.InvalidIdTokenError:
         raise HTTPException(
             status_code=401,
@@ -57,6 +69,51 @@ async def verify_firebase_token(authorization: str = Header(None)) -> dict:
         )
 
 
+class SigningKeyPrefetchUnsupported(RuntimeError):
+    """The installed firebase-admin no longer exposes the token verifier's HTTP session."""
+
+
+def _token_verifier_request():
+    """
+    The cache-control request the SDK's token verifier fetches certificates with.
+
+    firebase-admin has no public API for it, so this reaches into SDK internals;
+    requirements.txt pins firebase-admin to the versions this was checked against.
+    """
+    try:
+        return auth._get_client(None)._token_verifier.request
+    except AttributeError as e:
+        raise SigningKeyPrefetchUnsupported(
+            f"firebase-admin internals changed ({e}); signing key prefetch disabled"
+        ) from e
+
+
+def prefetch_signing_keys():
+    """
+    Warm the SDK's HTTP cache of Google's ID-token signing certificates so the
+    first verification after startup (or after the certs rotate) doesn't fetch them.
+    """
+    # Uses the SDK's own cache-control session, so verify_id_token() reuses the response
+    request = _token_verifier_request()
+    response = request(ID_TOKEN_CERT_URI, method="GET")
+    if response.status != 200:
+        raise RuntimeError(f"Signing key fetch returned HTTP {response.status}")
+
+
+async def refresh_signing_keys_periodically(interval: float = SIGNING_KEY_REFRESH_INTERVAL):
+    """Background task: keep the signing certificates warm."""
+    while True:
+        try:
+            await asyncio.to_thread(prefetch_signing_keys)
+        except SigningKeyPrefetchUnsupported as e:
+            # Verification still works, it just fetches the certs on demand again
+            print(f"✗ {e}")
+            return
+        except Exception as e:
+            print(f"✗ Signing key prefetch failed: {e}")
+        await asyncio.sleep(interval)
+
+
 async def verify_admin(authorization: str = Header(None)) -> dict:
     """
     Verify user is an admin by checking custom claims
@@ -0,0 +1,95 @@
+"""
+In-process cache of organization memberships.
+
+Resolving (uid, org_id) -> role used to cost a `users` lookup plus a linear scan
+of `org_roles` on every request. The user document is now cached per uid for
+MEMBERSHIP_CACHE_TTL seconds together with a dict index of org_id -> role, and
+routes that change a user's roles call invalidate(uid).
+"""
+from typing import Optional, Tuple
+import asyncio
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import MEMBERSHIP_CACHE_TTL
+
+from ..db.mongodb import get_users_collection
+
+
+class MembershipCache:
+    """TTL cache of user documents with an org_id -> role index, keyed by uid."""
+
+    def __init__(self, ttl_seconds: float = MEMBERSHIP_CACHE_TTL):
+        self.ttl_seconds = ttl_seconds
+        # uid -> (expires_at, user_doc, {org_id: role})
+        self._entries = {}
+        # uid -> in-flight load, so concurrent misses share one Mongo round trip
+        self._loading = {}
+        # uid -> invalidation count, so a load started before invalidate() is not cached
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _load(self, uid: str):
+        generation = self._generations.get(uid, 0)
+        users_collection = await get_users_collection()
+        user = await users_collection.find_one({"uid": uid})
+        if not user:
+            # Not cached: the user may be registered by /auth/verify at any moment
+            return None
+
+        roles = {r["org_id"]: r["role"] for r in user.get("org_roles", [])}
+        entry = (time.monotonic() + self.ttl_seconds, user, roles)
+        if self._generations.get(uid, 0) == generation:
+            self._entries[uid] = entry
+        return entry
+
+    async def _entry(self, uid: str):
+        entry = self._entries.get(uid)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        task = self._loading.get(uid)
+        if task is None:
+            task = asyncio.ensure_future(self._load(uid))
+            self._loading[uid] = task
+            task.add_done_callback(lambda done: self._loading.pop(uid, None) if self._loading.get(uid) is done else None)
+        return await asyncio.shield(task)
+
+    async def get_user(self, uid: str) -> Optional[dict]:
+        entry = await self._entry(uid)
+        return entry[1] if entry else None
+
+    async def get_role(self, uid: str, org_id: str) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Returns: (user_doc, role_in_org). user_doc is None if the user is not
+        registered; role is None if they are not a member of the org.
+        """
+        entry = await self._entry(uid)
+        if entry is None:
+            return None, None
+        _, user, roles = entry
+        return user, roles.get(org_id)
+
+    def invalidate(self, uid: str):
+        """Drop the cached memberships for a user after their org_roles change."""
+        self._entries.pop(uid, None)
+        self._loading.pop(uid, None)
+        self._generations[uid] = self._generations.get(uid, 0) + 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+membership_cache = MembershipCache()
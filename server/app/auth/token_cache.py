@@ -0,0 +1,84 @@
+"""
+Cache of verified Firebase ID tokens.
+
+A token's signature and claims only need checking once: the decoded claims are
+kept (keyed by a SHA-256 of the token, never the token itself) until the
+token's `exp`. Verification on a miss runs in a worker thread so RSA checks and
+occasional certificate fetches don't block the event loop.
+"""
+from collections import OrderedDict
+from typing import Callable, Optional
+import asyncio
+import hashlib
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import TOKEN_CACHE_SIZE
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """LRU of decoded token claims, each honored until the token's exp."""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        # key -> (exp, claims)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        key = _token_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        exp, claims = entry
+        if exp <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: dict):
+        exp = claims.get("exp")
+        if not exp:
+            return
+        key = _token_key(token)
+        self._entries[key] = (float(exp), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def verify(self, token: str, verify: Callable[[str], dict]) -> dict:
+        """
+        Return the claims for `token`, calling the blocking `verify` in a thread on
+        a miss. Errors from `verify` propagate and nothing is cached.
+        """
+        claims = self.get(token)
+        if claims is not None:
+            self.hits += 1
+            return dict(claims)
+
+        self.misses += 1
+        claims = await asyncio.to_thread(verify, token)
+        self.put(token, claims)
+        return dict(claims)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+token_cache = VerifiedTokenCache()
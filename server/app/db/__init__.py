@@ -4,8 +4,18 @@ from .mongodb import (
     get_users_collection,
     get_documents_collection,
     get_queries_collection,
-    get_analytics_collection
+    get_analytics_collection,
+    get_jobs_collection,
+    get_embedding_cache_collection,
+    get_corpus_versions_collection,
+    get_chunks_collection,
+    get_rollups_collection
 )
+from .analytics import analytics_counters
+from .query_log import query_log
+from .rollups import query_rollups
+from .lookups import find_by_ids
+from .indexes import ensure_indexes, check_access_paths, bootstrap_indexes
 
 __all__ = [
     "get_database",
@@ -13,5 +23,17 @@ __all__ = [
     "get_users_collection",
     "get_documents_collection",
     "get_queries_collection",
-    "get_analytics_collection"
+    "get_analytics_collection",
+    "get_jobs_collection",
+    "get_embedding_cache_collection",
+    "get_corpus_versions_collection",
+    "get_chunks_collection",
+    "get_rollups_collection",
+    "analytics_counters",
+    "query_log",
+    "query_rollups",
+    "find_by_ids",
+    "ensure_indexes",
+    "check_access_paths",
+    "bootstrap_indexes"
 ]
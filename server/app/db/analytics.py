@@ -0,0 +1,256 @@
+"""
+Incremental query analytics.
+
+Dashboards used to rescan the queries collection on every load (a $group over
+all questions, a regex + Counter pass over the last 1000). Instead, every
+batch the query log writes is folded into counters in the `analytics`
+collection, and dashboards read the top entries straight off an index.
+
+One document per (scope, kind, key):
+    kind "summary"   key ""        total / answered / unanswered, last_asked
+    kind "question"  key question  count, last_asked
+    kind "term"      key word      count
+where scope is the org_id, plus ALL_ORGS for the admin-wide view. A batch is
+aggregated in memory first and applied with one unordered bulk_write of $inc
+upserts, so counting costs one round trip per query-log flush.
+
+Existing history is counted once by `backfill()`, in the background after
+startup. The worker that claims the "backfill" marker scans the queries
+logged before the claim, saving its position per batch; a backfill
+interrupted by a crash or shutdown is resumed (by any worker, once the
+holder's heartbeat is BACKFILL_STALE_SECONDS old) until the marker gets its
+completed_at. Claiming relies on the unique scope/kind/key index, so the
+backfill refuses to run without it.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import uuid
+import re
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from .mongodb import get_analytics_collection, get_queries_collection
+
+ALL_ORGS = "_all"
+
+_WORD_RE = re.compile(r"\b[a-z]+\b")
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'should', 'could', 'may', 'might', 'must', 'can', 'i', 'you', 'we',
+    'they', 'what', 'when', 'where', 'why', 'how', 'which', 'who'
+})
+
+BACKFILL_BATCH_SIZE = 1000
+BACKFILL_STALE_SECONDS = 300
+BACKFILL_MARKER = {"scope": ALL_ORGS, "kind": "backfill", "key": ""}
+UNIQUE_KEY = [("scope", 1), ("kind", 1), ("key", 1)]
+
+
+def question_terms(question: str) -> List[str]:
+    """Word-cloud terms of a question: lowercase alphabetic words, no stop words, longer than 3 letters."""
+    return [w for w in _WORD_RE.findall(question.lower()) if w not in STOP_WORDS and len(w) > 3]
+
+
+class AnalyticsCounters:
+    """Per-org question, term and answer-rate counters, updated per query-log batch."""
+
+    def __init__(self, get_collection=get_analytics_collection):
+        self._get_collection = get_collection
+        self._owner = uuid.uuid4().hex
+        self._backfill_task: Optional[asyncio.Task] = None
+        self.updates = 0
+        self.failed_updates = 0
+
+    @staticmethod
+    def _operations(entries: List[dict]) -> List[UpdateOne]:
+        """Fold a batch of query log entries into one $inc upsert per counter."""
+        increments: Dict[Tuple[str, str, str], Counter] = defaultdict(Counter)
+        last_asked: Dict[Tuple[str, str, str], object] = {}
+
+        def add(key, field, amount=1, timestamp=None):
+            increments[key][field] += amount
+            if timestamp is not None and (key not in last_asked or timestamp > last_asked[key]):
+                last_asked[key] = timestamp
+
+        for entry in entries:
+            question = (entry.get("question") or "").strip()
+            timestamp = entry.get("timestamp")
+            answered = entry.get("has_answer", True)
+            scopes = [ALL_ORGS] + ([entry["org_id"]] if entry.get("org_id") else [])
+            terms = Counter(question_terms(question))
+            for scope in scopes:
+                summary = (scope, "summary", "")
+                add(summary, "total", timestamp=timestamp)
+                add(summary, "answered" if answered else "unanswered")
+                if question:
+                    add((scope, "question", question), "count", timestamp=timestamp)
+                for term, count in terms.items():
+                    add((scope, "term", term), "count", count)
+
+        operations = []
+        for (scope, kind, key), fields in increments.items():
+            update = {"$inc": dict(fields)}
+            if (scope, kind, key) in last_asked:
+                update["$max"] = {"last_asked": last_asked[(scope, kind, key)]}
+            operations.append(UpdateOne({"scope": scope, "kind": kind, "key": key}, update, upsert=True))
+        return operations
+
+    async def _apply(self, entries: List[dict]):
+        operations = self._operations(entries)
+        if not operations:
+            return
+        collection = await self._get_collection()
+        await collection.bulk_write(operations, ordered=False)
+        self.updates += len(operations)
+
+    async def record(self, entries: List[dict]):
+        """Count a batch of written query log entries. Failures are reported, not raised."""
+        try:
+            await self._apply(entries)
+        except Exception as e:
+            # Counters are advisory; losing a batch must not affect query logging
+            self.failed_updates += len(entries)
+            print(f"✗ Analytics update failed ({len(entries)} entries): {e}")
+
+    async def summary(self, scope: str = ALL_ORGS) -> dict:
+        collection = await self._get_collection()
+        doc = await collection.find_one({"scope": scope, "kind": "summary", "key": ""}) or {}
+        total = doc.get("total", 0)
+        return {
+            "total_queries": total,
+            "answered": doc.get("answered", 0),
+            "unanswered": doc.get("unanswered", 0),
+            "unanswered_rate": doc.get("unanswered", 0) / total if total else 0.0,
+            "last_asked": doc.get("last_asked")
+        }
+
+    async def top(self, kind: str, limit: int, scope: str = ALL_ORGS) -> List[dict]:
+        """Most frequent questions or terms of a scope (served by the scope_kind_count index)."""
+        collection = await self._get_collection()
+        cursor = collection.find(
+            {"scope": scope, "kind": kind},
+            {"_id": 0, "key": 1, "count": 1, "last_asked": 1}
+        ).sort("count", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def _has_unique_index(self, collection) -> bool:
+        async for info in collection.list_indexes():
+            if list(info["key"].items()) == UNIQUE_KEY and info.get("unique"):
+                return True
+        return False
+
+    async def _claim_backfill(self, collection) -> Optional[dict]:
+        """Claim the backfill marker (new, or abandoned by a dead worker); None if done or held elsewhere."""
+        now = datetime.utcnow()
+        try:
+            return await collection.find_one_and_update(
+                {
+                    **BACKFILL_MARKER,
+                    "completed_at": None,
+                    "$or": [{"owner": self._owner}, {"heartbeat": {"$lt": now - timedelta(seconds=BACKFILL_STALE_SECONDS)}}]
+                },
+                {"$set": {"owner": self._owner, "heartbeat": now}, "$setOnInsert": {"started_at": now, "counted": 0}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The marker exists: completed, or another worker is still on it
+            return None
+
+    async def backfill(self) -> Optional[int]:
+        """
+        Count the queries logged before the marker's started_at, resuming after
+        its last_id. Returns the entries counted, or None if there was nothing to do.
+        """
+        collection = await self._get_collection()
+        if not await self._has_unique_index(collection):
+            # Without it every worker could claim the marker and counts would double
+            raise RuntimeError("analytics index scope_kind_key_unique is missing; not backfilling")
+        marker = await self._claim_backfill(collection)
+        if marker is None:
+            return None
+
+        queries_collection = await get_queries_collection()
+        query = {"timestamp": {"$lte": marker["started_at"]}}
+        if marker.get("last_id") is not None:
+            query["_id"] = {"$gt": marker["last_id"]}
+        # Entries logged after started_at are counted as they are written
+        cursor = queries_collection.find(
+            query,
+            {"org_id": 1, "question": 1, "has_answer": 1, "timestamp": 1}
+        ).sort("_id", 1)
+
+        counted = marker.get("counted", 0)
+        batch = []
+
+        async def flush():
+            nonlocal counted, batch
+            await self._apply(batch)
+            counted += len(batch)
+            # A crash between the two writes recounts at most this one batch
+            result = await collection.update_one(
+                {**BACKFILL_MARKER, "owner": self._owner},
+                {"$set": {"last_id": batch[-1]["_id"], "counted": counted, "heartbeat": datetime.utcnow()}}
+            )
+            if result.modified_count == 0:
+                raise RuntimeError("analytics backfill lease lost to another worker")
+            batch = []
+
+        async for entry in cursor:
+            batch.append(entry)
+            if len(batch) >= BACKFILL_BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+
+        await collection.update_one(
+            {**BACKFILL_MARKER, "owner": self._owner},
+            {"$set": {"completed_at": datetime.utcnow(), "counted": counted}}
+        )
+        return counted
+
+    async def _run_backfill(self):
+        while True:
+            try:
+                counted = await self.backfill()
+                if counted is not None:
+                    print(f"✓ Analytics counters built from {counted} logged queries")
+                collection = await self._get_collection()
+                marker = await collection.find_one(BACKFILL_MARKER)
+                if marker and marker.get("completed_at"):
+                    return
+            except Exception as e:
+                print(f"✗ Analytics backfill failed: {e}")
+            # Held by another worker, or failed: retry once a dead holder's claim goes stale
+            await asyncio.sleep(BACKFILL_STALE_SECONDS)
+
+    def start_backfill(self):
+        """Backfill in the background so startup doesn't wait on a scan of the query history."""
+        if self._backfill_task is None:
+            self._backfill_task = asyncio.create_task(self._run_backfill())
+
+    async def stop(self):
+        if self._backfill_task is None:
+            return
+        # Progress is saved per batch; the next start resumes from last_id
+        self._backfill_task.cancel()
+        try:
+            await self._backfill_task
+        except asyncio.CancelledError:
+            pass
+        self._backfill_task = None
+
+    def stats(self) -> dict:
+        return {
+            "counter_updates": self.updates,
+            "failed_updates": self.failed_updates
+        }
+
+
+analytics_counters = AnalyticsCounters()
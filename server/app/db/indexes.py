@@ -0,0 +1,166 @@
+"""
+MongoDB index bootstrap and access-path check.
+
+`ensure_indexes()` runs at startup: it creates the indexes the routes rely on
+(idempotent when they already exist) and verifies each one is present
+afterwards. A unique index that cannot be built because existing data has
+duplicates is created non-unique instead, so lookups are still indexed, and
+the duplicates are reported.
+
+Raw query logs expire after QUERY_RETENTION_DAYS through a TTL index on
+timestamp; changing the setting updates the existing index in place.
+
+`check_access_paths()` explains each hot route query with the query planner
+and reports any whose winning plan still scans the whole collection.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import sys
+import os
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import QUERY_RETENTION_DAYS
+
+from .mongodb import get_database
+
+DUPLICATE_KEY = 11000
+
+# collection -> indexes the routes need
+INDEXES: Dict[str, List[IndexModel]] = {
+    # Every authenticated request resolves the Firebase uid to a user
+    "users": [IndexModel([("uid", ASCENDING)], name="uid_unique", unique=True)],
+    # Join-by-code
+    "organizations": [IndexModel([("code", ASCENDING)], name="code_unique", unique=True)],
+    # One record per org document; also serves list by org_id
+    "documents": [IndexModel([("org_id", ASCENDING), ("filename", ASCENDING)], name="org_filename_unique", unique=True)],
+    # Recent-queries views, globally and per org
+    "queries": [
+        # Also the retention TTL; a single-field index serves both sort directions
+        IndexModel([("timestamp", ASCENDING)], name="timestamp_ttl", expireAfterSeconds=QUERY_RETENTION_DAYS * 86400)
+        if QUERY_RETENTION_DAYS > 0 else IndexModel([("timestamp", DESCENDING)], name="timestamp_desc"),
+        IndexModel([("org_id", ASCENDING), ("timestamp", DESCENDING)], name="org_timestamp_desc")
+    ],
+    # Resuming interrupted jobs at startup
+    "ingest_jobs": [IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at")],
+    # Chunk registry and lexical index loads (same spec ChunkRegistry creates lazily)
+    "chunks": [IndexModel([("org_id", ASCENDING), ("document_name", ASCENDING)])],
+    # Incremental analytics: counter upserts, top questions/terms per scope
+    "analytics": [
+        IndexModel([("scope", ASCENDING), ("kind", ASCENDING), ("key", ASCENDING)], name="scope_kind_key_unique", unique=True),
+        IndexModel([("scope", ASCENDING), ("kind", ASCENDING), ("count", DESCENDING)], name="scope_kind_count")
+    ],
+    # Rollup upserts and range reads; hourly buckets expire
+    "query_rollups": [
+        IndexModel([("scope", ASCENDING), ("granularity", ASCENDING), ("start", ASCENDING)], name="scope_granularity_start_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+    ],
+    # Shared query-embedding cache expiry (same spec SharedEmbeddingStore creates lazily)
+    "embedding_cache": [IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)]
+}
+
+# (collection, description, find command fields) for the queries on hot paths
+HOT_QUERIES = [
+    ("users", "user by uid (auth, membership)", {"filter": {"uid": "probe"}}),
+    ("organizations", "organization by join code", {"filter": {"code": "PROBE"}}),
+    ("documents", "document by org + filename", {"filter": {"org_id": "probe", "filename": "probe.pdf"}}),
+    ("documents", "documents of an org", {"filter": {"org_id": "probe"}}),
+    ("queries", "recent queries", {"filter": {}, "sort": {"timestamp": -1}, "limit": 50}),
+    ("queries", "recent queries of an org", {"filter": {"org_id": "probe"}, "sort": {"timestamp": -1}, "limit": 50}),
+    ("ingest_jobs", "jobs to resume", {"filter": {"status": {"$in": ["queued", "running"]}}, "sort": {"created_at": 1}}),
+    ("chunks", "registered chunks of a document", {"filter": {"org_id": "probe", "document_name": "probe.pdf"}}),
+    ("analytics", "top questions/terms", {"filter": {"scope": "probe", "kind": "term"}, "sort": {"count": -1}, "limit": 50}),
+    ("queries", "rollup of one hour", {"filter": {"timestamp": {"$gte": datetime(2000, 1, 1), "$lt": datetime(2000, 1, 1, 1)}}}),
+    ("query_rollups", "rollups of a range", {"filter": {"scope": "probe", "granularity": "day", "start": {"$gte": datetime(2000, 1, 1)}}, "sort": {"start": 1}}),
+    ("chunks", "lexical index load", {"filter": {"org_id": "probe", "text": {"$exists": True}}})
+]
+
+
+async def _create(collection, model: IndexModel) -> Optional[str]:
+    """Create one index; returns a problem description, or None."""
+    spec = model.document
+    try:
+        await collection.create_indexes([model])
+        return None
+    except (DuplicateKeyError, OperationFailure) as e:
+        if not spec.get("unique") or getattr(e, "code", None) != DUPLICATE_KEY:
+            return f"{spec['name']}: {e}"
+
+    # Existing duplicates block the unique index; index the key anyway
+    fallback = IndexModel(list(spec["key"].items()), name=f"{spec['name']}_nonunique")
+    await collection.create_indexes([fallback])
+    return f"{spec['name']}: duplicate keys in existing data, created {fallback.document['name']} instead"
+
+
+async def ensure_indexes() -> List[str]:
+    """Create and verify INDEXES. Returns the problems found (empty when all is well)."""
+    db = await get_database()
+    problems = []
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = {tuple(info["key"].items()): info async for info in collection.list_indexes()}
+        for model in models:
+            spec = model.document
+            current = existing.get(tuple(spec["key"].items()))
+            if current is not None and current.get("unique", False) == spec.get("unique", False):
+                # Already there, possibly under another name; apply a changed TTL in place
+                if "expireAfterSeconds" in spec and current.get("expireAfterSeconds") != spec["expireAfterSeconds"]:
+                    try:
+                        await db.command("collMod", collection_name, index={
+                            "keyPattern": spec["key"], "expireAfterSeconds": spec["expireAfterSeconds"]
+                        })
+                    except Exception as e:
+                        problems.append(f"{collection_name}.{current['name']}: could not update TTL: {e}")
+                continue
+            problem = await _create(collection, model)
+            if problem:
+                problems.append(f"{collection_name}.{problem}")
+
+        existing = {tuple(info["key"].items()) async for info in collection.list_indexes()}
+        for model in models:
+            key = tuple(model.document["key"].items())
+            if key not in existing:
+                problems.append(f"{collection_name}: index on {dict(key)} missing after bootstrap")
+    return problems
+
+
+def _stages(plan: dict):
+    """All stage names in a query-planner plan tree."""
+    yield plan.get("stage")
+    for child in ("inputStage", "queryPlan"):
+        if child in plan:
+            yield from _stages(plan[child])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+async def check_access_paths() -> List[str]:
+    """Explain HOT_QUERIES; returns descriptions of those that run as a collection scan."""
+    db = await get_database()
+    unindexed = []
+    for collection_name, description, command in HOT_QUERIES:
+        result = await db.command("explain", {"find": collection_name, **command}, verbosity="queryPlanner")
+        winning_plan = result["queryPlanner"]["winningPlan"]
+        stages = set(_stages(winning_plan))
+        if "COLLSCAN" in stages or ("SORT" in stages and "sort" in command):
+            unindexed.append(f"{collection_name}: {description} ({' <- '.join(s for s in _stages(winning_plan) if s)})")
+    return unindexed
+
+
+async def bootstrap_indexes():
+    """Startup hook: ensure indexes, then report hot queries still lacking an index."""
+    problems = await ensure_indexes()
+    for problem in problems:
+        print(f"✗ Index: {problem}")
+    if not problems:
+        print(f"✓ MongoDB indexes verified ({sum(len(models) for models in INDEXES.values())})")
+
+    try:
+        unindexed = await check_access_paths()
+    except Exception as e:
+        print(f"✗ Could not explain hot queries: {e}")
+        return
+    for query in unindexed:
+        print(f"✗ Unindexed query: {query}")
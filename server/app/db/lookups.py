@@ -0,0 +1,42 @@
+"""
+Batched reference lookups.
+
+Routes that expand a list of references (org ids in a user's org_roles,
+member uids of an org) fetch them with one `$in` query and join in memory,
+instead of one `find_one` round trip per reference.
+"""
+from typing import Any, Dict, Iterable, Optional
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+
+async def find_by_ids(
+    collection,
+    ids: Iterable[Any],
+    field: str = "_id",
+    projection: Optional[dict] = None
+) -> Dict[str, dict]:
+    """
+    Fetch the documents whose `field` is in `ids` with a single query.
+
+    Returns {str(value): document}; ids with no matching document are simply
+    absent. For `_id`, string ids are converted to ObjectId and malformed ones
+    are skipped (find_one would have raised on those).
+    """
+    values = []
+    seen = set()
+    for value in ids:
+        if field == "_id" and isinstance(value, str):
+            try:
+                value = ObjectId(value)
+            except InvalidId:
+                continue
+        if value not in seen:
+            seen.add(value)
+            values.append(value)
+    if not values:
+        return {}
+
+    cursor = collection.find({field: {"$in": values}}, projection)
+    return {str(doc[field]): doc async for doc in cursor}
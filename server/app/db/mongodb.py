@@ -70,3 +70,33 @@ async def get_organizations_collection():
     """Get organizations collection"""
     db = await get_database()
     return db["organizations"]
+
+
+async def get_jobs_collection():
+    """Get ingestion jobs collection"""
+    db = await get_database()
+    return db["ingest_jobs"]
+
+
+async def get_embedding_cache_collection():
+    """Get shared query-embedding cache collection"""
+    db = await get_database()
+    return db["embedding_cache"]
+
+
+async def get_corpus_versions_collection():
+    """Get per-organization corpus version counters (bumped on document changes)"""
+    db = await get_database()
+    return db["corpus_versions"]
+
+
+async def get_chunks_collection():
+    """Get per-organization chunk registry (one entry per vector in the index)"""
+    db = await get_database()
+    return db["chunks"]
+
+
+async def get_rollups_collection():
+    """Get hourly/daily query analytics buckets"""
+    db = await get_database()
+    return db["query_rollups"]
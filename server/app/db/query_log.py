@@ -0,0 +1,180 @@
+"""
+Write-behind buffer for chat query logs.
+
+Chat endpoints hand their log entry to `query_log.log()` and return without
+waiting on MongoDB. A background task writes the buffer with one unordered
+`insert_many` whenever QUERY_LOG_BATCH_SIZE entries are pending or
+QUERY_LOG_FLUSH_INTERVAL seconds have passed, and `stop()` (called from
+shutdown_event) flushes whatever is left.
+
+Backpressure: at most QUERY_LOG_MAX_PENDING entries are held. When the buffer
+is full (e.g. MongoDB is down), `log()` waits up to
+QUERY_LOG_BACKPRESSURE_TIMEOUT for room and then drops the entry, so memory
+stays bounded and chats are never blocked for long. Failed batches go back to
+the front of the buffer and are retried on the next flush (insert_many sets
+each entry's _id, so a retry never writes an entry twice).
+
+Written batches are passed to `on_written` (the analytics counters for the
+`query_log` singleton), so counting rides on the same batching.
+"""
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import sys
+import os
+
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    QUERY_LOG_BATCH_SIZE,
+    QUERY_LOG_FLUSH_INTERVAL,
+    QUERY_LOG_MAX_PENDING,
+    QUERY_LOG_BACKPRESSURE_TIMEOUT
+)
+
+from .mongodb import get_queries_collection
+from .analytics import analytics_counters
+
+DUPLICATE_KEY = 11000
+
+
+class QueryLogBuffer:
+    """Batches query log inserts off the request path."""
+
+    def __init__(
+        self,
+        batch_size: int = QUERY_LOG_BATCH_SIZE,
+        flush_interval: float = QUERY_LOG_FLUSH_INTERVAL,
+        max_pending: int = QUERY_LOG_MAX_PENDING,
+        backpressure_timeout: float = QUERY_LOG_BACKPRESSURE_TIMEOUT,
+        get_collection: Callable[[], Awaitable] = get_queries_collection,
+        on_written: Optional[Callable[[List[dict]], Awaitable]] = None
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.backpressure_timeout = backpressure_timeout
+        self._get_collection = get_collection
+        self._on_written = on_written
+        self._pending = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._space_available: Optional[asyncio.Condition] = None
+        self._stopping = False
+        self.logged = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    async def start(self):
+        if self._task:
+            return
+        self._stopping = False
+        self._flush_requested = asyncio.Event()
+        self._space_available = asyncio.Condition()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered."""
+        if not self._task:
+            return
+        # Not cancelled: a batch being written must not be lost mid-insert
+        self._stopping = True
+        self._flush_requested.set()
+        await self._task
+        self._task = None
+        while self._pending:
+            if not await self._flush():
+                print(f"✗ Dropped {len(self._pending)} query log(s) at shutdown")
+                self.dropped += len(self._pending)
+                self._pending.clear()
+
+    async def log(self, entry: dict):
+        """Buffer one query log entry; waits briefly (then drops it) if the buffer is full."""
+        if self._task is None:
+            # Not started (scripts, tests): write through
+            collection = await self._get_collection()
+            await collection.insert_one(entry)
+            if self._on_written:
+                await self._on_written([entry])
+            return
+
+        if len(self._pending) >= self.max_pending:
+            try:
+                async with self._space_available:
+                    await asyncio.wait_for(
+                        self._space_available.wait_for(lambda: len(self._pending) < self.max_pending),
+                        timeout=self.backpressure_timeout
+                    )
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                return
+
+        self._pending.append(entry)
+        self.logged += 1
+        if len(self._pending) >= self.batch_size:
+            self._flush_requested.set()
+
+    async def _flush(self) -> bool:
+        """Write up to one batch; on failure the batch is put back at the front."""
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        if not batch:
+            return True
+        try:
+            collection = await self._get_collection()
+            await collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # The rest of the batch was written. Duplicate keys are entries already
+            # written by an earlier attempt; any other per-document error would fail every retry
+            rejected = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY]
+            if rejected:
+                print(f"✗ Query log rejected {len(rejected)} entries: {rejected[0].get('errmsg')}")
+            self.dropped += len(rejected)
+            self.written += len(batch) - len(rejected)
+            self.batches += 1
+            rejected_indexes = {error["index"] for error in rejected}
+            written = [entry for i, entry in enumerate(batch) if i not in rejected_indexes]
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"✗ Query log flush failed ({len(batch)} entries): {e}")
+            self._pending.extendleft(reversed(batch))
+            return False
+        else:
+            written = batch
+            self.written += len(batch)
+            self.batches += 1
+        finally:
+            async with self._space_available:
+                self._space_available.notify_all()
+
+        if self._on_written and written:
+            await self._on_written(written)
+        return True
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            # Write what is buffered now; entries arriving meanwhile wait for the next
+            # trigger so batches stay large. After a failed write, wait for the next interval
+            remaining = len(self._pending)
+            while remaining > 0 and await self._flush():
+                remaining -= self.batch_size
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "logged": self.logged,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches
+        }
+
+
+query_log = QueryLogBuffer(on_written=analytics_counters.record)
@@ -0,0 +1,299 @@
+"""
+Hourly and daily query analytics rollups.
+
+Raw query logs expire after QUERY_RETENTION_DAYS (TTL index, see indexes.py),
+so long-range analytics read compact buckets instead. Every
+QUERY_ROLLUP_INTERVAL seconds a background task rolls the raw queries of each
+hour since the watermark into one `query_rollups` document per (scope, hour),
+then re-merges the daily buckets of the days it touched:
+
+    {scope, granularity: "hour" | "day", start,
+     count, answered, unanswered, unanswered_rate, cache_hits,
+     latency_histogram, latency_ms: {p50, p95, p99}, top_terms}
+
+scope is the org_id, plus ALL_ORGS for the admin-wide view. Latencies are
+kept as a log-spaced histogram (bins QUERY_LATENCY_BIN_RATIO wide, so
+percentiles are within ~5%) so daily buckets and arbitrary ranges can merge
+hourly ones exactly. Top terms merge approximately: a term outside an hour's
+top QUERY_ROLLUP_TOP_TERMS is not carried into its day.
+
+Buckets are recomputed from scratch ($set, not $inc), so re-running an hour is
+harmless. The current hour is refreshed on every run; the watermark only moves
+past hours that ended more than QUERY_ROLLUP_GRACE seconds ago, so entries
+still in the query log buffer are not missed. A lease keeps one worker rolling
+up at a time. Hourly buckets expire after HOURLY_ROLLUP_RETENTION_DAYS; daily
+buckets are kept.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import asyncio
+import math
+import uuid
+import sys
+import os
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    QUERY_ROLLUP_INTERVAL,
+    QUERY_ROLLUP_GRACE,
+    QUERY_ROLLUP_TOP_TERMS,
+    HOURLY_ROLLUP_RETENTION_DAYS
+)
+
+from .mongodb import get_queries_collection, get_rollups_collection
+from .analytics import ALL_ORGS, question_terms
+
+QUERY_LATENCY_BIN_RATIO = 1.1
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+
+def _latency_bin(latency_ms: float) -> int:
+    return max(0, math.ceil(math.log(max(latency_ms, 1.0), QUERY_LATENCY_BIN_RATIO)))
+
+
+def latency_percentiles(histogram: Dict[str, int], percentiles=(50, 95, 99)) -> Dict[str, Optional[float]]:
+    """Percentiles (geometric bin midpoint, in ms) of a latency histogram."""
+    total = sum(histogram.values())
+    result = {f"p{p}": None for p in percentiles}
+    if not total:
+        return result
+    bins = sorted((int(b), n) for b, n in histogram.items())
+    for p in percentiles:
+        rank = math.ceil(total * p / 100)
+        seen = 0
+        for b, n in bins:
+            seen += n
+            if seen >= rank:
+                result[f"p{p}"] = round(QUERY_LATENCY_BIN_RATIO ** (b - 0.5), 1)
+                break
+    return result
+
+
+class RollupBucket:
+    """Counts for one scope over one time range; built from raw entries or merged from other buckets."""
+
+    def __init__(self):
+        self.count = 0
+        self.answered = 0
+        self.unanswered = 0
+        self.cache_hits = 0
+        self.latency_histogram = Counter()
+        self.terms = Counter()
+
+    def add_entry(self, entry: dict):
+        self.count += 1
+        if entry.get("has_answer", True):
+            self.answered += 1
+        else:
+            self.unanswered += 1
+        if entry.get("cache_hit"):
+            self.cache_hits += 1
+        if entry.get("latency_ms") is not None:
+            self.latency_histogram[str(_latency_bin(entry["latency_ms"]))] += 1
+        self.terms.update(question_terms(entry.get("question") or ""))
+
+    def merge(self, doc: dict):
+        self.count += doc.get("count", 0)
+        self.answered += doc.get("answered", 0)
+        self.unanswered += doc.get("unanswered", 0)
+        self.cache_hits += doc.get("cache_hits", 0)
+        self.latency_histogram.update(doc.get("latency_histogram", {}))
+        self.terms.update({t["term"]: t["count"] for t in doc.get("top_terms", [])})
+
+    def document(self, top_terms: int = QUERY_ROLLUP_TOP_TERMS) -> dict:
+        return {
+            "count": self.count,
+            "answered": self.answered,
+            "unanswered": self.unanswered,
+            "unanswered_rate": self.unanswered / self.count if self.count else 0.0,
+            "cache_hits": self.cache_hits,
+            "latency_histogram": dict(self.latency_histogram),
+            "latency_ms": latency_percentiles(self.latency_histogram),
+            "top_terms": [{"term": t, "count": n} for t, n in self.terms.most_common(top_terms)]
+        }
+
+
+def _floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _floor_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class QueryRollups:
+    """Background roll-up of raw query logs into hourly and daily buckets."""
+
+    def __init__(
+        self,
+        interval: float = QUERY_ROLLUP_INTERVAL,
+        grace: float = QUERY_ROLLUP_GRACE,
+        hourly_retention_days: int = HOURLY_ROLLUP_RETENTION_DAYS
+    ):
+        self.interval = interval
+        self.grace = timedelta(seconds=grace)
+        self.hourly_retention = timedelta(days=hourly_retention_days)
+        self._owner = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.hours_rolled = 0
+        self.days_rolled = 0
+        self.failures = 0
+        self.last_run: Optional[datetime] = None
+
+    async def start(self):
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        # Buckets are recomputed idempotently, so an interrupted run is simply redone
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failures += 1
+                print(f"✗ Query rollup failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _acquire_lease(self, collection, now: datetime) -> bool:
+        """Hold the rollup lease for two intervals; False if another worker holds it."""
+        try:
+            await collection.find_one_and_update(
+                {"_id": "state", "$or": [{"until": {"$lt": now}}, {"owner": self._owner}]},
+                {"$set": {"owner": self._owner, "until": now + timedelta(seconds=self.interval * 2)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """Roll up every hour from the watermark to now; returns the hours rolled."""
+        now = now or datetime.utcnow()
+        collection = await get_rollups_collection()
+        if not await self._acquire_lease(collection, now):
+            return 0
+
+        # Lease and watermark share the state document
+        state = await collection.find_one({"_id": "state"})
+        if state.get("hour"):
+            first_hour = state["hour"]
+        else:
+            # First run: everything still in the raw log
+            queries_collection = await get_queries_collection()
+            oldest = await queries_collection.find_one({}, {"timestamp": 1}, sort=[("timestamp", 1)])
+            first_hour = _floor_hour(oldest["timestamp"] if oldest else now)
+
+        hour = first_hour
+        hours = 0
+        days = set()
+        while hour <= now:
+            if hours and not await self._acquire_lease(collection, datetime.utcnow()):
+                # A long catch-up outlived the lease; the new holder takes over from the watermark
+                break
+            await self._roll_hour(collection, hour)
+            days.add(_floor_day(hour))
+            hour += HOUR
+            hours += 1
+        for day in sorted(days):
+            await self._roll_day(collection, day)
+        self.hours_rolled += hours
+        self.days_rolled += len(days)
+
+        # Hours that may still receive buffered entries are redone next run
+        watermark = max(first_hour, min(hour, _floor_hour(now - self.grace)))
+        await collection.update_one({"_id": "state"}, {"$set": {"hour": watermark}})
+        self.runs += 1
+        self.last_run = now
+        return hours
+
+    async def _write(self, collection, granularity: str, start: datetime, buckets: Dict[str, RollupBucket]):
+        operations = []
+        for scope, bucket in buckets.items():
+            document = {**bucket.document(), "scope": scope, "granularity": granularity, "start": start}
+            if granularity == "hour":
+                document["expires_at"] = start + self.hourly_retention
+            operations.append(UpdateOne(
+                {"scope": scope, "granularity": granularity, "start": start},
+                {"$set": document},
+                upsert=True
+            ))
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+
+    async def _roll_hour(self, collection, hour: datetime):
+        queries_collection = await get_queries_collection()
+        cursor = queries_collection.find(
+            {"timestamp": {"$gte": hour, "$lt": hour + HOUR}},
+            {"org_id": 1, "question": 1, "has_answer": 1, "cache_hit": 1, "latency_ms": 1}
+        )
+        buckets: Dict[str, RollupBucket] = defaultdict(RollupBucket)
+        async for entry in cursor:
+            buckets[ALL_ORGS].add_entry(entry)
+            if entry.get("org_id"):
+                buckets[entry["org_id"]].add_entry(entry)
+        await self._write(collection, "hour", hour, buckets)
+
+    async def _roll_day(self, collection, day: datetime):
+        cursor = collection.find({"granularity": "hour", "start": {"$gte": day, "$lt": day + DAY}})
+        buckets: Dict[str, RollupBucket] = defaultdict(RollupBucket)
+        async for doc in cursor:
+            buckets[doc["scope"]].merge(doc)
+        await self._write(collection, "day", day, buckets)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "hours_rolled": self.hours_rolled,
+            "days_rolled": self.days_rolled,
+            "failures": self.failures,
+            "last_run": self.last_run.isoformat() if self.last_run else None
+        }
+
+
+async def read_rollups(
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    scope: str = ALL_ORGS
+) -> List[dict]:
+    """Buckets of one scope in [start, end), oldest first."""
+    collection = await get_rollups_collection()
+    cursor = collection.find(
+        {"scope": scope, "granularity": granularity, "start": {"$gte": start, "$lt": end}},
+        {"_id": 0, "latency_histogram": 0, "expires_at": 0}
+    ).sort("start", 1)
+    return await cursor.to_list(length=None)
+
+
+async def summarize_rollups(granularity: str, start: datetime, end: datetime, scope: str = ALL_ORGS) -> dict:
+    """Merge the buckets of a range into one summary (counts, rates, latency percentiles, top terms)."""
+    collection = await get_rollups_collection()
+    cursor = collection.find({"scope": scope, "granularity": granularity, "start": {"$gte": start, "$lt": end}})
+    total = RollupBucket()
+    buckets = 0
+    async for doc in cursor:
+        total.merge(doc)
+        buckets += 1
+    summary = total.document()
+    del summary["latency_histogram"]
+    return {**summary, "buckets": buckets}
+
+
+query_rollups = QueryRollups()
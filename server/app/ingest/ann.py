@@ -0,0 +1,246 @@
+"""
+IVF + PQ approximate nearest-neighbour index for local vector namespaces.
+
+Vectors (already unit-normalized) are assigned to the nearest of `nlist` coarse
+centroids (spherical k-means) and their residuals compressed to `m` one-byte
+product-quantizer codes. A query scans the `nprobe` closest clusters, scores their rows from the
+PQ lookup table, and re-scores the best `k * rerank` exactly against the
+full-precision matrix. Higher nprobe / rerank trade latency for recall.
+
+Per-row cluster ids and codes live in memory-mapped files next to the vectors
+(ann_lists.i32, ann_codes.u8) and the codebooks in ann.npz, so inserts are
+incremental and loading only rebuilds the inverted lists. Deleted rows are
+filtered out at query time by the namespace's tombstone mask and dropped when
+the namespace compacts.
+"""
+from typing import List, Optional, Tuple
+import os
+
+import numpy as np
+
+_PQ_CENTROIDS = 256
+_TRAIN_SAMPLES_PER_CENTROID = 64
+_KMEANS_ITERATIONS = 12
+
+
+def _kmeans(data: np.ndarray, k: int, rng: np.random.Generator, spherical: bool) -> np.ndarray:
+    """Lloyd's k-means; spherical=True clusters unit vectors by inner product."""
+    centroids = data[rng.choice(len(data), size=k, replace=len(data) < k)].copy()
+    for _ in range(_KMEANS_ITERATIONS):
+        if spherical:
+            assignment = np.argmax(data @ centroids.T, axis=1)
+        else:
+            distances = (centroids ** 2).sum(axis=1) - 2 * data @ centroids.T
+            assignment = np.argmin(distances, axis=1)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, data)
+        counts = np.bincount(assignment, minlength=k)
+        empty = counts == 0
+        # Re-seed empty clusters from random points
+        sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+        counts[empty] = 1
+        centroids = sums / counts[:, None]
+        if spherical:
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class IVFPQIndex:
+    """IVF + PQ index over the rows of one namespace's vector matrix."""
+
+    def __init__(self, path: str, dimension: int, m: int, nlist: int = 0, nprobe: int = 16, rerank: int = 10):
+        if dimension % m:
+            raise ValueError(f"PQ sub-quantizers ({m}) must divide the dimension ({dimension})")
+        self.path = path
+        self.dimension = dimension
+        self.m = m
+        self.nlist_setting = nlist
+        self.nprobe = nprobe
+        self.rerank = rerank
+
+        self.centroids: Optional[np.ndarray] = None  # (nlist, d)
+        self.codebooks: Optional[np.ndarray] = None  # (m, 256, d / m)
+        self.trained_size = 0
+        self.capacity = 0
+        self.list_ids: Optional[np.memmap] = None  # row -> cluster, -1 = not indexed
+        self.codes: Optional[np.memmap] = None  # (capacity, m) uint8
+        self._lists: List[np.ndarray] = []
+
+    # --- Persistence ---
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def load(self, capacity: int) -> bool:
+        """Load codebooks and per-row codes if this namespace has been trained."""
+        if not os.path.exists(self._file("ann.npz")):
+            return False
+        saved = np.load(self._file("ann.npz"))
+        if saved["codebooks"].shape[0] != self.m:
+            # PQ settings changed; the caller retrains
+            return False
+        self.centroids = saved["centroids"]
+        self.codebooks = saved["codebooks"]
+        self.trained_size = int(saved["trained_size"])
+        self.ensure_capacity(capacity)
+        self._rebuild_lists()
+        return True
+
+    def _save_codebooks(self):
+        tmp = self._file("ann.tmp.npz")
+        np.savez(tmp, centroids=self.centroids, codebooks=self.codebooks, trained_size=self.trained_size)
+        os.replace(tmp, self._file("ann.npz"))
+
+    def ensure_capacity(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+        for name, width in (("ann_lists.i32", 4), ("ann_codes.u8", self.m)):
+            path = self._file(name)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(path, "ab") as f:
+                f.truncate(capacity * width)
+            if name == "ann_lists.i32" and capacity * width > old_size:
+                # New rows start as "not indexed"
+                lists = np.memmap(path, dtype=np.int32, mode="r+", shape=(capacity,))
+                lists[old_size // 4:] = -1
+                lists.flush()
+                del lists
+
+        self.list_ids = np.memmap(self._file("ann_lists.i32"), dtype=np.int32, mode="r+", shape=(capacity,))
+        self.codes = np.memmap(self._file("ann_codes.u8"), dtype=np.uint8, mode="r+", shape=(capacity, self.m))
+        self.capacity = capacity
+
+    def _rebuild_lists(self):
+        nlist = len(self.centroids)
+        list_ids = np.asarray(self.list_ids)
+        rows = np.flatnonzero(list_ids >= 0)
+        order = np.argsort(list_ids[rows], kind="stable")
+        rows = rows[order]
+        bounds = np.searchsorted(list_ids[rows], np.arange(nlist + 1))
+        self._lists = [rows[bounds[i]:bounds[i + 1]].astype(np.int64) for i in range(nlist)]
+
+    def reset(self):
+        for name in ("ann.npz", "ann_lists.i32", "ann_codes.u8"):
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+        self.__init__(self.path, self.dimension, self.m, self.nlist_setting, self.nprobe, self.rerank)
+
+    # --- Build ---
+
+    def train(self, vectors: np.ndarray, rows: np.ndarray, capacity: int, seed: int = 0):
+        """Train coarse centroids and PQ codebooks on the given rows, then index them."""
+        rng = np.random.default_rng(seed)
+        nlist = self.nlist_setting or max(1, int(4 * np.sqrt(len(rows))))
+        nlist = min(nlist, len(rows))
+        sample_size = min(len(rows), max(nlist, _PQ_CENTROIDS) * _TRAIN_SAMPLES_PER_CENTROID)
+        sample = np.asarray(vectors[np.sort(rng.choice(rows, size=sample_size, replace=False))], dtype=np.float32)
+
+        centroids = _kmeans(sample, nlist, rng, spherical=True)
+        # PQ encodes the residual from the row's coarse centroid
+        residuals = sample - centroids[np.argmax(sample @ centroids.T, axis=1)]
+        width = self.dimension // self.m
+        codebooks = np.stack([
+            _kmeans(np.ascontiguousarray(residuals[:, j * width:(j + 1) * width]), _PQ_CENTROIDS, rng, spherical=False)
+            for j in range(self.m)
+        ])
+
+        self.reset()
+        self.centroids = centroids
+        self.codebooks = codebooks
+        self.trained_size = len(rows)
+        self.ensure_capacity(capacity)
+        self._lists = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._save_codebooks()
+        self.add(rows, vectors)
+
+    def _encode(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        assignment = np.argmax(data @ self.centroids.T, axis=1).astype(np.int32)
+        residuals = data - self.centroids[assignment]
+        width = self.dimension // self.m
+        codes = np.empty((len(data), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            sub = residuals[:, j * width:(j + 1) * width]
+            book = self.codebooks[j]
+            distances = (book ** 2).sum(axis=1) - 2 * sub @ book.T
+            codes[:, j] = np.argmin(distances, axis=1)
+        return assignment, codes
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray, batch_size: int = 4096):
+        """Index (or re-index, e.g. after an overwrite) the given rows of `vectors`."""
+        rows = np.asarray(rows, dtype=np.int64)
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            assignment, codes = self._encode(np.asarray(vectors[batch], dtype=np.float32))
+            self.codes[batch] = codes
+            self.list_ids[batch] = assignment
+            for cluster in np.unique(assignment):
+                self._lists[cluster] = np.concatenate([self._lists[cluster], batch[assignment == cluster]])
+        self.codes.flush()
+        self.list_ids.flush()
+
+    def export_rows(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cluster ids and codes of `rows`, to carry across a namespace compaction."""
+        return np.asarray(self.list_ids[rows]).copy(), np.asarray(self.codes[rows]).copy()
+
+    def drop_rows(self):
+        """Remove the per-row files (codebooks are kept); unindexed rows are re-encoded on load."""
+        self.list_ids = None
+        self.codes = None
+        self.capacity = 0
+        for name in ("ann_lists.i32", "ann_codes.u8"):
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+
+    def import_rows(self, list_ids: np.ndarray, codes: np.ndarray):
+        """Write exported rows back at positions 0..n-1 (their post-compaction rows)."""
+        self.list_ids[:len(list_ids)] = list_ids
+        self.codes[:len(codes)] = codes
+        self.list_ids.flush()
+        self.codes.flush()
+        self._rebuild_lists()
+
+    # --- Search ---
+
+    def search(self, query: np.ndarray, k: int, mask: np.ndarray, vectors: np.ndarray,
+               nprobe: Optional[int] = None, rerank: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k rows among those where `mask` is True.
+        Returns (rows, exact cosine scores), best first.
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        rerank = rerank or self.rerank
+
+        coarse_scores = self.centroids @ query
+        probe = np.argpartition(-coarse_scores, nprobe - 1)[:nprobe]
+        candidates = np.concatenate([self._lists[cluster] for cluster in probe])
+        if not len(candidates):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        # Drop tombstoned / filtered rows and stale entries of re-indexed rows
+        candidates = candidates[candidates < len(mask)]
+        candidates = candidates[mask[candidates]]
+        candidates = candidates[np.isin(self.list_ids[candidates], probe)]
+        candidates = np.unique(candidates)
+        if not len(candidates):
+            return candidates, np.zeros(0, dtype=np.float32)
+
+        width = self.dimension // self.m
+        table = np.einsum("jcw,jw->jc", self.codebooks, query.reshape(self.m, width))
+        # <q, x> = <q, centroid> + <q, residual>, the latter from the PQ lookup table
+        approximate = (
+            coarse_scores[self.list_ids[candidates]]
+            + table[np.arange(self.m), self.codes[candidates]].sum(axis=1)
+        )
+
+        shortlist_size = min(len(candidates), k * rerank)
+        shortlist = candidates[np.argpartition(-approximate, shortlist_size - 1)[:shortlist_size]]
+        shortlist = np.sort(shortlist)
+        exact = np.asarray(vectors[shortlist]) @ query
+
+        top = np.argsort(-exact)[:k]
+        return shortlist[top], exact[top]
@@ -0,0 +1,90 @@
+"""
+Vector backend interface.
+
+Ingestion, retrieval and the maintenance scripts only use this subset of the
+Pinecone data plane, so any object implementing it can stand in for the index:
+PineconeBackend wraps the hosted index, LocalVectorBackend (local_index.py)
+keeps vectors on disk in-process.
+"""
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+class VectorBackend(ABC):
+    """
+    Data-plane operations on a namespaced vector index. Vectors are dicts of
+    {"id", "values", "metadata"}; metadata["text"] holds the chunk text. A
+    namespace of None or "" is the default namespace.
+    """
+
+    embeddings = None
+
+    @abstractmethod
+    def upsert(self, vectors: List[dict], namespace: Optional[str] = None, **kwargs):
+        ...
+
+    @abstractmethod
+    def update(self, id: str, set_metadata: dict, namespace: Optional[str] = None, **kwargs):
+        ...
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None, namespace: Optional[str] = None,
+               filter: Optional[dict] = None, **kwargs):
+        ...
+
+    @abstractmethod
+    def fetch(self, ids: List[str], namespace: Optional[str] = None, **kwargs):
+        """Returns an object whose `.vectors` maps id -> object with .id, .values, .metadata."""
+
+    @abstractmethod
+    def list(self, prefix: Optional[str] = None, limit: int = 100,
+             namespace: Optional[str] = None, **kwargs) -> Iterator[List[str]]:
+        """Yield pages of vector IDs."""
+
+    @abstractmethod
+    def describe_index_stats(self, **kwargs) -> dict:
+        """{"total_vector_count": int, "namespaces": {name: {"vector_count": int}}}"""
+
+    @abstractmethod
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None
+    ) -> List[Tuple[Document, float]]:
+        """Top-k (document, cosine score) pairs; the document text comes from metadata["text"]."""
+
+
+class PineconeBackend(VectorBackend):
+    """The hosted Pinecone index, with search through the LangChain vector store."""
+
+    def __init__(self, index, vectorstore):
+        self.index = index
+        self.vectorstore = vectorstore
+        self.embeddings = vectorstore.embeddings
+
+    def upsert(self, vectors, namespace=None, **kwargs):
+        return self.index.upsert(vectors=vectors, namespace=namespace, **kwargs)
+
+    def update(self, id, set_metadata, namespace=None, **kwargs):
+        return self.index.update(id=id, set_metadata=set_metadata, namespace=namespace, **kwargs)
+
+    def delete(self, ids=None, namespace=None, filter=None, **kwargs):
+        return self.index.delete(ids=ids, namespace=namespace, filter=filter, **kwargs)
+
+    def fetch(self, ids, namespace=None, **kwargs):
+        return self.index.fetch(ids=ids, namespace=namespace, **kwargs)
+
+    def list(self, prefix=None, limit=100, namespace=None, **kwargs):
+        return self.index.list(prefix=prefix, limit=limit, namespace=namespace, **kwargs)
+
+    def describe_index_stats(self, **kwargs):
+        return self.index.describe_index_stats(**kwargs)
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4, filter=None, namespace=None):
+        return self.vectorstore.similarity_search_by_vector_with_score(
+            embedding, k=k, filter=filter, namespace=namespace
+        )
@@ -0,0 +1,147 @@
+"""
+Ingestion stages for a single PDF: parse -> split -> embed -> upsert.
+
+The stages are chained generators: pages are parsed and split in a background
+thread a bounded number of chunks ahead of the batched embed/upsert writer, so
+memory stays flat regardless of document size and parsing overlaps the network
+stages. Runs synchronously (it is CPU and network bound) and reports per-stage
+progress through a callback so the job queue can persist it.
+"""
+from typing import Callable, Dict, List, Optional
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import INGEST_PREFETCH_CHUNKS, EMBED_BATCH_SIZE
+
+from .loader import iter_pdf_pages
+from .registry import TRACKED_METADATA, chunk_id
+from .splitter import iter_split_documents
+from .stream import counted, prefetch
+from .vectorstore import namespace_for, vectorstore_manager
+from .writer import VectorWriter
+
+ProgressCallback = Callable[..., None]
+
+# Pages between parsing progress reports
+PAGE_PROGRESS_EVERY = 10
+
+
+def _noop_progress(stage: Optional[str], **counters):
+    pass
+
+
+def ingest_pdf(
+    org_id: str,
+    filename: str,
+    file_path: str,
+    existing: Optional[Dict[str, dict]] = None,
+    progress: Optional[ProgressCallback] = None
+) -> dict:
+    """
+    Parse, chunk, embed and upsert one PDF for an organization.
+
+    Vector IDs are content-addressed (see registry.chunk_id). `existing` is the
+    document's registered chunks ({vector_id: tracked metadata}); only chunks not
+    in it are embedded and upserted, unchanged chunks that moved page get their
+    metadata updated in place, and registered chunks no longer in the document
+    are deleted. Re-running the same job is idempotent.
+
+    Returns: {"pages", "chunks_created", "chunks_unchanged",
+              "changed": {vector_id: tracked metadata, plus "text" for new chunks},
+              "removed": [vector_id]}
+    """
+    progress = progress or _noop_progress
+    existing = existing or {}
+    vectorstore_manager.startup()
+    totals = {"pages": 0, "chunks_created": 0}
+
+    # Parsing overlaps the writer, so these report counters only (stage None);
+    # the stage follows the writer once embedding starts
+    def pages_parsed(count: int):
+        totals["pages"] = count
+        progress(None, pages_parsed=count)
+
+    def chunks_created(count: int):
+        totals["chunks_created"] = count
+        progress(None, chunks_created=count)
+
+    # Stages 1 + 2: lazily parse and split
+    progress("parsing")
+    pages = counted(iter_pdf_pages(file_path), pages_parsed, every=PAGE_PROGRESS_EVERY)
+    chunks = counted(iter_split_documents(pages), chunks_created, every=EMBED_BATCH_SIZE)
+
+    # vector_id -> tracked metadata for every chunk in this version of the document
+    current: Dict[str, dict] = {}
+    moved: Dict[str, dict] = {}
+    # Text of newly embedded chunks, registered for the lexical (BM25) index
+    new_texts: Dict[str, str] = {}
+
+    def records():
+        for chunk in chunks:
+            vector_id = chunk_id(org_id, filename, chunk.page_content)
+            if vector_id in current:
+                # Repeated text (e.g. boilerplate pages) is stored once
+                continue
+
+            tracked = {name: chunk.metadata.get(name) for name in TRACKED_METADATA}
+            current[vector_id] = tracked
+            if vector_id in existing:
+                if existing[vector_id] != tracked:
+                    moved[vector_id] = tracked
+                continue
+
+            new_texts[vector_id] = chunk.page_content
+            # Add metadata (Crucial: Add org_id)
+            chunk.metadata["document_name"] = filename
+            chunk.metadata["org_id"] = org_id
+            # Lets gc_vectors.py tell in-flight vectors (not yet registered) from orphans
+            chunk.metadata["ingested_at"] = time.time()
+            # PineconeVectorStore reads the chunk text back from metadata["text"]
+            yield (vector_id, chunk.page_content, {**chunk.metadata, "text": chunk.page_content})
+
+    # Stages 3 + 4: batched, concurrent embed and pipelined upsert of new chunks only
+    writer = VectorWriter(vectorstore_manager.embeddings, vectorstore_manager.index, namespace=namespace_for(org_id))
+    writer.write(prefetch(records(), INGEST_PREFETCH_CHUNKS), progress=progress)
+
+    # Stage 5: reconcile chunks that moved or disappeared
+    removed = [vector_id for vector_id in existing if vector_id not in current]
+    unchanged = len(current) - sum(1 for vector_id in current if vector_id not in existing)
+    progress("reconciling", chunks_unchanged=unchanged)
+    writer.update_metadata(moved.items())
+    writer.delete(removed)
+
+    return {
+        **totals,
+        "chunks_unchanged": unchanged,
+        "changed": {
+            **{vector_id: moved[vector_id] for vector_id in moved},
+            **{vector_id: {**current[vector_id], "text": text} for vector_id, text in new_texts.items()}
+        },
+        "removed": removed
+    }
+
+
+def delete_document_vectors(org_id: str, filename: str, vector_ids: List[str]) -> int:
+    """
+    Delete a document's vectors: by ID when its chunks are registered, otherwise
+    (documents ingested before the chunk registry) by org_id/document_name filter.
+    Filter deletes are not supported on serverless indexes; those vectors are
+    left for gc_vectors.py.
+    """
+    vectorstore_manager.startup()
+    namespace = namespace_for(org_id)
+    writer = VectorWriter(vectorstore_manager.embeddings, vectorstore_manager.index, namespace=namespace)
+    if vector_ids:
+        return writer.delete(vector_ids)
+
+    try:
+        # Not retried: a serverless index rejects it on every attempt
+        vectorstore_manager.index.delete(
+            filter={"org_id": {"$eq": org_id}, "document_name": {"$eq": filename}},
+            namespace=namespace
+        )
+    except Exception as e:
+        print(f"✗ Delete-by-metadata failed for {org_id}/{filename} (run gc_vectors.py): {e}")
+    return 0
@@ -0,0 +1,250 @@
+"""
+Background ingestion job queue.
+
+Uploads are persisted as jobs in the `ingest_jobs` collection and processed by a
+small pool of asyncio workers, each running the blocking ingestion stages on a
+thread. Jobs that were queued or running when the server stopped are picked up
+again on startup.
+
+Each upload is saved to its own file (named by job id), so a re-upload never
+rewrites a PDF an earlier job is still parsing. A completed job swaps its file
+in as the document's file under the document lock and removes the one it
+replaced; a failed job removes its own.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
+import uuid
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import INGEST_WORKERS
+
+from .ingestor import ingest_pdf
+from .registry import chunk_registry
+from ..db.mongodb import get_jobs_collection, get_documents_collection
+from ..rag.answer_cache import answer_cache
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+def _new_progress() -> dict:
+    return {
+        "pages_parsed": 0,
+        "chunks_created": 0,
+        "chunks_embedded": 0,
+        "vectors_upserted": 0,
+        "chunks_unchanged": 0
+    }
+
+
+def _remove_file(path: Optional[str]):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+class IngestionJobQueue:
+    """Mongo-backed queue of PDF ingestion jobs processed by a worker pool."""
+
+    def __init__(self, workers: int = INGEST_WORKERS):
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # (org_id, filename) -> lock; jobs for the same document diff against the same registry entries
+        self._document_locks: Dict[tuple, asyncio.Lock] = {}
+
+    async def start(self):
+        """Start the workers and re-enqueue jobs interrupted by a restart."""
+        if self._tasks:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest")
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+        try:
+            resumed = await self._resume()
+            if resumed:
+                print(f"✓ Resumed {resumed} ingestion job(s)")
+        except Exception as e:
+            print(f"✗ Could not resume ingestion jobs: {e}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @staticmethod
+    def new_job_id() -> str:
+        return str(uuid.uuid4())
+
+    async def submit(
+        self,
+        org_id: str,
+        filename: str,
+        file_path: str,
+        uploaded_by: dict,
+        job_id: Optional[str] = None
+    ) -> dict:
+        """
+        Persist a new job and queue it. `file_path` must be unique to this job
+        (see new_job_id); the job owns it from here on. Returns the job document.
+        """
+        now = datetime.utcnow()
+        job = {
+            "_id": job_id or self.new_job_id(),
+            "org_id": org_id,
+            "filename": filename,
+            "file_path": file_path,
+            "uploaded_by": uploaded_by["uid"],
+            "uploaded_by_email": uploaded_by["email"],
+            "status": JobStatus.QUEUED,
+            "stage": None,
+            "progress": _new_progress(),
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+
+        jobs_collection = await get_jobs_collection()
+        await jobs_collection.insert_one(job)
+        await self._queue.put(job["_id"])
+        return job
+
+    async def get(self, org_id: str, job_id: str) -> Optional[dict]:
+        jobs_collection = await get_jobs_collection()
+        return await jobs_collection.find_one({"_id": job_id, "org_id": org_id})
+
+    def document_lock(self, org_id: str, filename: str) -> asyncio.Lock:
+        """Lock held while a document's vectors, chunk registry entries and stored file change."""
+        return self._document_locks.setdefault((org_id, filename), asyncio.Lock())
+
+    async def _resume(self) -> int:
+        jobs_collection = await get_jobs_collection()
+        pending = await jobs_collection.find(
+            {"status": {"$in": [JobStatus.QUEUED, JobStatus.RUNNING]}},
+            {"_id": 1}
+        ).sort("created_at", 1).to_list(length=None)
+
+        for job in pending:
+            await self._queue.put(job["_id"])
+        return len(pending)
+
+    async def _update(self, job_id: str, update: dict):
+        update.setdefault("$set", {})["updated_at"] = datetime.utcnow()
+        jobs_collection = await get_jobs_collection()
+        await jobs_collection.update_one({"_id": job_id}, update)
+
+    def _progress_callback(self, job_id: str, pending: list):
+        """
+        Progress hook for the ingestion thread. Counters only move forward, so
+        updates are written with $max and may land out of order; the futures are
+        collected in `pending` so the job can wait for them before finishing.
+        A stage of None updates counters only.
+        """
+        def report(stage: Optional[str], **counters):
+            update = {"$set": {"stage": stage}} if stage else {}
+            if counters:
+                update["$max"] = {f"progress.{name}": value for name, value in counters.items()}
+            pending.append(asyncio.run_coroutine_threadsafe(self._update(job_id, update), self._loop))
+
+        return report
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Ingestion worker error for job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        jobs_collection = await get_jobs_collection()
+        job = await jobs_collection.find_one({"_id": job_id})
+        if not job or job["status"] not in (JobStatus.QUEUED, JobStatus.RUNNING):
+            return
+
+        async with self.document_lock(job["org_id"], job["filename"]):
+            await self._run_locked(job_id, job)
+
+    async def _run_locked(self, job_id: str, job: dict):
+        await self._update(job_id, {"$set": {"status": JobStatus.RUNNING, "error": None}})
+
+        pending_updates = []
+        try:
+            existing = await chunk_registry.load(job["org_id"], job["filename"])
+            result = await self._loop.run_in_executor(
+                self._executor,
+                ingest_pdf,
+                job["org_id"],
+                job["filename"],
+                job["file_path"],
+                existing,
+                self._progress_callback(job_id, pending_updates)
+            )
+            await chunk_registry.apply(job["org_id"], job["filename"], result["changed"], result["removed"], job_id)
+        except Exception as e:
+            import traceback
+            print(f"ERROR: {traceback.format_exc()}")
+            await asyncio.gather(*map(asyncio.wrap_future, pending_updates), return_exceptions=True)
+            await self._update(job_id, {"$set": {"status": JobStatus.FAILED, "error": str(e)}})
+            _remove_file(job["file_path"])
+            return
+
+        await asyncio.gather(*map(asyncio.wrap_future, pending_updates), return_exceptions=True)
+
+        # Save document metadata to MongoDB (one record per org document; re-uploads replace it)
+        documents_collection = await get_documents_collection()
+        previous = await documents_collection.find_one(
+            {"org_id": job["org_id"], "filename": job["filename"]},
+            {"file_path": 1}
+        )
+        await documents_collection.update_one(
+            {"org_id": job["org_id"], "filename": job["filename"]},
+            {"$set": {
+                "org_id": job["org_id"], # Link to org
+                "filename": job["filename"],
+                "ingest_job_id": job_id,
+                "file_path": job["file_path"],
+                "pages": result["pages"],
+                "chunks_created": result["chunks_created"],
+                "uploaded_by": job["uploaded_by"],
+                "uploaded_by_email": job["uploaded_by_email"],
+                "uploaded_at": datetime.utcnow(),
+                "status": "active"
+            }},
+            upsert=True
+        )
+        await answer_cache.invalidate(job["org_id"])
+        # Still under the document lock, so no other job or delete is using the replaced file
+        if previous and previous.get("file_path") not in (None, job["file_path"]):
+            _remove_file(previous["file_path"])
+
+        await self._update(job_id, {"$set": {
+            "status": JobStatus.COMPLETED,
+            "stage": "done",
+            "completed_at": datetime.utcnow()
+        }})
+
+
+ingestion_queue = IngestionJobQueue()
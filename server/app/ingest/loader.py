@@ -1,6 +1,107 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional
+import multiprocessing
+import threading
+import sys
+import os
+
 from langchain_community.document_loaders import PyPDFLoader
+# Private helper, pinned via langchain-community==0.4.1: keeps metadata identical to PyPDFLoader
+from langchain_community.document_loaders.parsers.pdf import _purge_metadata
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import PDF_PARSE_WORKERS, PDF_PARALLEL_MIN_PAGES, PDF_PAGE_RANGE_MAX
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared parser pool. Uses spawn: forking a threaded server process is unsafe."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_loader_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[tuple]:
+    """Worker: extract (page_number, page_label, text) for pages [start, stop)."""
+    reader = PdfReader(file_path)
+    return [
+        (number, reader.page_labels[number], reader.pages[number].extract_text(extraction_mode="plain").strip())
+        for number in range(start, stop)
+    ]
+
+
+def _iter_pdf_parallel(file_path: str, reader: PdfReader, workers: int) -> Iterator[Document]:
+    total_pages = len(reader.pages)
+
+    # Same document-level metadata PyPDFLoader attaches to every page
+    doc_metadata = _purge_metadata(
+        {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+        | dict(reader.metadata or {})
+        | {"source": file_path, "total_pages": total_pages}
+    )
+
+    # More ranges than workers so uneven pages (scans, tables) balance out,
+    # capped so only a few ranges of page text are held at once
+    range_size = max(1, min(PDF_PAGE_RANGE_MAX, -(-total_pages // (workers * 4))))
+    ranges = iter([(start, min(start + range_size, total_pages)) for start in range(0, total_pages, range_size)])
+
+    pool = _get_pool(workers)
+    in_flight = deque()
+    try:
+        for start, stop in islice(ranges, workers * 2):
+            in_flight.append(pool.submit(_extract_page_range, file_path, start, stop))
+
+        # Ranges are consumed in submission order, so pages come back in page order
+        while in_flight:
+            pages = in_flight.popleft().result()
+            for start, stop in islice(ranges, 1):
+                in_flight.append(pool.submit(_extract_page_range, file_path, start, stop))
+
+            for page_number, page_label, text in pages:
+                yield Document(
+                    page_content=text,
+                    metadata=doc_metadata | {"page": page_number, "page_label": page_label}
+                )
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def iter_pdf_pages(file_path: str, workers: int = PDF_PARSE_WORKERS) -> Iterator[Document]:
+    """
+    Yield a PDF's pages one Document at a time, in page order.
+    With workers > 1, large PDFs are split into page ranges that are extracted
+    in a process pool (a bounded number in flight) with PyPDFLoader's metadata.
+    """
+    if workers > 1:
+        reader = PdfReader(file_path)
+        if len(reader.pages) >= PDF_PARALLEL_MIN_PAGES:
+            return _iter_pdf_parallel(file_path, reader, workers)
+
+    return PyPDFLoader(file_path).lazy_load()
+
 
-def load_pdf(file_path: str):
-    loader = PyPDFLoader(file_path)
-    documents = loader.load()
+def load_pdf(file_path: str, workers: int = PDF_PARSE_WORKERS):
+    """Load a PDF as one Document per page (see iter_pdf_pages)."""
+    documents = list(iter_pdf_pages(file_path, workers))
     return documents
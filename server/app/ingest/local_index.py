@@ -0,0 +1,540 @@
+"""
+In-process vector backend: one memory-mapped float32 matrix per namespace.
+
+Layout under LOCAL_INDEX_DIR, one directory per namespace (per org):
+    vectors.f32  unit-normalized embeddings, one row per vector (grown by doubling)
+    log.jsonl    append-only metadata log: put / set / del records keyed by row
+
+Namespaces load lazily on first use: the matrix is memory-mapped (the OS pages
+it in on demand) and the log is replayed into in-memory metadata, including
+integer-coded columns for the filterable fields so filters are vectorized.
+Search is brute-force cosine top-k, or IVF + PQ (ann.py) once a namespace holds
+LOCAL_ANN_MIN_VECTORS vectors. Deletes are tombstones; a namespace is compacted
+(rows and log rewritten) once LOCAL_INDEX_COMPACT_RATIO of it is dead.
+
+Single process only: row allocation, the replayed metadata and tombstones
+live in this process's memory, so a second writer (another uvicorn worker, or
+gc_vectors.py / migrate_namespaces.py while the server is up) would corrupt
+the shared files. The backend takes an exclusive lock on LOCAL_INDEX_DIR/.lock
+and refuses to open if another process holds it; run the server with a single
+worker and stop it before running the maintenance scripts.
+"""
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, unquote
+import json
+import math
+import threading
+import errno
+import sys
+import os
+
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    LOCAL_INDEX_COMPACT_RATIO,
+    LOCAL_ANN_ENABLED,
+    LOCAL_ANN_MIN_VECTORS,
+    LOCAL_ANN_NLIST,
+    LOCAL_ANN_PQ_M,
+    LOCAL_ANN_NPROBE,
+    LOCAL_ANN_RERANK,
+    LOCAL_ANN_RETRAIN_GROWTH
+)
+
+from .ann import IVFPQIndex
+from .backend import VectorBackend
+
+# Metadata fields with vectorized filter support ($eq, $ne, $in, $nin)
+FILTER_FIELDS = ("org_id", "document_name")
+
+DEFAULT_NAMESPACE = "__default__"
+LOCK_FILE = ".lock"
+_MIN_CAPACITY = 1024
+
+# IVF + PQ settings for namespaces past min_vectors (see ann.py); None disables ANN
+DEFAULT_ANN_SETTINGS = {
+    "min_vectors": LOCAL_ANN_MIN_VECTORS,
+    "nlist": LOCAL_ANN_NLIST,
+    "m": LOCAL_ANN_PQ_M,
+    "nprobe": LOCAL_ANN_NPROBE,
+    "rerank": LOCAL_ANN_RERANK,
+    "retrain_growth": LOCAL_ANN_RETRAIN_GROWTH
+} if LOCAL_ANN_ENABLED else None
+
+
+def _unit_rows(values: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(values, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return values / norms
+
+
+class _Namespace:
+    """Vectors, metadata, filter columns and (once large enough) the ANN index for one namespace."""
+
+    def __init__(self, path: str, dimension: int, compact_ratio: float, ann_settings: Optional[dict] = None):
+        self.path = path
+        self.dimension = dimension
+        self.compact_ratio = compact_ratio
+        self.ann_settings = ann_settings
+        self.ann: Optional[IVFPQIndex] = None
+        if ann_settings:
+            self.ann = IVFPQIndex(
+                path,
+                dimension,
+                # Largest PQ size <= the setting that divides the dimension
+                m=math.gcd(ann_settings["m"], dimension),
+                nlist=ann_settings["nlist"],
+                nprobe=ann_settings["nprobe"],
+                rerank=ann_settings["rerank"]
+            )
+        self.lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._recover()
+        self._reset()
+        self._load()
+        self._load_ann()
+
+    def _reset(self):
+        self.count = 0  # rows used, live or dead
+        self.live = 0
+        self.capacity = 0
+        self.vectors: Optional[np.memmap] = None
+        self.alive = np.zeros(0, dtype=bool)
+        self.row_ids: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.metadata: List[Optional[dict]] = []
+        # field -> int32 codes per row (-1 = missing) and value -> code
+        self.columns = {field: np.zeros(0, dtype=np.int32) for field in FILTER_FIELDS}
+        self.codes: Dict[str, Dict[str, int]] = {field: {} for field in FILTER_FIELDS}
+
+    # --- Persistence ---
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    @property
+    def _log_path(self) -> str:
+        return os.path.join(self.path, "log.jsonl")
+
+    def _recover(self):
+        """Finish or discard a compaction interrupted by a crash (see compact)."""
+        vectors_tmp, log_tmp = self._vectors_path + ".tmp", self._log_path + ".tmp"
+        if os.path.exists(log_tmp) and not os.path.exists(vectors_tmp):
+            os.replace(log_tmp, self._log_path)
+        for path in (vectors_tmp, log_tmp):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load(self):
+        if os.path.exists(self._vectors_path):
+            self._open_vectors(os.path.getsize(self._vectors_path) // (self.dimension * 4))
+
+        if not os.path.exists(self._log_path):
+            return
+
+        with open(self._log_path, "r", encoding="utf-8") as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-append; its vectors were never acknowledged
+                    break
+                self._apply(record)
+
+    def _open_vectors(self, capacity: int):
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+        self.capacity = capacity
+        grow = capacity - len(self.alive)
+        if grow > 0:
+            self.alive = np.concatenate([self.alive, np.zeros(grow, dtype=bool)])
+            for field in FILTER_FIELDS:
+                self.columns[field] = np.concatenate([self.columns[field], np.full(grow, -1, dtype=np.int32)])
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, self.capacity * 2, _MIN_CAPACITY)
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.dimension * 4)
+        self._open_vectors(capacity)
+        if self.ann is not None and self.ann.is_trained:
+            self.ann.ensure_capacity(capacity)
+
+    def _append_log(self, records: List[dict]):
+        with open(self._log_path, "a", encoding="utf-8") as log:
+            log.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+
+    def _load_ann(self, carried: Optional[tuple] = None):
+        if self.ann is None:
+            return
+        if self.ann.load(self.capacity):
+            if carried is not None:
+                self.ann.import_rows(*carried)
+            # Rows written after the last index update (e.g. before a crash)
+            unindexed = np.flatnonzero(self.alive[:self.count] & (self.ann.list_ids[:self.count] < 0))
+            if len(unindexed):
+                self.ann.add(unindexed, self.vectors)
+        else:
+            self._maybe_train()
+
+    def _maybe_train(self):
+        """Train the ANN index once the namespace reaches min_vectors (and retrain as it grows)."""
+        settings = self.ann_settings
+        if self.live < settings["min_vectors"]:
+            return False
+        if self.ann.is_trained and self.live < self.ann.trained_size * settings["retrain_growth"]:
+            return False
+        self.ann.train(self.vectors, np.flatnonzero(self.alive[:self.count]), self.capacity)
+        return True
+
+    def _index_rows(self, rows: List[int]):
+        if self.ann is None or self._maybe_train() or not self.ann.is_trained:
+            return
+        self.ann.add(np.unique(rows), self.vectors)
+
+    # --- In-memory state ---
+
+    def _code(self, field: str, value) -> int:
+        if not isinstance(value, str):
+            return -1
+        codes = self.codes[field]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _set_metadata(self, row: int, metadata: dict):
+        self.metadata[row] = metadata
+        for field in FILTER_FIELDS:
+            self.columns[field][row] = self._code(field, metadata.get(field))
+
+    def _apply(self, record: dict):
+        op = record["op"]
+        if op == "put":
+            row = record["row"]
+            while len(self.row_ids) <= row:
+                self.row_ids.append(None)
+                self.metadata.append(None)
+            self.count = max(self.count, row + 1)
+            if not self.alive[row]:
+                self.live += 1
+            self.alive[row] = True
+            self.row_ids[row] = record["id"]
+            self.rows[record["id"]] = row
+            self._set_metadata(row, record["metadata"])
+        elif op == "set":
+            row = self.rows.get(record["id"])
+            if row is not None:
+                self._set_metadata(row, {**self.metadata[row], **record["metadata"]})
+        elif op == "del":
+            row = self.rows.pop(record["id"], None)
+            if row is not None:
+                self.alive[row] = False
+                self.row_ids[row] = None
+                self.metadata[row] = None
+                self.live -= 1
+
+    # --- Operations ---
+
+    def upsert(self, vectors: List[dict]) -> int:
+        values = _unit_rows(np.asarray([vector["values"] for vector in vectors], dtype=np.float32))
+        with self.lock:
+            records = []
+            assigned = {}
+            next_row = self.count
+            for vector in vectors:
+                row = self.rows.get(vector["id"], assigned.get(vector["id"]))
+                if row is None:
+                    row = assigned[vector["id"]] = next_row
+                    next_row += 1
+                records.append({"op": "put", "id": vector["id"], "row": row, "metadata": vector.get("metadata") or {}})
+
+            self._ensure_capacity(next_row)
+            rows = [record["row"] for record in records]
+            self.vectors[rows] = values
+            self.vectors.flush()
+            # The log append commits the batch
+            self._append_log(records)
+            for record in records:
+                self._apply(record)
+            self._index_rows(rows)
+        return len(vectors)
+
+    def update(self, vector_id: str, set_metadata: dict):
+        with self.lock:
+            if vector_id not in self.rows:
+                return
+            record = {"op": "set", "id": vector_id, "metadata": set_metadata}
+            self._append_log([record])
+            self._apply(record)
+
+    def delete(self, ids: List[str]) -> int:
+        with self.lock:
+            records = [{"op": "del", "id": vector_id} for vector_id in ids if vector_id in self.rows]
+            if records:
+                self._append_log(records)
+                for record in records:
+                    self._apply(record)
+            if self.count and (self.count - self.live) / self.count > self.compact_ratio:
+                self.compact()
+        return len(records)
+
+    def compact(self):
+        """Rewrite live rows contiguously and replace the log with one put per vector."""
+        with self.lock:
+            live_rows = np.flatnonzero(self.alive[:self.count])
+            vectors_tmp, log_tmp = self._vectors_path + ".tmp", self._log_path + ".tmp"
+
+            capacity = max(len(live_rows), _MIN_CAPACITY)
+            compacted = np.memmap(vectors_tmp, dtype=np.float32, mode="w+", shape=(capacity, self.dimension))
+            if len(live_rows):
+                compacted[:len(live_rows)] = self.vectors[live_rows]
+            compacted.flush()
+            del compacted
+
+            with open(log_tmp, "w", encoding="utf-8") as log:
+                for new_row, row in enumerate(live_rows):
+                    record = {"op": "put", "id": self.row_ids[row], "row": new_row, "metadata": self.metadata[row]}
+                    log.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+            carried = None
+            if self.ann is not None and self.ann.is_trained:
+                # Row numbers change: carry the codes over instead of re-encoding
+                carried = self.ann.export_rows(live_rows)
+                self.ann.drop_rows()
+
+            # Vectors first: _recover completes a crash between the two replaces
+            self.vectors = None
+            os.replace(vectors_tmp, self._vectors_path)
+            os.replace(log_tmp, self._log_path)
+
+            self._reset()
+            self._load()
+            self._load_ann(carried)
+
+    def filter_mask(self, filter: Optional[dict]) -> np.ndarray:
+        mask = self.alive[:self.count].copy()
+        for field, condition in (filter or {}).items():
+            if field not in self.columns:
+                raise ValueError(f"Local vector index cannot filter on '{field}' (supported: {', '.join(FILTER_FIELDS)})")
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+
+            column = self.columns[field][:self.count]
+            codes = self.codes[field]
+            for op, value in condition.items():
+                if op in ("$eq", "$ne"):
+                    matches = column == codes.get(value, -2)
+                elif op in ("$in", "$nin"):
+                    matches = np.isin(column, [codes.get(v, -2) for v in value])
+                else:
+                    raise ValueError(f"Unsupported filter operator '{op}'")
+                mask &= ~matches if op in ("$ne", "$nin") else matches
+        return mask
+
+    def search(
+        self,
+        embedding: List[float],
+        k: int,
+        filter: Optional[dict],
+        exact: bool = False,
+        nprobe: Optional[int] = None,
+        rerank: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (row, cosine score). Uses the ANN index when the namespace has one,
+        unless `exact` or the filter leaves few enough rows to scan directly.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        with self.lock:
+            mask = self.filter_mask(filter)
+            use_ann = (
+                not exact
+                and self.ann is not None
+                and self.ann.is_trained
+                and np.count_nonzero(mask) >= self.ann_settings["min_vectors"]
+            )
+            if use_ann:
+                rows, scores = self.ann.search(query, k, mask, self.vectors, nprobe=nprobe, rerank=rerank)
+                return [(int(row), float(score)) for row, score in zip(rows, scores)]
+
+            if mask.all():
+                rows = np.arange(self.count)
+                scores = self.vectors[:self.count] @ query
+            else:
+                rows = np.flatnonzero(mask)
+                scores = self.vectors[rows] @ query
+
+            if not len(rows):
+                return []
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(rows[i]), float(scores[i])) for i in top]
+
+
+class LocalIndexInUseError(RuntimeError):
+    """Another process has the local index directory open."""
+
+
+# realpath -> open lock file, held for the life of the process (re-opening the
+# backend, e.g. on vectorstore refresh, reuses it)
+_owner_locks: Dict[str, object] = {}
+_owner_locks_guard = threading.Lock()
+
+
+def _lock_exclusive(handle):
+    try:
+        import fcntl
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except ImportError:
+        import msvcrt
+        msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+def _acquire_owner_lock(root: str):
+    path = os.path.realpath(root)
+    with _owner_locks_guard:
+        if path in _owner_locks:
+            return
+        handle = open(os.path.join(path, LOCK_FILE), "a+")
+        try:
+            _lock_exclusive(handle)
+        except OSError as e:
+            if e.errno not in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK, errno.EDEADLK):
+                handle.close()
+                raise
+            handle.seek(0)
+            holder = handle.read().strip() or "unknown"
+            handle.close()
+            raise LocalIndexInUseError(
+                f"Local vector index {root} is in use by another process (pid {holder}). "
+                "The local backend supports a single process: run one server worker, "
+                "and stop the server before running maintenance scripts."
+            ) from e
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        _owner_locks[path] = handle
+
+
+class LocalVectorBackend(VectorBackend):
+    """On-disk, single-process vector index with the Pinecone data-plane subset the app uses."""
+
+    def __init__(
+        self,
+        root: str,
+        dimension: int,
+        embeddings=None,
+        compact_ratio: float = LOCAL_INDEX_COMPACT_RATIO,
+        ann_settings: Optional[dict] = DEFAULT_ANN_SETTINGS
+    ):
+        self.root = root
+        self.dimension = dimension
+        self.embeddings = embeddings
+        self.compact_ratio = compact_ratio
+        self.ann_settings = ann_settings
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        _acquire_owner_lock(root)
+
+    def _namespace(self, namespace: Optional[str], create: bool = False) -> Optional[_Namespace]:
+        name = namespace or DEFAULT_NAMESPACE
+        loaded = self._namespaces.get(name)
+        if loaded is not None:
+            return loaded
+
+        with self._lock:
+            if name not in self._namespaces:
+                path = os.path.join(self.root, quote(name, safe=""))
+                if not create and not os.path.isdir(path):
+                    return None
+                self._namespaces[name] = _Namespace(path, self.dimension, self.compact_ratio, self.ann_settings)
+            return self._namespaces[name]
+
+    def namespaces(self) -> List[str]:
+        names = {unquote(entry) for entry in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, entry))}
+        return sorted(names | set(self._namespaces))
+
+    def upsert(self, vectors, namespace=None, **kwargs):
+        upserted = self._namespace(namespace, create=True).upsert(vectors) if vectors else 0
+        return {"upserted_count": upserted}
+
+    def update(self, id, set_metadata, namespace=None, **kwargs):
+        store = self._namespace(namespace)
+        if store is not None:
+            store.update(id, set_metadata)
+        return {}
+
+    def delete(self, ids=None, namespace=None, filter=None, delete_all=False, **kwargs):
+        store = self._namespace(namespace)
+        if store is None:
+            return {}
+        with store.lock:
+            if delete_all or filter is not None:
+                mask = store.filter_mask(None if delete_all else filter)
+                ids = [store.row_ids[row] for row in np.flatnonzero(mask)]
+            store.delete(ids or [])
+        return {}
+
+    def fetch(self, ids, namespace=None, **kwargs):
+        store = self._namespace(namespace)
+        vectors = {}
+        if store is not None:
+            with store.lock:
+                for vector_id in ids:
+                    row = store.rows.get(vector_id)
+                    if row is not None:
+                        vectors[vector_id] = SimpleNamespace(
+                            id=vector_id,
+                            values=store.vectors[row].tolist(),
+                            metadata=dict(store.metadata[row])
+                        )
+        return SimpleNamespace(vectors=vectors, namespace=namespace or "")
+
+    def list(self, prefix=None, limit=100, namespace=None, **kwargs) -> Iterator[List[str]]:
+        store = self._namespace(namespace)
+        if store is None:
+            return
+        with store.lock:
+            ids = sorted(vector_id for vector_id in store.rows if not prefix or vector_id.startswith(prefix))
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def describe_index_stats(self, **kwargs):
+        namespaces = {}
+        for name in self.namespaces():
+            store = self._namespace(name)
+            namespaces[name] = {"vector_count": store.live if store else 0}
+        return {
+            "dimension": self.dimension,
+            "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values()),
+            "namespaces": namespaces
+        }
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4, filter=None, namespace=None, **kwargs):
+        """Extra kwargs: exact=True forces brute force; nprobe / rerank override the ANN knobs."""
+        store = self._namespace(namespace)
+        if store is None:
+            return []
+
+        results = []
+        with store.lock:
+            search_options = {name: kwargs[name] for name in ("exact", "nprobe", "rerank") if name in kwargs}
+            for row, score in store.search(embedding, k, filter, **search_options):
+                metadata = dict(store.metadata[row])
+                text = metadata.pop("text", "")
+                results.append((Document(id=store.row_ids[row], page_content=text, metadata=metadata), score))
+        return results
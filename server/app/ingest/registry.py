@@ -0,0 +1,100 @@
+"""
+Per-organization chunk registry.
+
+Every chunk gets a stable ID derived from its org, document and content hash,
+and the `chunks` collection records one entry per vector in the index. On
+re-upload only chunks whose hash is not yet registered are embedded and
+upserted; chunks that disappeared from the document are deleted. Entries also
+keep the chunk text, which the per-org BM25 index (rag/lexical.py) is built from.
+"""
+from datetime import datetime
+from typing import Dict, Iterable
+import hashlib
+
+from pymongo import DeleteOne, UpdateOne
+
+from ..db.mongodb import get_chunks_collection
+
+# Chunk metadata tracked per entry; unchanged chunks that moved get these refreshed in place
+TRACKED_METADATA = ("page", "page_label", "start_index")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def document_key(document_name: str) -> str:
+    # Filenames may be long or non-ASCII; vector IDs should be neither
+    return hashlib.sha256(document_name.encode("utf-8")).hexdigest()[:16]
+
+
+def chunk_id(org_id: str, document_name: str, text: str) -> str:
+    """Vector ID `{org_id}#{document key}#{content hash}`, stable across re-uploads."""
+    return f"{org_id}#{document_key(document_name)}#{content_hash(text)}"
+
+
+def document_prefix(org_id: str, document_name: str) -> str:
+    """ID prefix shared by all of a document's vectors."""
+    return f"{org_id}#{document_key(document_name)}#"
+
+
+class ChunkRegistry:
+    """Mongo-backed record of which chunk vectors exist for each org document."""
+
+    def __init__(self):
+        self._index_ready = False
+
+    async def _collection(self):
+        collection = await get_chunks_collection()
+        if not self._index_ready:
+            await collection.create_index([("org_id", 1), ("document_name", 1)])
+            self._index_ready = True
+        return collection
+
+    async def load(self, org_id: str, document_name: str) -> Dict[str, dict]:
+        """Return {vector_id: tracked metadata} for a document's registered chunks."""
+        collection = await self._collection()
+        cursor = collection.find(
+            {"org_id": org_id, "document_name": document_name},
+            {name: 1 for name in TRACKED_METADATA}
+        )
+        return {
+            doc["_id"]: {name: doc.get(name) for name in TRACKED_METADATA}
+            async for doc in cursor
+        }
+
+    async def apply(
+        self,
+        org_id: str,
+        document_name: str,
+        changed: Dict[str, dict],
+        removed: Iterable[str],
+        job_id: str
+    ):
+        """Record new or moved chunks ({vector_id: tracked metadata [+ text]}) and drop the removed ones."""
+        collection = await self._collection()
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": vector_id},
+                {
+                    "$set": {"org_id": org_id, "document_name": document_name, "job_id": job_id, **metadata},
+                    "$setOnInsert": {"created_at": now}
+                },
+                upsert=True
+            )
+            for vector_id, metadata in changed.items()
+        ]
+        operations.extend(DeleteOne({"_id": vector_id}) for vector_id in removed)
+
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+
+    async def remove(self, org_id: str, document_name: str) -> int:
+        """Drop every registered chunk of a document."""
+        collection = await self._collection()
+        result = await collection.delete_many({"org_id": org_id, "document_name": document_name})
+        return result.deleted_count
+
+
+chunk_registry = ChunkRegistry()
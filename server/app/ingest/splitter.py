@@ -4,10 +4,24 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from config import CHUNK_SIZE, CHUNK_OVERLAP
 
-def split_documents(documents):
-    splitter = RecursiveCharacterTextSplitter(
+def _get_splitter():
+    return RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP
+        chunk_overlap=CHUNK_OVERLAP,
+        # Offset in the page; lets the chat context merge neighbouring chunks
+        add_start_index=True
     )
+
+def split_documents(documents):
+    splitter = _get_splitter()
     chunks = splitter.split_documents(documents)
     return chunks
+
+def iter_split_documents(documents):
+    """
+    Incremental split_documents: consumes pages lazily and yields their chunks.
+    Chunks never span pages, so the output is identical to split_documents.
+    """
+    splitter = _get_splitter()
+    for document in documents:
+        yield from splitter.split_documents([document])
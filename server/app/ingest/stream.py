@@ -0,0 +1,79 @@
+"""
+Generator plumbing for the streaming ingestion pipeline.
+
+Stages are plain iterators chained lazily (pages -> chunks -> records); `prefetch`
+runs the upstream stages in a background thread behind a bounded queue so PDF
+parsing and splitting overlap with embedding and upserting, while never holding
+more than `max_items` parsed items in memory.
+"""
+from typing import Callable, Iterable, Iterator, TypeVar
+import queue
+import threading
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], max_items: int) -> Iterator[T]:
+    """
+    Iterate `items` in a background thread, at most `max_items` ahead of the consumer.
+    Errors raised upstream are re-raised in the consumer; closing the generator
+    (or an error downstream) stops the producer.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=max(1, max_items))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_StageError(e))
+
+    producer = threading.Thread(target=produce, name="ingest-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+def counted(
+    items: Iterable[T],
+    on_count: Callable[[int], None],
+    every: int = 1
+) -> Iterator[T]:
+    """Pass items through, calling on_count(total) every `every` items and once at the end."""
+    total = 0
+    for item in items:
+        total += 1
+        if total % every == 0:
+            on_count(total)
+        yield item
+    if total % every:
+        on_count(total)
+
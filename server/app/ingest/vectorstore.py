@@ -1,7 +1,9 @@
-
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
 from langchain_cohere import CohereEmbeddings
+from datetime import datetime
+from typing import Optional
+import threading
 import time
 import sys
 import os
@@ -20,20 +22,24 @@ from config import (
     PINECONE_API_KEY,
     PINECONE_ENV,
     PINECONE_INDEX_NAME,
-    COHERE_API_KEY
+    PINECONE_POOL_THREADS,
+    PINECONE_NAMESPACE_MODE,
+    VECTOR_BACKEND,
+    LOCAL_INDEX_DIR,
+    COHERE_API_KEY,
+    EMBEDDING_MODEL,
+    EMBEDDING_DIMENSION
 )
 
+from .backend import PineconeBackend
+from .local_index import LocalVectorBackend
 
 
-def get_vectorstore():
+def _ensure_index(pc: Pinecone):
     """
-    Creates or connects to a Pinecone vector store using Cohere embeddings.
-    Compatible with LangChain 1.x and Pinecone SDK v3+.
+    Create the Pinecone index if it does not exist yet.
+    This is a control-plane call, so it only runs at startup or on refresh.
     """
-    # Initialize Pinecone
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-
-    # Check if index exists, create if not
     existing_indexes = [index.name for index in pc.list_indexes()]
 
     if PINECONE_INDEX_NAME not in existing_indexes:
@@ -41,7 +47,7 @@ def get_vectorstore():
         # If user has PINECONE_ENV set to something specific, we try to use it
         # But for Serverless spec, we need cloud and region.
         # This is a best-effort conversion.
-        
+
         # Simple heuristic: if ENV looks like a region
         region = PINECONE_ENV if PINECONE_ENV else "us-east-1"
         cloud = "aws" # Default to aws
@@ -49,7 +55,7 @@ def get_vectorstore():
         try:
             pc.create_index(
                 name=PINECONE_INDEX_NAME,
-                dimension=1024,  # Cohere embed-english-v3.0 dimension
+                dimension=EMBEDDING_DIMENSION,
                 metric="cosine",
                 spec=ServerlessSpec(
                     cloud=cloud,
@@ -63,20 +69,132 @@ def get_vectorstore():
             # Fallback or just re-raise
             raise e
 
-    # Initialize Cohere embeddings
-    embeddings = CohereEmbeddings(
-        cohere_api_key=COHERE_API_KEY,
-        model="embed-english-v3.0"
-    )
 
-    # Connect to index
-    index = pc.Index(PINECONE_INDEX_NAME)
+def org_namespace(org_id: str) -> str:
+    return f"org-{org_id}"
 
-    # Create LangChain vector store
-    vectorstore = PineconeVectorStore(
-        index=index,
-        embedding=embeddings,
-        text_key="text"
-    )
 
-    return vectorstore
+def namespace_for(org_id: str) -> Optional[str]:
+    """
+    The org's namespace, or None (default namespace) in shared mode.
+    The local backend always keeps one namespace (one matrix) per org.
+    """
+    if PINECONE_NAMESPACE_MODE == "per_org" or VECTOR_BACKEND == "local":
+        return org_namespace(org_id)
+    return None
+
+
+class VectorStoreManager:
+    """
+    Process-wide owner of the vector backend (see backend.VectorBackend) and
+    Cohere embeddings. `index` and `vectorstore` are both the backend: the
+    Pinecone index (VECTOR_BACKEND=pinecone) or the on-disk local index.
+
+    Built once from the FastAPI startup hook and shared by every request, so the
+    HTTP connection pools are reused and the index-existence check is not paid
+    on the request path. Use refresh() to rebuild after an index is recreated.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.client = None
+        self.index = None
+        self.embeddings = None
+        self.vectorstore = None
+        self.connected_at = None
+        self.last_error = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.vectorstore is not None
+
+    def startup(self):
+        """Connect once; subsequent calls are no-ops."""
+        if self.is_ready:
+            return self.vectorstore
+        with self._lock:
+            # Callers that queued on the lock behind a successful connect reuse it
+            if self.is_ready:
+                return self.vectorstore
+            return self._connect()
+
+    def refresh(self):
+        """
+        Rebuild the client, re-run the index-existence check and swap in a new store.
+        """
+        with self._lock:
+            return self._connect()
+
+    def _connect(self):
+        """Build the client and backend and swap them in; the caller holds _lock."""
+        try:
+            embeddings = CohereEmbeddings(
+                cohere_api_key=COHERE_API_KEY,
+                model=EMBEDDING_MODEL
+            )
+
+            if VECTOR_BACKEND == "local":
+                client = None
+                backend = LocalVectorBackend(LOCAL_INDEX_DIR, EMBEDDING_DIMENSION, embeddings)
+            else:
+                client = Pinecone(api_key=PINECONE_API_KEY, pool_threads=PINECONE_POOL_THREADS)
+                _ensure_index(client)
+
+                index = client.Index(PINECONE_INDEX_NAME, pool_threads=PINECONE_POOL_THREADS)
+                backend = PineconeBackend(index, PineconeVectorStore(
+                    index=index,
+                    embedding=embeddings,
+                    text_key="text"
+                ))
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+
+        self.client = client
+        self.index = backend
+        self.embeddings = embeddings
+        self.vectorstore = backend
+        self.connected_at = datetime.utcnow()
+        self.last_error = None
+        return backend
+
+    def get(self):
+        """Return the shared vector store, connecting lazily if startup was skipped."""
+        if not self.is_ready:
+            return self.startup()
+        return self.vectorstore
+
+    def health(self, check_index: bool = False) -> dict:
+        """
+        Report connection state. With check_index=True, also make a data-plane
+        round trip (describe_index_stats) to confirm the index is reachable.
+        """
+        status = {
+            "status": "ready" if self.is_ready else "not_initialized",
+            "backend": VECTOR_BACKEND,
+            "index": LOCAL_INDEX_DIR if VECTOR_BACKEND == "local" else PINECONE_INDEX_NAME,
+            "namespace_mode": PINECONE_NAMESPACE_MODE,
+            "connected_at": self.connected_at.isoformat() if self.connected_at else None,
+            "last_error": self.last_error
+        }
+
+        if check_index and self.is_ready:
+            try:
+                stats = self.index.describe_index_stats()
+                status["total_vectors"] = stats.get("total_vector_count")
+            except Exception as e:
+                status["status"] = "degraded"
+                status["last_error"] = str(e)
+
+        return status
+
+
+vectorstore_manager = VectorStoreManager()
+
+
+def get_vectorstore():
+    """
+    Return the process-wide vector backend (Pinecone or local) using Cohere embeddings.
+    Compatible with LangChain 1.x and Pinecone SDK v3+.
+    """
+    return vectorstore_manager.get()
@@ -0,0 +1,165 @@
+"""
+Batched, concurrent embedding and upsert for ingestion.
+
+Chunks are embedded in batches sized to Cohere's per-call limit with several
+batches in flight at once; each finished batch is immediately split into
+Pinecone-sized upserts that run in parallel with the remaining embeds. Every
+embed and upsert call is retried with jittered exponential backoff.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+import random
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    EMBED_BATCH_SIZE,
+    EMBED_CONCURRENCY,
+    UPSERT_BATCH_SIZE,
+    UPSERT_CONCURRENCY,
+    INGEST_MAX_RETRIES,
+    INGEST_RETRY_BACKOFF
+)
+
+# (vector_id, text, metadata)
+VectorRecord = Tuple[str, str, dict]
+
+
+def _batched(records: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class VectorWriter:
+    """
+    Writes (id, text, metadata) records to one namespace of the index through a
+    pipelined embed -> upsert path.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        index,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
+        embed_concurrency: int = EMBED_CONCURRENCY,
+        upsert_batch_size: int = UPSERT_BATCH_SIZE,
+        upsert_concurrency: int = UPSERT_CONCURRENCY,
+        max_retries: int = INGEST_MAX_RETRIES,
+        retry_backoff: float = INGEST_RETRY_BACKOFF,
+        namespace: Optional[str] = None
+    ):
+        self.embeddings = embeddings
+        self.index = index
+        self.namespace = namespace
+        self.embed_batch_size = embed_batch_size
+        self.embed_concurrency = max(1, embed_concurrency)
+        self.upsert_batch_size = upsert_batch_size
+        self.upsert_concurrency = max(1, upsert_concurrency)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def _with_retry(self, func: Callable, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt) * (0.5 + random.random())
+                print(f"Retrying {getattr(func, '__name__', 'call')} in {delay:.2f}s after error: {e}")
+                time.sleep(delay)
+
+    def _embed(self, batch: List[VectorRecord]) -> List[List[float]]:
+        return self._with_retry(self.embeddings.embed_documents, [text for _, text, _ in batch])
+
+    def _upsert(self, vectors: List[dict]) -> int:
+        self._with_retry(self.index.upsert, vectors=vectors, namespace=self.namespace, show_progress=False)
+        return len(vectors)
+
+    def upsert_vectors(self, vectors: Iterable[dict]) -> int:
+        """Upsert already-embedded vectors ({"id", "values", "metadata"}) in batches of upsert_batch_size."""
+        batches = list(_batched(vectors, self.upsert_batch_size))
+        with ThreadPoolExecutor(max_workers=self.upsert_concurrency, thread_name_prefix="upsert") as pool:
+            return sum(pool.map(self._upsert, batches))
+
+    def delete(self, vector_ids: Iterable[str]) -> int:
+        """Delete vectors by ID in batches of upsert_batch_size."""
+        batches = list(_batched(vector_ids, self.upsert_batch_size))
+        with ThreadPoolExecutor(max_workers=self.upsert_concurrency, thread_name_prefix="delete") as pool:
+            list(pool.map(lambda batch: self._with_retry(self.index.delete, ids=batch, namespace=self.namespace), batches))
+        return sum(len(batch) for batch in batches)
+
+    def update_metadata(self, updates: Iterable[Tuple[str, dict]]) -> int:
+        """Overwrite selected metadata fields of existing vectors, without re-embedding."""
+        updates = list(updates)
+        with ThreadPoolExecutor(max_workers=self.upsert_concurrency, thread_name_prefix="update") as pool:
+            list(pool.map(
+                lambda update: self._with_retry(
+                    self.index.update, id=update[0], set_metadata=update[1], namespace=self.namespace
+                ),
+                updates
+            ))
+        return len(updates)
+
+    def write(self, records: Iterable[VectorRecord], progress: Optional[Callable[..., None]] = None) -> dict:
+        """
+        Embed and upsert all records. `records` may be a generator; at most
+        embed_concurrency batches are pulled ahead of the upserts.
+
+        progress(stage, **counters) is called from this thread only.
+        Returns: {"chunks_embedded": int, "vectors_upserted": int}
+        """
+        counts = {"chunks_embedded": 0, "vectors_upserted": 0}
+
+        embed_pool = ThreadPoolExecutor(max_workers=self.embed_concurrency, thread_name_prefix="embed")
+        upsert_pool = ThreadPoolExecutor(max_workers=self.upsert_concurrency, thread_name_prefix="upsert")
+        embeds_in_flight = deque()
+        upserts_in_flight = deque()
+
+        def finish_upsert():
+            counts["vectors_upserted"] += upserts_in_flight.popleft().result()
+            if progress:
+                progress("upserting", vectors_upserted=counts["vectors_upserted"])
+
+        def finish_embed():
+            batch, future = embeds_in_flight.popleft()
+            vectors = future.result()
+            counts["chunks_embedded"] += len(batch)
+            if progress:
+                progress("embedding", chunks_embedded=counts["chunks_embedded"])
+
+            payload = [
+                {"id": vector_id, "values": values, "metadata": metadata}
+                for (vector_id, _, metadata), values in zip(batch, vectors)
+            ]
+            for start in range(0, len(payload), self.upsert_batch_size):
+                # Bound queued upserts so a slow index applies backpressure to embedding
+                while len(upserts_in_flight) >= self.upsert_concurrency * 2:
+                    finish_upsert()
+                upserts_in_flight.append(
+                    upsert_pool.submit(self._upsert, payload[start:start + self.upsert_batch_size])
+                )
+
+        try:
+            for batch in _batched(records, self.embed_batch_size):
+                embeds_in_flight.append((batch, embed_pool.submit(self._embed, batch)))
+                if len(embeds_in_flight) >= self.embed_concurrency:
+                    finish_embed()
+
+            while embeds_in_flight:
+                finish_embed()
+            while upserts_in_flight:
+                finish_upsert()
+        finally:
+            embed_pool.shutdown(wait=True, cancel_futures=True)
+            upsert_pool.shutdown(wait=True, cancel_futures=True)
+
+        return counts
@@ -1,17 +1,27 @@
-from fastapi import FastAPI, UploadFile, File
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+import asyncio
 import shutil
 import os
 
 # Load environment variables
 load_dotenv()
 
-from .ingest.loader import load_pdf
+from .ingest.loader import load_pdf, shutdown_loader_pool
 from .ingest.splitter import split_documents
-from .ingest.vectorstore import get_vectorstore
-from .routes import auth, organizations, documents
+from .ingest.vectorstore import get_vectorstore, vectorstore_manager
+from .ingest.jobs import ingestion_queue
+from .ingest.local_index import LocalIndexInUseError
+from .routes import auth, organizations, documents, metrics, analytics
+from .auth.firebase_auth import verify_admin, refresh_signing_keys_periodically
 from .db.mongodb import close_mongodb_connection
+from .db.query_log import query_log
+from .db.analytics import analytics_counters
+from .db.rollups import query_rollups
+from .db.indexes import bootstrap_indexes
+from .rag.pipeline import close_pipeline, get_llm_client
+from .rag.rerank import rerank_stage
 
 app = FastAPI(
     title="RuleBook AI – Corporate Q&A",
@@ -39,14 +49,45 @@ async def startup_event():
     """Initialize connections on startup"""
     print("🚀 Starting RuleBook AI Server...")
     print("✓ Firebase Admin SDK initialized")
+    app.state.signing_key_task = asyncio.create_task(refresh_signing_keys_periodically())
     print("✓ MongoDB connection ready")
-    print("✓ Pinecone vector store ready")
+    try:
+        await bootstrap_indexes()
+    except Exception as e:
+        print(f"✗ MongoDB index bootstrap failed: {e}")
+    # Entries logged after the backfill's claim are counted live, so it can run alongside
+    analytics_counters.start_backfill()
+    await query_log.start()
+    await query_rollups.start()
+    try:
+        vectorstore_manager.startup()
+        print(f"✓ Vector store ready ({vectorstore_manager.health()['backend']})")
+    except LocalIndexInUseError as e:
+        # A second worker on the local backend would corrupt the index; refuse to start
+        print(f"✗ {e}")
+        raise
+    except Exception as e:
+        # Requests will retry the connection lazily via get_vectorstore()
+        print(f"✗ Vector store unavailable: {e}")
+    get_llm_client()
+    print("✓ LLM client ready")
+    await rerank_stage.startup()
+    await ingestion_queue.start()
+    print(f"✓ Ingestion workers started ({ingestion_queue.workers})")
 
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up connections on shutdown"""
+    app.state.signing_key_task.cancel()
+    await ingestion_queue.stop()
+    shutdown_loader_pool()
+    await rerank_stage.close()
+    await close_pipeline()
+    await query_rollups.stop()
+    await analytics_counters.stop()
+    await query_log.stop()
     await close_mongodb_connection()
     print("👋 Server shutdown complete")
 
@@ -55,6 +96,8 @@ async def shutdown_event():
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(organizations.router, prefix="/organizations", tags=["Organizations"])
 app.include_router(documents.router, prefix="/documents", tags=["Documents"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+app.include_router(analytics.router, prefix="/admin/analytics", tags=["Analytics"])
 
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -85,6 +128,23 @@ def health_check():
         "pinecone_api_key": "set" if os.getenv("PINECONE_API_KEY") else "missing",
         "pinecone_env": os.getenv("PINECONE_ENV", "not set"),
         "mongodb_uri": "set" if os.getenv("MONGODB_URI") else "missing",
-        "firebase": "initialized"
+        "firebase": "initialized",
+        "vector_store": vectorstore_manager.health()["status"]
     }
     return status
+
+
+@app.get("/health/vectorstore")
+def vectorstore_health():
+    """Check the pooled vector store, including a round trip to the index"""
+    return vectorstore_manager.health(check_index=True)
+
+
+@app.post("/health/vectorstore/refresh")
+def refresh_vectorstore(token_data: dict = Depends(verify_admin)):
+    """Rebuild the pooled vector store (e.g. after the index was recreated)"""
+    try:
+        vectorstore_manager.refresh()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Vector store refresh failed: {str(e)}")
+    return vectorstore_manager.health(check_index=True)
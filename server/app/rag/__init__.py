@@ -0,0 +1,40 @@
+from .pipeline import (
+    embed_query,
+    retrieve,
+    lexical_retrieve,
+    hybrid_retrieve,
+    reciprocal_rank_fusion,
+    generate,
+    generate_stream,
+    run_blocking,
+    get_llm_client,
+    close_pipeline
+)
+from .embedding_cache import query_embedding_cache
+from .answer_cache import answer_cache
+from .lexical import lexical_index
+from .rerank import rerank_stage
+from .context import build_context, estimate_tokens
+from .llm import LLMClient, LLMUnavailableError, CircuitBreaker
+
+__all__ = [
+    "embed_query",
+    "retrieve",
+    "lexical_retrieve",
+    "hybrid_retrieve",
+    "reciprocal_rank_fusion",
+    "generate",
+    "generate_stream",
+    "run_blocking",
+    "get_llm_client",
+    "close_pipeline",
+    "query_embedding_cache",
+    "answer_cache",
+    "lexical_index",
+    "rerank_stage",
+    "build_context",
+    "estimate_tokens",
+    "LLMClient",
+    "LLMUnavailableError",
+    "CircuitBreaker"
+]
@@ -0,0 +1,162 @@
+"""
+Per-organization semantic answer cache.
+
+Sits in front of retrieval + generation: a question that matches a cached one
+exactly (after normalization) or by query-embedding cosine similarity above a
+threshold returns the stored answer and citations.
+
+Entries are tagged with the org's corpus version, a counter kept in MongoDB and
+bumped whenever the org's documents change, so every uvicorn worker drops stale
+answers within ANSWER_CACHE_VERSION_CHECK_INTERVAL seconds of an upload or delete.
+Callers read the version before retrieving and pass it to `store()`, which
+drops the answer if the corpus changed while it was being generated.
+"""
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import time
+import sys
+import os
+
+import numpy as np
+from pymongo import ReturnDocument
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    ANSWER_CACHE_SIZE_PER_ORG,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_VERSION_CHECK_INTERVAL
+)
+
+from ..db.mongodb import get_corpus_versions_collection
+from .embedding_cache import normalize_question
+
+
+class _OrgAnswers:
+    """Cached answers for one org, for one corpus version."""
+
+    def __init__(self, version: int):
+        self.version = version
+        # (scope, normalized question) -> (expires_at, unit embedding, answer)
+        self.entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+class AnswerCache:
+    """Exact + near-duplicate answer cache, partitioned by org and corpus version."""
+
+    def __init__(
+        self,
+        max_entries_per_org: int = ANSWER_CACHE_SIZE_PER_ORG,
+        ttl_seconds: int = ANSWER_CACHE_TTL,
+        similarity_threshold: float = ANSWER_CACHE_SIMILARITY,
+        version_check_interval: float = ANSWER_CACHE_VERSION_CHECK_INTERVAL
+    ):
+        self.max_entries_per_org = max_entries_per_org
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.version_check_interval = version_check_interval
+        self._orgs = {}
+        # org_id -> (version, checked_at)
+        self._versions = {}
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+
+    async def corpus_version(self, org_id: str) -> int:
+        """The org's corpus version, re-read from MongoDB at most every version_check_interval."""
+        cached = self._versions.get(org_id)
+        if cached and time.monotonic() - cached[1] < self.version_check_interval:
+            return cached[0]
+
+        collection = await get_corpus_versions_collection()
+        doc = await collection.find_one({"_id": org_id})
+        version = doc["version"] if doc else 0
+        self._versions[org_id] = (version, time.monotonic())
+        return version
+
+    async def _org(self, org_id: str) -> _OrgAnswers:
+        version = await self.corpus_version(org_id)
+        org = self._orgs.get(org_id)
+        if org is None or org.version != version:
+            org = _OrgAnswers(version)
+            self._orgs[org_id] = org
+        return org
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def lookup(self, org_id: str, question: str, embedding: List[float], scope: tuple) -> Optional[Tuple[dict, str]]:
+        """
+        Return (answer, "exact" | "semantic") for a cached match, else None.
+        `scope` separates answers that depend on more than the question (e.g. document filters).
+        """
+        org = await self._org(org_id)
+        now = time.monotonic()
+
+        key = (scope, normalize_question(question))
+        entry = org.entries.get(key)
+        if entry is not None and entry[0] > now:
+            org.entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry[2], "exact"
+
+        candidates = [(k, e) for k, e in org.entries.items() if k[0] == scope and e[0] > now]
+        if candidates:
+            matrix = np.stack([e[1] for _, e in candidates])
+            similarities = matrix @ self._unit(embedding)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                best_key = candidates[best][0]
+                org.entries.move_to_end(best_key)
+                self.semantic_hits += 1
+                return candidates[best][1][2], "semantic"
+
+        self.misses += 1
+        return None
+
+    async def store(self, org_id: str, question: str, embedding: List[float], scope: tuple, answer: dict, version: int):
+        """Cache an answer built from corpus `version` (read before retrieval); skipped if the corpus has changed since."""
+        org = await self._org(org_id)
+        if org.version != version:
+            self.stale_stores += 1
+            return
+        key = (scope, normalize_question(question))
+        org.entries[key] = (time.monotonic() + self.ttl_seconds, self._unit(embedding), answer)
+        org.entries.move_to_end(key)
+        while len(org.entries) > self.max_entries_per_org:
+            org.entries.popitem(last=False)
+
+    async def invalidate(self, org_id: str):
+        """Bump the org's corpus version so every worker drops its cached answers."""
+        collection = await get_corpus_versions_collection()
+        doc = await collection.find_one_and_update(
+            {"_id": org_id},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._orgs.pop(org_id, None)
+        self._versions[org_id] = (doc["version"], time.monotonic())
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "orgs": len(self._orgs),
+            "entries": sum(len(org.entries) for org in self._orgs.values()),
+            "similarity_threshold": self.similarity_threshold,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stale_stores": self.stale_stores,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,131 @@
+"""
+Token-budgeted context assembly for the chat prompt.
+
+Chunks overlap by CHUNK_OVERLAP characters, so neighbouring chunks retrieved
+together repeat text. Chunks from the same document page are merged when they
+overlap or touch: by their `start_index` in the page when both have one (chunks
+ingested since it was recorded), otherwise by matching the end of one chunk
+against the start of the other. Each merged block keeps the rank of its most
+relevant chunk, and blocks are added best first until CONTEXT_TOKEN_BUDGET is
+spent. Block N of the result is the prompt's [Source N].
+"""
+from typing import List, Optional, Sequence, Tuple
+import math
+import sys
+import os
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import CHUNK_OVERLAP, CONTEXT_TOKEN_BUDGET, CONTEXT_CHARS_PER_TOKEN
+
+# Shortest suffix/prefix match treated as chunk overlap rather than coincidence
+MIN_TEXT_OVERLAP = 20
+# Characters between two chunks' spans still considered adjacent (stripped separators)
+MAX_ADJACENT_GAP = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count (~CONTEXT_CHARS_PER_TOKEN characters per token for English)."""
+    return math.ceil(len(text) / CONTEXT_CHARS_PER_TOKEN)
+
+
+class ContextBlock:
+    """One [Source N] entry: one or more merged chunks from a single document page."""
+
+    def __init__(self, doc: Document, rank: int, score: float):
+        self.text = doc.page_content
+        self.document_name = doc.metadata.get("document_name", "Unknown")
+        self.page = doc.metadata.get("page", 0)
+        self.start: Optional[int] = doc.metadata.get("start_index")
+        self.rank = rank
+        self.score = score
+        self.chunks = 1
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.text)
+
+    def _absorb(self, other: "ContextBlock", text: str, start: Optional[int]):
+        self.text = text
+        self.start = start
+        self.rank = min(self.rank, other.rank)
+        self.score = max(self.score, other.score)
+        self.chunks += other.chunks
+
+    def merge(self, other: "ContextBlock") -> bool:
+        """Merge `other` (same page) into this block if the two overlap or touch."""
+        if self.start is not None and other.start is not None:
+            first, second = (self, other) if self.start <= other.start else (other, self)
+            if second.start > first.end + MAX_ADJACENT_GAP:
+                return False
+            if second.end <= first.end:
+                text = first.text
+            elif second.start >= first.end:
+                text = first.text + " " + second.text
+            else:
+                text = first.text + second.text[first.end - second.start:]
+            self._absorb(other, text, first.start)
+            return True
+
+        if other.text in self.text:
+            self._absorb(other, self.text, self.start)
+            return True
+        if self.text in other.text:
+            self._absorb(other, other.text, other.start)
+            return True
+
+        for first, second in ((self, other), (other, self)):
+            overlap = _suffix_prefix_overlap(first.text, second.text)
+            if overlap:
+                self._absorb(other, first.text + second.text[overlap:], first.start)
+                return True
+        return False
+
+
+def _suffix_prefix_overlap(first: str, second: str) -> int:
+    """Length of the longest suffix of `first` that is a prefix of `second` (0 if shorter than MIN_TEXT_OVERLAP)."""
+    longest = min(len(first), len(second), 2 * CHUNK_OVERLAP)
+    for size in range(longest, MIN_TEXT_OVERLAP - 1, -1):
+        if first.endswith(second[:size]):
+            return size
+    return 0
+
+
+def build_context(
+    results: Sequence[Tuple[Document, float]],
+    token_budget: int = CONTEXT_TOKEN_BUDGET
+) -> List[ContextBlock]:
+    """
+    Merge retrieved chunks (most relevant first) into per-page blocks and keep
+    the most relevant blocks that fit in `token_budget`. The top block is
+    truncated rather than dropped if it alone exceeds the budget.
+    """
+    blocks: List[ContextBlock] = []
+    for rank, (doc, score) in enumerate(results):
+        block = ContextBlock(doc, rank, score)
+        # A merge can bridge two existing blocks, so keep merging until nothing changes
+        merged = True
+        while merged:
+            merged = False
+            for existing in blocks:
+                if (existing.document_name, existing.page) == (block.document_name, block.page) and existing.merge(block):
+                    blocks.remove(existing)
+                    block = existing
+                    merged = True
+                    break
+        blocks.append(block)
+
+    blocks.sort(key=lambda b: b.rank)
+    selected = []
+    remaining = token_budget
+    for block in blocks:
+        tokens = estimate_tokens(block.text)
+        if tokens <= remaining:
+            selected.append(block)
+            remaining -= tokens
+        elif not selected:
+            block.text = block.text[:token_budget * CONTEXT_CHARS_PER_TOKEN]
+            selected.append(block)
+            remaining = 0
+    return selected
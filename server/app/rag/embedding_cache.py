@@ -0,0 +1,162 @@
+"""
+Query embedding cache.
+
+Repeated questions skip the Cohere round trip: embeddings are cached under the
+normalized question text and embedding model in a bounded in-process LRU with a
+TTL, optionally backed by a MongoDB collection shared by all uvicorn workers.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+import hashlib
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL,
+    QUERY_EMBEDDING_CACHE_SHARED
+)
+
+from ..db.mongodb import get_embedding_cache_collection
+
+
+def normalize_question(text: str) -> str:
+    """Case- and whitespace-insensitive form of a question."""
+    return " ".join(text.lower().split())
+
+
+def cache_key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalize_question(text)}".encode("utf-8")).hexdigest()
+
+
+class MongoEmbeddingCacheBackend:
+    """Shared cache tier in the `embedding_cache` collection (expired by a TTL index)."""
+
+    def __init__(self):
+        self._index_ready = False
+
+    async def _collection(self):
+        collection = await get_embedding_cache_collection()
+        if not self._index_ready:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    async def get(self, key: str) -> Optional[List[float]]:
+        collection = await self._collection()
+        doc = await collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        return doc["embedding"] if doc else None
+
+    async def set(self, key: str, embedding: List[float], model: str, ttl: int):
+        collection = await self._collection()
+        await collection.replace_one(
+            {"_id": key},
+            {
+                "embedding": embedding,
+                "model": model,
+                "expires_at": datetime.utcnow() + timedelta(seconds=ttl)
+            },
+            upsert=True
+        )
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU + TTL cache of query embeddings with an optional shared backend."""
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds: int = QUERY_EMBEDDING_CACHE_TTL,
+        shared_backend: Optional[MongoEmbeddingCacheBackend] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared_backend = shared_backend
+        # key -> (expires_at, embedding); most recently used at the end
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_local(self, key: str) -> Optional[List[float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, embedding = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return embedding
+
+    def _set_local(self, key: str, embedding: List[float]):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_embed(
+        self,
+        text: str,
+        model: str,
+        embed: Callable[[str], Awaitable[List[float]]]
+    ) -> List[float]:
+        """Return the cached embedding for `text`, calling `embed` on a miss."""
+        key = cache_key(text, model)
+
+        embedding = self._get_local(key)
+        if embedding is not None:
+            self.hits += 1
+            return embedding
+
+        if self.shared_backend is not None:
+            try:
+                embedding = await self.shared_backend.get(key)
+            except Exception as e:
+                print(f"Shared embedding cache read failed: {e}")
+                embedding = None
+            if embedding is not None:
+                self.shared_hits += 1
+                self._set_local(key, embedding)
+                return embedding
+
+        self.misses += 1
+        embedding = await embed(text)
+        self._set_local(key, embedding)
+
+        if self.shared_backend is not None:
+            try:
+                await self.shared_backend.set(key, embedding, model, self.ttl_seconds)
+            except Exception as e:
+                print(f"Shared embedding cache write failed: {e}")
+
+        return embedding
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "shared_backend": self.shared_backend is not None,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    shared_backend=MongoEmbeddingCacheBackend() if QUERY_EMBEDDING_CACHE_SHARED else None
+)
@@ -0,0 +1,209 @@
+"""
+Per-organization BM25 index for exact-term retrieval.
+
+Dense retrieval misses questions that hinge on literal terms (form numbers,
+"per diem", "PTO"). Ingestion stores each new chunk's text in the chunk
+registry, and every worker builds an in-memory BM25 index per org from it,
+rebuilt when the org's corpus version changes (see answer_cache).
+
+Postings are kept in CSR form: one int32 array of chunk rows and one uint16
+array of term frequencies for the whole vocabulary, sliced per term through an
+offsets array, so an org's index costs ~6 bytes per (term, chunk) pair and a
+query only touches the postings of its own terms.
+"""
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import time
+import re
+import sys
+import os
+
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import BM25_K1, BM25_B, LEXICAL_INDEX_MAX_ORGS
+
+from ..db.mongodb import get_chunks_collection
+from .answer_cache import answer_cache
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in into is it its "
+    "may me my of on or our should so than that the their them then there these this to "
+    "was we what when where which who why will with you your".split()
+)
+
+# Metadata returned with lexical hits, matching what the vector store returns
+_METADATA_FIELDS = ("document_name", "page", "page_label", "start_index")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric terms, stopwords removed ("W-4" -> ["w", "4"])."""
+    return [term for term in _TOKEN_RE.findall(text.lower()) if term not in STOPWORDS]
+
+
+class BM25Index:
+    """Immutable BM25 index over one org's registered chunks."""
+
+    def __init__(self, entries: Sequence[dict], version: int = 0, k1: float = BM25_K1, b: float = BM25_B):
+        """`entries` are chunk registry documents with `text`, `document_name` and page metadata."""
+        self.version = version
+        self.entries = entries
+        vocabulary: Dict[str, int] = {}
+        document_codes: Dict[str, int] = {}
+
+        term_ids, rows, frequencies = array("i"), array("i"), array("H")
+        lengths = np.zeros(len(entries), dtype=np.float32)
+        documents = np.zeros(len(entries), dtype=np.int32)
+
+        for row, entry in enumerate(entries):
+            counts = Counter(tokenize(entry["text"]))
+            lengths[row] = sum(counts.values())
+            documents[row] = document_codes.setdefault(entry["document_name"], len(document_codes))
+            for term, count in counts.items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                rows.append(row)
+                frequencies.append(min(count, 65535))
+
+        # Group postings by term; rows stay ascending within each term
+        term_ids = np.frombuffer(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        self.postings = np.frombuffer(rows, dtype=np.int32)[order]
+        self.frequencies = np.frombuffer(frequencies, dtype=np.uint16)[order]
+        self.offsets = np.searchsorted(term_ids[order], np.arange(len(vocabulary) + 1))
+
+        document_frequency = np.diff(self.offsets).astype(np.float32)
+        self.idf = np.log1p((len(entries) - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = float(lengths.mean()) if len(entries) else 0.0
+        # Per-chunk BM25 length normalization, precomputed once
+        self.length_norm = k1 * (1 - b + b * lengths / max(average_length, 1.0))
+        self.k1 = k1
+
+        self.vocabulary = vocabulary
+        self.documents = documents
+        self.document_codes = document_codes
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def nbytes(self) -> int:
+        arrays = (self.postings, self.frequencies, self.offsets, self.idf, self.length_norm, self.documents)
+        return sum(a.nbytes for a in arrays)
+
+    def search(self, query: str, k: int, document_names: Optional[List[str]] = None) -> List[Tuple[Document, float]]:
+        """Top-k (document, BM25 score) pairs, optionally restricted to some documents."""
+        terms = [self.vocabulary[t] for t in set(tokenize(query)) if t in self.vocabulary]
+        if not terms:
+            return []
+
+        rows = np.concatenate([self.postings[self.offsets[t]:self.offsets[t + 1]] for t in terms])
+        frequencies = np.concatenate([self.frequencies[self.offsets[t]:self.offsets[t + 1]] for t in terms])
+        idf = np.repeat(self.idf[terms], np.diff(self.offsets)[terms])
+
+        if document_names:
+            allowed = [self.document_codes[name] for name in document_names if name in self.document_codes]
+            keep = np.isin(self.documents[rows], allowed)
+            rows, frequencies, idf = rows[keep], frequencies[keep], idf[keep]
+            if not len(rows):
+                return []
+
+        frequencies = frequencies.astype(np.float32)
+        weights = idf * frequencies * (self.k1 + 1) / (frequencies + self.length_norm[rows])
+        if len(rows) * 8 > len(self.entries):
+            # Common terms: accumulating over every chunk beats sorting the postings
+            scores = np.bincount(rows, weights=weights, minlength=len(self.entries))
+            candidates = np.flatnonzero(scores)
+            scores = scores[candidates]
+        else:
+            candidates, inverse = np.unique(rows, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights)
+
+        top = min(k, len(candidates))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+
+        results = []
+        for position in best:
+            entry = self.entries[candidates[position]]
+            metadata = {name: entry[name] for name in _METADATA_FIELDS if entry.get(name) is not None}
+            results.append((Document(id=entry["_id"], page_content=entry["text"], metadata=metadata), float(scores[position])))
+        return results
+
+
+class LexicalIndexManager:
+    """Per-org BM25 indexes for this worker, rebuilt when the org's corpus changes."""
+
+    def __init__(self, max_orgs: int = LEXICAL_INDEX_MAX_ORGS):
+        self.max_orgs = max_orgs
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+        # org_id -> (corpus version, build task)
+        self._loading: Dict[str, Tuple[int, asyncio.Task]] = {}
+        # Builds are CPU bound; one at a time keeps them off the retrieval pool
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lexical")
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    async def _build(self, org_id: str, version: int) -> BM25Index:
+        collection = await get_chunks_collection()
+        cursor = collection.find(
+            {"org_id": org_id, "text": {"$exists": True}},
+            {"text": 1, **{name: 1 for name in _METADATA_FIELDS}}
+        )
+        entries = [entry async for entry in cursor]
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        index = await loop.run_in_executor(self._executor, BM25Index, entries, version)
+        self.builds += 1
+        self.build_seconds += time.perf_counter() - started
+
+        self._indexes[org_id] = index
+        self._indexes.move_to_end(org_id)
+        while len(self._indexes) > self.max_orgs:
+            self._indexes.popitem(last=False)
+        return index
+
+    def _finish_loading(self, org_id: str, task: asyncio.Task):
+        loading = self._loading.get(org_id)
+        if loading is not None and loading[1] is task:
+            del self._loading[org_id]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"✗ Lexical index build failed for {org_id}: {task.exception()}")
+
+    async def get(self, org_id: str) -> BM25Index:
+        """The org's index for its current corpus version, building it if needed."""
+        version = await answer_cache.corpus_version(org_id)
+        index = self._indexes.get(org_id)
+        if index is not None and index.version == version:
+            self._indexes.move_to_end(org_id)
+            return index
+
+        loading = self._loading.get(org_id)
+        if loading is None or loading[0] != version:
+            task = asyncio.create_task(self._build(org_id, version))
+            self._loading[org_id] = (version, task)
+            task.add_done_callback(lambda done: self._finish_loading(org_id, done))
+        else:
+            task = loading[1]
+        # Shielded: a caller timing out must not cancel the build for everyone else
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "orgs": len(self._indexes),
+            "chunks": sum(len(index) for index in self._indexes.values()),
+            "bytes": sum(index.nbytes() for index in self._indexes.values()),
+            "builds": self.builds,
+            "build_seconds": round(self.build_seconds, 3)
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+lexical_index = LexicalIndexManager()
@@ -0,0 +1,266 @@
+"""
+Shared LLM client: one pooled Cerebras client for the whole process.
+
+Every call runs under a deadline (LLM_DEADLINE seconds, covering all
+attempts). Transient failures (connection errors, timeouts, 429 and 5xx) are
+retried with jittered exponential backoff while the deadline allows. A circuit
+breaker tracks the failure rate of recent calls; past LLM_BREAKER_FAILURE_RATE
+it opens and calls fail fast with LLMUnavailableError for LLM_BREAKER_RESET
+seconds, then a single probe call decides whether it closes again.
+
+Streams are retried only until their first token; after that an error ends
+the stream.
+"""
+from collections import deque
+from typing import AsyncIterator, Callable, Optional
+import asyncio
+import random
+import time
+import sys
+import os
+
+import httpx
+from cerebras.cloud.sdk import (
+    AsyncCerebras,
+    APIConnectionError,
+    APIStatusError,
+)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    LLM_MODEL,
+    LLM_BASE_URL,
+    LLM_TIMEOUT,
+    LLM_DEADLINE,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF,
+    LLM_MAX_CONNECTIONS,
+    LLM_BREAKER_FAILURE_RATE,
+    LLM_BREAKER_WINDOW,
+    LLM_BREAKER_RESET
+)
+
+# HTTP statuses worth retrying; others (bad request, auth) fail immediately
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """The LLM provider is failing: retries ran out, the deadline passed or the circuit is open."""
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUSES
+    # Includes APITimeoutError
+    return isinstance(error, APIConnectionError)
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker: closed -> open -> half-open (one probe) -> closed.
+    Opens when at least `failure_rate` of the last `window` calls failed (once
+    `window // 2` calls have been seen), so scattered errors under load don't trip it.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = LLM_BREAKER_FAILURE_RATE,
+        window: int = LLM_BREAKER_WINDOW,
+        reset_timeout: float = LLM_BREAKER_RESET
+    ):
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.outcomes = deque(maxlen=window)  # True = failure
+        self.opened_at = 0.0
+        self._probing = False
+        self.opens = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now."""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def release(self):
+        """End a call without a verdict (it was cancelled), so a half-open breaker can probe again."""
+        self._probing = False
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.outcomes.clear()
+        self.opens += 1
+
+    def record_success(self):
+        self._probing = False
+        self.state = "closed"
+        self.outcomes.append(False)
+
+    def record_failure(self):
+        self._probing = False
+        if self.state == "half_open":
+            self._open()
+            return
+        if self.state == "open":
+            return
+        self.outcomes.append(True)
+        if len(self.outcomes) >= self.outcomes.maxlen // 2 and sum(self.outcomes) >= self.failure_rate * len(self.outcomes):
+            self._open()
+
+
+class LLMClient:
+    """Chat completions over a keep-alive connection pool with deadlines, retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        model: str = LLM_MODEL,
+        base_url: Optional[str] = LLM_BASE_URL,
+        api_key: Optional[str] = None,
+        timeout: float = LLM_TIMEOUT,
+        deadline: float = LLM_DEADLINE,
+        max_retries: int = LLM_MAX_RETRIES,
+        retry_backoff: float = LLM_RETRY_BACKOFF,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.model = model
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        )
+        # Retries are ours (deadline- and breaker-aware), not the SDK's
+        self._client = AsyncCerebras(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self._http,
+            max_retries=0,
+            warm_tcp_connection=False
+        )
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+    async def _with_resilience(self, attempt: Callable, deadline: Optional[float]):
+        """Run `attempt(timeout)` until it succeeds, the deadline passes or the breaker opens."""
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + (deadline or self.deadline)
+        last_error: Optional[Exception] = None
+
+        for attempt_number in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise LLMUnavailableError("LLM provider is degraded (circuit open); try again shortly") from last_error
+
+            remaining = deadline_at - loop.time()
+            try:
+                async with asyncio.timeout(remaining):
+                    result = await attempt(min(self.timeout, remaining))
+            except asyncio.CancelledError:
+                # The caller went away (client disconnect, upstream timeout): says
+                # nothing about the provider, but a probe must not stay claimed forever
+                self.breaker.release()
+                raise
+            except TimeoutError as e:
+                # The whole deadline is spent; nothing left to retry with
+                self.breaker.record_failure()
+                last_error = e
+                break
+            except Exception as e:
+                if not _is_transient(e):
+                    # Our request is at fault, not the provider
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                last_error = e
+                delay = self.retry_backoff * (2 ** attempt_number) * (0.5 + random.random())
+                if attempt_number == self.max_retries or loop.time() + delay >= deadline_at:
+                    break
+                self.retries += 1
+                print(f"Retrying LLM call in {delay:.2f}s after error: {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+        self.failures += 1
+        raise LLMUnavailableError(f"LLM call failed: {last_error or 'deadline exceeded'}") from last_error
+
+    async def complete(self, prompt: str, temperature: float = 0.0, deadline: Optional[float] = None) -> str:
+        """Single-turn completion; returns the answer text."""
+        async def attempt(timeout: float) -> str:
+            completion = await self._client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=self.model,
+                temperature=temperature,
+                timeout=timeout
+            )
+            return completion.choices[0].message.content
+
+        return await self._with_resilience(attempt, deadline)
+
+    async def stream(self, prompt: str, temperature: float = 0.0, deadline: Optional[float] = None) -> AsyncIterator[str]:
+        """Stream answer tokens; the deadline and retries cover the wait for the first token."""
+        async def attempt(timeout: float):
+            stream = await self._client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=self.model,
+                temperature=temperature,
+                stream=True,
+                timeout=timeout
+            )
+            tokens = _tokens(stream)
+            try:
+                first = await tokens.__anext__()
+            except StopAsyncIteration:
+                first = None
+            return first, tokens
+
+        first, tokens = await self._with_resilience(attempt, deadline)
+        if first is None:
+            return
+        yield first
+        try:
+            async for token in tokens:
+                yield token
+        except Exception as e:
+            if _is_transient(e):
+                self.breaker.record_failure()
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "breaker": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected
+        }
+
+    async def close(self):
+        await self._http.aclose()
+
+
+async def _tokens(stream) -> AsyncIterator[str]:
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content
+        if token:
+            yield token
@@ -0,0 +1,177 @@
+"""
+Async retrieval + generation pipeline shared by the chat endpoints.
+
+Nothing here blocks the event loop: query embedding and generation use the
+async SDK clients (generation through the shared LLMClient, see llm.py), and
+the synchronous Pinecone query runs on a bounded thread pool so a single
+uvicorn worker can serve many chats at once.
+
+hybrid_retrieve runs the dense search and the org's BM25 search side by side
+and merges the two rankings with reciprocal rank fusion.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+import sys
+import os
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    RETRIEVAL_K,
+    RAG_EXECUTOR_WORKERS,
+    EMBEDDING_MODEL,
+    HYBRID_RETRIEVAL_ENABLED,
+    HYBRID_CANDIDATES,
+    HYBRID_RRF_K,
+    LEXICAL_BUDGET_MS
+)
+
+from ..ingest.vectorstore import get_vectorstore
+from .embedding_cache import query_embedding_cache
+from .lexical import lexical_index
+from .llm import LLMClient
+
+# Bounded pool for SDK calls that only exist in blocking form
+_executor = ThreadPoolExecutor(max_workers=RAG_EXECUTOR_WORKERS, thread_name_prefix="rag")
+
+_llm_client: Optional[LLMClient] = None
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the RAG thread pool without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+def get_llm_client() -> LLMClient:
+    """Shared pooled LLM client (reads CEREBRAS_API_KEY from the environment)."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient()
+    return _llm_client
+
+
+async def embed_query(question: str) -> List[float]:
+    """Embed a question, served from the query embedding cache when possible."""
+    vectorstore = get_vectorstore()
+    return await query_embedding_cache.get_or_embed(
+        question,
+        EMBEDDING_MODEL,
+        vectorstore.embeddings.aembed_query
+    )
+
+
+async def retrieve(
+    question: str,
+    filter: Optional[dict] = None,
+    k: int = RETRIEVAL_K,
+    embedding: Optional[List[float]] = None,
+    namespace: Optional[str] = None
+) -> List[Tuple[Document, float]]:
+    """
+    Embed the question (unless a precomputed embedding is passed) and return
+    the top-k (document, score) pairs from `namespace` (default namespace if None).
+    """
+    vectorstore = get_vectorstore()
+
+    if embedding is None:
+        embedding = await embed_query(question)
+
+    return await run_blocking(
+        vectorstore.similarity_search_by_vector_with_score,
+        embedding,
+        k=k,
+        filter=filter,
+        namespace=namespace
+    )
+
+
+async def lexical_retrieve(
+    org_id: str,
+    question: str,
+    k: int = HYBRID_CANDIDATES,
+    document_names: Optional[List[str]] = None
+) -> List[Tuple[Document, float]]:
+    """Top-k BM25 matches among the org's registered chunks."""
+    index = await lexical_index.get(org_id)
+    return await run_blocking(index.search, question, k, document_names)
+
+
+def reciprocal_rank_fusion(rankings: List[List[Tuple[Document, float]]], k: int, rrf_k: int = HYBRID_RRF_K) -> List[Tuple[Document, float]]:
+    """
+    Merge ranked lists by sum(1 / (rrf_k + rank)); a chunk found by several
+    retrievers is kept once. Returns the top-k (document, fused score) pairs.
+    """
+    scores = {}
+    documents = {}
+    for ranking in rankings:
+        for rank, (doc, _) in enumerate(ranking, 1):
+            # Both retrievers return the chunk text, the one key they share for legacy vectors
+            key = (doc.metadata.get("document_name"), doc.page_content)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [(documents[key], scores[key]) for key in best]
+
+
+async def hybrid_retrieve(
+    org_id: str,
+    question: str,
+    filter: Optional[dict] = None,
+    document_names: Optional[List[str]] = None,
+    k: int = RETRIEVAL_K,
+    embedding: Optional[List[float]] = None,
+    namespace: Optional[str] = None
+) -> List[Tuple[Document, float]]:
+    """
+    Dense + BM25 retrieval fused by reciprocal rank. The lexical side runs
+    concurrently under a LEXICAL_BUDGET_MS deadline and is skipped (dense-only
+    results) if it misses it or fails, e.g. while the org's index is building.
+    """
+    if not HYBRID_RETRIEVAL_ENABLED:
+        return await retrieve(question, filter=filter, k=k, embedding=embedding, namespace=namespace)
+
+    lexical = asyncio.ensure_future(asyncio.wait_for(
+        lexical_retrieve(org_id, question, HYBRID_CANDIDATES, document_names),
+        timeout=LEXICAL_BUDGET_MS / 1000
+    ))
+    try:
+        dense = await retrieve(question, filter=filter, k=HYBRID_CANDIDATES, embedding=embedding, namespace=namespace)
+    except BaseException:
+        lexical.cancel()
+        raise
+
+    try:
+        lexical_results = await lexical
+    except asyncio.TimeoutError:
+        lexical_results = []
+    except Exception as e:
+        print(f"✗ Lexical retrieval failed for {org_id}: {e}")
+        lexical_results = []
+
+    return reciprocal_rank_fusion([dense, lexical_results], k)
+
+
+async def generate(prompt: str, temperature: float = 0.0) -> str:
+    """Send a single-turn prompt to the LLM and return the answer text."""
+    return await get_llm_client().complete(prompt, temperature=temperature)
+
+
+async def generate_stream(prompt: str, temperature: float = 0.0) -> AsyncIterator[str]:
+    """Stream answer tokens from the LLM as they are produced."""
+    async for token in get_llm_client().stream(prompt, temperature=temperature):
+        yield token
+
+
+async def close_pipeline():
+    """Release the shared LLM client and thread pools on shutdown."""
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.close()
+        _llm_client = None
+    _executor.shutdown(wait=False)
+    lexical_index.close()
@@ -0,0 +1,187 @@
+"""
+Second-stage reranking of retrieved chunks.
+
+First-stage retrieval (hybrid_retrieve) cheaply fetches RERANK_CANDIDATES
+chunks; a reranker then scores each (question, chunk) pair jointly and only
+the best k reach the prompt. Rerankers are pluggable (RERANKER):
+
+    cohere   Cohere Rerank API (default; uses COHERE_API_KEY)
+    local    cross-encoder run in-process (needs sentence-transformers)
+    none     keep the first-stage order
+
+Candidates are scored in RERANK_BATCH_SIZE batches, concurrently, under a
+per-request RERANK_BUDGET_MS deadline; if the reranker misses it or fails, the
+first-stage order is used so a slow reranker never stalls a chat. The reranker
+is built at startup on the RAG thread pool (loading a cross-encoder takes
+seconds), or lazily by the first request if that failed.
+"""
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+import asyncio
+import time
+import sys
+import os
+
+import httpx
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import (
+    COHERE_API_KEY,
+    RERANKER,
+    RERANK_MODEL,
+    LOCAL_RERANK_MODEL,
+    RERANK_BATCH_SIZE,
+    RERANK_BUDGET_MS
+)
+
+from .pipeline import run_blocking
+
+
+class Reranker(ABC):
+    """Scores (query, text) pairs; higher is more relevant."""
+
+    name: str
+
+    @abstractmethod
+    async def score(self, query: str, texts: Sequence[str]) -> List[float]:
+        ...
+
+    async def close(self):
+        pass
+
+
+class CohereReranker(Reranker):
+    """Cohere Rerank over a pooled async HTTP client."""
+
+    name = "cohere"
+
+    def __init__(self, api_key: Optional[str] = COHERE_API_KEY, model: str = RERANK_MODEL, base_url: Optional[str] = None):
+        import cohere
+
+        self.model = model
+        self._http = httpx.AsyncClient(timeout=httpx.Timeout(10.0))
+        options = {"base_url": base_url} if base_url else {}
+        self._client = cohere.AsyncClientV2(api_key=api_key, httpx_client=self._http, **options)
+
+    async def score(self, query: str, texts: Sequence[str]) -> List[float]:
+        response = await self._client.rerank(model=self.model, query=query, documents=list(texts), top_n=len(texts))
+        scores = [0.0] * len(texts)
+        for result in response.results:
+            scores[result.index] = result.relevance_score
+        return scores
+
+    async def close(self):
+        await self._http.aclose()
+
+
+class CrossEncoderReranker(Reranker):
+    """Small cross-encoder (MiniLM by default) run on the RAG thread pool."""
+
+    name = "local"
+
+    def __init__(self, model: str = LOCAL_RERANK_MODEL):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError("RERANKER=local requires sentence-transformers (pip install sentence-transformers)") from e
+        self._model = CrossEncoder(model)
+
+    async def score(self, query: str, texts: Sequence[str]) -> List[float]:
+        scores = await run_blocking(self._model.predict, [(query, text) for text in texts], batch_size=len(texts))
+        return [float(s) for s in scores]
+
+
+# "none" builds no reranker: rerank() keeps the first-stage order and scores
+_RERANKERS = {
+    "cohere": CohereReranker,
+    "local": CrossEncoderReranker,
+    "none": None
+}
+
+
+class RerankStage:
+    """Applies the configured reranker under the batch size and time budget."""
+
+    def __init__(self, reranker_name: str = RERANKER, batch_size: int = RERANK_BATCH_SIZE, budget_ms: int = RERANK_BUDGET_MS):
+        if reranker_name not in _RERANKERS:
+            raise ValueError(f"Unknown RERANKER {reranker_name!r}; expected one of {sorted(_RERANKERS)}")
+        self.reranker_name = reranker_name
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+        self._reranker: Optional[Reranker] = None
+        self._build_lock: Optional[asyncio.Lock] = None
+        self.reranked = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.total_ms = 0.0
+
+    async def get_reranker(self) -> Optional[Reranker]:
+        """Process-wide reranker (None for RERANKER=none), built off the event loop on first use."""
+        reranker_class = _RERANKERS[self.reranker_name]
+        if self._reranker is None and reranker_class is not None:
+            if self._build_lock is None:
+                self._build_lock = asyncio.Lock()
+            async with self._build_lock:
+                # Concurrent first requests wait for one build instead of each loading the model
+                if self._reranker is None:
+                    self._reranker = await run_blocking(reranker_class)
+        return self._reranker
+
+    async def startup(self):
+        """Build the reranker before the first chat; on failure requests retry lazily."""
+        if _RERANKERS[self.reranker_name] is None:
+            return
+        try:
+            await self.get_reranker()
+            print(f"✓ Reranker ready ({self.reranker_name})")
+        except Exception as e:
+            print(f"✗ Reranker unavailable, using first-stage order: {e}")
+
+    async def _score(self, reranker: Reranker, query: str, texts: List[str]) -> List[float]:
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        scored = await asyncio.gather(*(reranker.score(query, batch) for batch in batches))
+        return [score for batch in scored for score in batch]
+
+    async def rerank(self, query: str, results: List[Tuple[Document, float]], k: int) -> List[Tuple[Document, float]]:
+        """Best k of the first-stage `results` by reranker score; first-stage order on timeout or error."""
+        if _RERANKERS[self.reranker_name] is None or len(results) <= 1:
+            return results[:k]
+
+        started = time.perf_counter()
+        try:
+            reranker = await self.get_reranker()
+            scores = await asyncio.wait_for(
+                self._score(reranker, query, [doc.page_content for doc, _ in results]),
+                timeout=self.budget_ms / 1000
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return results[:k]
+        except Exception as e:
+            self.failures += 1
+            print(f"✗ Rerank failed, using first-stage order: {e}")
+            return results[:k]
+
+        self.reranked += 1
+        self.total_ms += (time.perf_counter() - started) * 1000
+        order = sorted(range(len(results)), key=lambda i: scores[i], reverse=True)[:k]
+        return [(results[i][0], scores[i]) for i in order]
+
+    def stats(self) -> dict:
+        return {
+            "reranker": self.reranker_name,
+            "budget_ms": self.budget_ms,
+            "reranked": self.reranked,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "avg_ms": round(self.total_ms / self.reranked, 2) if self.reranked else 0.0
+        }
+
+    async def close(self):
+        if self._reranker is not None:
+            await self._reranker.close()
+            self._reranker = None
+
+
+rerank_stage = RerankStage()
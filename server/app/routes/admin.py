@@ -4,14 +4,13 @@ import shutil
 import os
 from typing import List
 from datetime import datetime
-from collections import Counter
-import re
 
 from ..ingest.loader import load_pdf
 from ..ingest.splitter import split_documents
 from ..ingest.vectorstore import get_vectorstore
 from ..auth.firebase_auth import verify_firebase_token
-from ..db.mongodb import get_documents_collection, get_users_collection, get_queries_collection
+from ..db.mongodb import get_documents_collection, get_users_collection
+from ..db.analytics import analytics_counters
 
 router = APIRouter()
 
@@ -161,7 +160,6 @@ async def get_stats(admin_user: dict = Depends(verify_admin_access)):
         vectorstore = get_vectorstore()
         documents_collection = await get_documents_collection()
         users_collection = await get_users_collection()
-        queries_collection = await get_queries_collection()
         
         # Count documents in uploads folder
         doc_count = 0
@@ -175,7 +173,8 @@ async def get_stats(admin_user: dict = Depends(verify_admin_access)):
         # Get MongoDB stats
         total_documents = await documents_collection.count_documents({})
         total_users = await users_collection.count_documents({})
-        total_queries = await queries_collection.count_documents({})
+        # Raw queries expire (QUERY_RETENTION_DAYS); the analytics counters keep the all-time total
+        total_queries = (await analytics_counters.summary())["total_queries"]
         
         return {
             "total_documents": doc_count,
@@ -187,112 +186,3 @@ async def get_stats(admin_user: dict = Depends(verify_admin_access)):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
-
-
-@router.get("/analytics/queries")
-async def get_query_analytics(
-    limit: int = 100,
-    admin_user: dict = Depends(verify_admin_access)
-):
-    """
-    Get analytics on employee queries - shows most common questions
-    Helps HR identify confusing policies
-    Requires: Admin authentication
-    """
-    try:
-        queries_collection = await get_queries_collection()
-        
-        # Get recent queries
-        queries = await queries_collection.find().sort(
-            "timestamp", -1
-        ).limit(limit).to_list(length=limit)
-        
-        # Get query frequency (word cloud data)
-        pipeline = [
-            {"$group": {
-                "_id": "$question",
-                "count": {"$sum": 1},
-                "last_asked": {"$max": "$timestamp"}
-            }},
-            {"$sort": {"count": -1}},
-            {"$limit": 20}
-        ]
-        
-        common_queries = await queries_collection.aggregate(pipeline).to_list(length=20)
-        
-        return {
-            "recent_queries": [
-                {
-                    "question": q.get("question"),
-                    "user_email": q.get("user_email"),
-                    "timestamp": q.get("timestamp"),
-                    "has_answer": q.get("has_answer", True)
-                }
-                for q in queries
-            ],
-            "common_queries": [
-                {
-                    "question": q["_id"],
-                    "count": q["count"],
-                    "last_asked": q["last_asked"]
-                }
-                for q in common_queries
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error getting query analytics: {str(e)}"
-        )
-
-
-@router.get("/analytics/word-cloud")
-async def get_word_cloud_data(admin_user: dict = Depends(verify_admin_access)):
-    """
-    Generate word cloud data from employee queries
-    Returns word frequency for visualization
-    Requires: Admin authentication
-    """
-    try:
-        queries_collection = await get_queries_collection()
-        
-        # Get all questions
-        all_queries = await queries_collection.find(
-            {},
-            {"question": 1}
-        ).to_list(length=1000)
-        
-        # Combine all questions
-        all_text = " ".join([q.get("question", "") for q in all_queries])
-        
-        # Remove common words (stop words)
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
-            'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'should', 'could', 'may', 'might', 'must', 'can', 'i', 'you', 'we',
-            'they', 'what', 'when', 'where', 'why', 'how', 'which', 'who'
-        }
-        
-        # Extract words (alphabetic only, lowercase)
-        words = re.findall(r'\b[a-z]+\b', all_text.lower())
-        filtered_words = [w for w in words if w not in stop_words and len(w) > 3]
-        
-        # Count frequency
-        word_freq = Counter(filtered_words)
-        
-        # Get top 50 words
-        top_words = word_freq.most_common(50)
-        
-        return {
-            "words": [
-                {"text": word, "value": count}
-                for word, count in top_words
-            ],
-            "total_queries": len(all_queries)
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error generating word cloud: {str(e)}"
-        )
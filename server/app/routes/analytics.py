@@ -0,0 +1,146 @@
+"""
+Admin analytics dashboards (/admin/analytics/*).
+
+Reads precomputed results only: question and term counters maintained as
+queries are logged (app.db.analytics), hourly/daily rollups (app.db.rollups)
+for time ranges, and the recent-queries list off the timestamp index. Raw
+queries expire after QUERY_RETENTION_DAYS; only that recent list reads them,
+which is intended: totals and history come from the counters and rollups.
+"""
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from datetime import datetime, timedelta
+
+from .admin import verify_admin_access
+from ..db.mongodb import get_queries_collection
+from ..db.analytics import analytics_counters, ALL_ORGS
+from ..db.rollups import read_rollups, summarize_rollups
+
+router = APIRouter()
+
+
+@router.get("/queries")
+async def get_query_analytics(
+    limit: int = 100,
+    org_id: Optional[str] = None,
+    admin_user: dict = Depends(verify_admin_access)
+):
+    """
+    Get analytics on employee queries - shows most common questions
+    Helps HR identify confusing policies
+    Requires: Admin authentication
+    """
+    try:
+        queries_collection = await get_queries_collection()
+        
+        # Get recent queries
+        queries = await queries_collection.find(
+            {"org_id": org_id} if org_id else {}
+        ).sort("timestamp", -1).limit(limit).to_list(length=limit)
+        
+        # Question frequency and answer rate, maintained as queries are logged
+        scope = org_id or ALL_ORGS
+        common_queries = await analytics_counters.top("question", 20, scope=scope)
+        
+        return {
+            "recent_queries": [
+                {
+                    "question": q.get("question"),
+                    "user_email": q.get("user_email"),
+                    "timestamp": q.get("timestamp"),
+                    "has_answer": q.get("has_answer", True)
+                }
+                for q in queries
+            ],
+            "common_queries": [
+                {
+                    "question": q["key"],
+                    "count": q["count"],
+                    "last_asked": q.get("last_asked")
+                }
+                for q in common_queries
+            ],
+            "summary": await analytics_counters.summary(scope)
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error getting query analytics: {str(e)}"
+        )
+
+
+@router.get("/timeseries")
+async def get_query_timeseries(
+    granularity: str = "day",
+    days: int = 30,
+    org_id: Optional[str] = None,
+    admin_user: dict = Depends(verify_admin_access)
+):
+    """
+    Query volume, unanswered rate, latency percentiles and top terms per hour or day
+    Reads only the rollups, so cost does not grow with query history
+    Requires: Admin authentication
+    """
+    if granularity not in ("hour", "day"):
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+    try:
+        end = datetime.utcnow()
+        buckets = await read_rollups(granularity, end - timedelta(days=days), end, scope=org_id or ALL_ORGS)
+        return {"granularity": granularity, "buckets": buckets}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error getting query timeseries: {str(e)}"
+        )
+
+
+@router.get("/overview")
+async def get_query_overview(
+    days: int = 30,
+    org_id: Optional[str] = None,
+    admin_user: dict = Depends(verify_admin_access)
+):
+    """
+    Totals for the last `days` days merged from the daily rollups
+    Requires: Admin authentication
+    """
+    try:
+        end = datetime.utcnow()
+        start = end.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+        summary = await summarize_rollups("day", start, end, scope=org_id or ALL_ORGS)
+        return {"days": days, **summary}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error getting query overview: {str(e)}"
+        )
+
+
+@router.get("/word-cloud")
+async def get_word_cloud_data(
+    org_id: Optional[str] = None,
+    admin_user: dict = Depends(verify_admin_access)
+):
+    """
+    Generate word cloud data from employee queries
+    Returns word frequency for visualization
+    Requires: Admin authentication
+    """
+    try:
+        # Term counts are maintained as queries are logged (see app.db.analytics)
+        scope = org_id or ALL_ORGS
+        top_words = await analytics_counters.top("term", 50, scope=scope)
+        summary = await analytics_counters.summary(scope)
+        
+        return {
+            "words": [
+                {"text": word["key"], "value": word["count"]}
+                for word in top_words
+            ],
+            "total_queries": summary["total_queries"]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating word cloud: {str(e)}"
+        )
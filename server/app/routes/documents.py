@@ -1,21 +1,32 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 import shutil
+import json
 import os
+import time
 from typing import List, Optional
 from datetime import datetime
-from cerebras.cloud.sdk import Cerebras
 import sys
 
 # Import config (ensure path is correct relative to execution)
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from config import CEREBRAS_API_KEY
+from config import RETRIEVAL_K, RERANK_CANDIDATES
 
-from ..ingest.loader import load_pdf
-from ..ingest.splitter import split_documents
-from ..ingest.vectorstore import get_vectorstore
+from ..ingest.jobs import ingestion_queue
+from ..ingest.ingestor import delete_document_vectors
+from ..ingest.registry import chunk_registry
+from ..ingest.vectorstore import namespace_for
+from ..rag.pipeline import embed_query, hybrid_retrieve, generate, generate_stream, run_blocking
+from ..rag.answer_cache import answer_cache
+from ..rag.rerank import rerank_stage
+from ..rag.context import build_context
+from ..rag.llm import LLMUnavailableError
 from ..auth.firebase_auth import verify_firebase_token
-from ..db.mongodb import get_documents_collection, get_users_collection, get_queries_collection
+from ..auth.membership import membership_cache
+from ..db.mongodb import get_documents_collection
+from ..db.query_log import query_log
 from ..models.organization import RoleEnum
 
 router = APIRouter()
@@ -30,17 +41,10 @@ async def verify_org_membership(org_id: str, token_data: dict = Depends(verify_f
     Verify the user is a member of the organization.
     Returns: (user_doc, role_in_org)
     """
-    users_collection = await get_users_collection()
-    user = await users_collection.find_one({"uid": token_data["uid"]})
+    user, role = await membership_cache.get_role(token_data["uid"], org_id)
     
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-        
-    role = None
-    for r in user.get("org_roles", []):
-        if r["org_id"] == org_id:
-            role = r["role"]
-            break
             
     if not role:
         raise HTTPException(status_code=403, detail="Not a member of this organization")
@@ -77,9 +81,26 @@ class AnswerResponse(BaseModel):
     answer: str
     sources: list[SourceCitation]
 
+class IngestJobProgress(BaseModel):
+    pages_parsed: int = 0
+    chunks_created: int = 0
+    chunks_embedded: int = 0
+    vectors_upserted: int = 0
+    chunks_unchanged: int = 0
+
+class IngestJobInfo(BaseModel):
+    job_id: str
+    filename: str
+    status: str
+    stage: Optional[str] = None
+    progress: IngestJobProgress
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
 # --- Routes ---
 
-@router.post("/{org_id}/upload")
+@router.post("/{org_id}/upload", status_code=202)
 async def upload_pdf(
     org_id: str,
     file: UploadFile = File(...),
@@ -87,6 +108,8 @@ async def upload_pdf(
 ):
     """
     Upload PDF to a specific organization.
+    The file is saved and queued for background ingestion; poll
+    /{org_id}/jobs/{job_id} for progress.
     Admin only.
     """
     if not file.filename.endswith('.pdf'):
@@ -97,47 +120,24 @@ async def upload_pdf(
         org_upload_dir = os.path.join(UPLOAD_DIR, org_id)
         os.makedirs(org_upload_dir, exist_ok=True)
         
-        file_path = os.path.join(org_upload_dir, file.filename)
+        # One file per job: a queued or running job for an earlier upload keeps reading its own copy
+        job_id = ingestion_queue.new_job_id()
+        file_path = os.path.join(org_upload_dir, f"{job_id}-{file.filename}")
         
-        # Save file
-        with open(file_path, "wb") as buffer:
+        # Save file (complete before the path appears)
+        temp_path = f"{file_path}.part"
+        with open(temp_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
+        os.replace(temp_path, file_path)
         
-        # Load PDF
-        documents = load_pdf(file_path)
-        
-        # Split into chunks
-        chunks = split_documents(documents)
-        
-        # Add metadata (Crucial: Add org_id)
-        for chunk in chunks:
-            chunk.metadata["document_name"] = file.filename
-            chunk.metadata["org_id"] = org_id
-        
-        # Store in Pinecone
-        vectorstore = get_vectorstore()
-        vectorstore.add_documents(chunks)
-        
-        # Save document metadata to MongoDB
-        documents_collection = await get_documents_collection()
-        await documents_collection.insert_one({
-            "org_id": org_id, # Link to org
-            "filename": file.filename,
-            "file_path": file_path,
-            "pages": len(documents),
-            "chunks_created": len(chunks),
-            "uploaded_by": admin_user["uid"],
-            "uploaded_by_email": admin_user["email"],
-            "uploaded_at": datetime.utcnow(),
-            "status": "active"
-        })
+        # Parse, chunk, embed and store in Pinecone in the background
+        job = await ingestion_queue.submit(org_id, file.filename, file_path, admin_user, job_id=job_id)
         
         return {
-            "status": "success",
+            "status": job["status"],
+            "job_id": job["_id"],
             "filename": file.filename,
-            "pages": len(documents),
-            "chunks_created": len(chunks),
-            "message": "Document successfully ingested"
+            "message": "Document queued for ingestion"
         }
     
     except Exception as e:
@@ -146,6 +146,32 @@ async def upload_pdf(
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
 
+@router.get("/{org_id}/jobs/{job_id}", response_model=IngestJobInfo)
+async def get_ingest_job(
+    org_id: str,
+    job_id: str,
+    admin_user: dict = Depends(verify_org_admin)
+):
+    """
+    Report the status and per-stage progress of an ingestion job.
+    Admin only.
+    """
+    job = await ingestion_queue.get(org_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return IngestJobInfo(
+        job_id=job["_id"],
+        filename=job["filename"],
+        status=job["status"],
+        stage=job.get("stage"),
+        progress=IngestJobProgress(**job["progress"]),
+        error=job.get("error"),
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
+
+
 @router.get("/{org_id}/list", response_model=List[DocumentInfo])
 async def list_documents(
     org_id: str,
@@ -180,6 +206,99 @@ async def list_documents(
         raise HTTPException(status_code=500, detail=f"Error listing documents: {str(e)}")
 
 
+# --- Chat helpers ---
+
+NOT_MENTIONED = "Not mentioned in the uploaded documents."
+
+
+def _build_filter(org_id: str, request: QuestionRequest) -> Optional[dict]:
+    filter_dict = {}
+
+    # STRICTLY scope to the org: its own namespace, or an org_id filter in the shared one
+    if namespace_for(org_id) is None:
+        filter_dict["org_id"] = org_id
+
+    if request.document_filter:
+        filter_dict["document_name"] = {"$in": request.document_filter}
+
+    return filter_dict or None
+
+
+async def _retrieve_context(org_id: str, request: QuestionRequest, embedding: List[float]):
+    """Two-stage retrieval: RERANK_CANDIDATES from hybrid search, the best RETRIEVAL_K after reranking."""
+    candidates = await hybrid_retrieve(
+        org_id,
+        request.question,
+        filter=_build_filter(org_id, request),
+        document_names=request.document_filter,
+        k=RERANK_CANDIDATES,
+        embedding=embedding,
+        namespace=namespace_for(org_id)
+    )
+    return await rerank_stage.rerank(request.question, candidates, RETRIEVAL_K)
+
+
+def _build_prompt(results, role: str, question: str):
+    """
+    Turn retrieved chunks into the grounded prompt and its source citations.
+    Returns: (prompt, sources)
+    """
+    context_parts = []
+    sources = []
+
+    # Overlapping chunks of a page are merged; block N is [Source N]
+    for idx, block in enumerate(build_context(results), 1):
+        context_parts.append(f"[Source {idx}]\n{block.text}\n")
+        sources.append(SourceCitation(
+            page=block.page,
+            content=block.text[:200] + "..." if len(block.text) > 200 else block.text,
+            document_name=block.document_name
+        ))
+
+    context = "\n".join(context_parts)
+
+    # Grounded Prompt
+    prompt = f"""You are a helpful assistant for {role}s at their organization. Answer the question ONLY using the provided context below.
+
+CRITICAL RULES:
+- If the answer is not in the context, say "{NOT_MENTIONED}"
+- Always cite which source ([Source 1], [Source 2]) you used.
+- Be concise.
+
+CONTEXT:
+{context}
+
+QUESTION: {question}
+
+ANSWER:"""
+
+    return prompt, sources
+
+
+def _cache_scope(role: str, request: QuestionRequest) -> tuple:
+    # The prompt depends on the role and the document filter, not only the question
+    return (role, tuple(sorted(request.document_filter or [])))
+
+
+async def _log_query(org_id: str, user: dict, question: str, answer: str, started: float, cache_hit: bool = False):
+    # Buffered; written in batches off the request path
+    await query_log.log({
+        "org_id": org_id,
+        "question": question,
+        "answer": answer,
+        "user_uid": user["uid"],
+        "has_answer": "Not mentioned" not in answer,
+        "cache_hit": cache_hit,
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        "timestamp": datetime.utcnow()
+    })
+
+
+def _sse_event(event: str, data) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post("/{org_id}/chat", response_model=AnswerResponse)
 async def ask_question(
     org_id: str,
@@ -190,86 +309,133 @@ async def ask_question(
     Ask a question within the organization context.
     """
     user, role = membership_info
+    started = time.perf_counter()
     
     try:
-        vectorstore = get_vectorstore()
-        
-        # Build filter: STRICTLY filter by org_id
-        filter_dict = {"org_id": org_id}
-        
-        if request.document_filter:
-            filter_dict["document_name"] = {"$in": request.document_filter}
-            
-        results = vectorstore.similarity_search_with_score(
-            request.question,
-            k=3,
-            filter=filter_dict
-        )
+        embedding = await embed_query(request.question)
+        scope = _cache_scope(role, request)
+
+        # Repeated (or near-duplicate) question against an unchanged corpus
+        # Read before retrieval: an answer is only cached if the corpus is unchanged when it's done
+        corpus_version = await answer_cache.corpus_version(org_id)
+        cached = await answer_cache.lookup(org_id, request.question, embedding, scope)
+        if cached:
+            response = AnswerResponse(**cached[0])
+            await _log_query(org_id, user, request.question, response.answer, started, cache_hit=True)
+            return response
+
+        results = await _retrieve_context(org_id, request, embedding)
 
         if not results:
             return AnswerResponse(
-                answer="Not mentioned in the uploaded documents.",
+                answer=NOT_MENTIONED,
                 sources=[]
             )
 
-        # Prepare context
-        context_parts = []
-        sources = []
-
-        for idx, (doc, score) in enumerate(results, 1):
-            context_parts.append(f"[Source {idx}]\n{doc.page_content}\n")
-            sources.append(SourceCitation(
-                page=doc.metadata.get("page", 0),
-                content=doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
-                document_name=doc.metadata.get("document_name", "Unknown")
-            ))
-
-        context = "\n".join(context_parts)
-
-        # Grounded Prompt
-        prompt = f"""You are a helpful assistant for {role}s at their organization. Answer the question ONLY using the provided context below.
-
-CRITICAL RULES:
-- If the answer is not in the context, say "Not mentioned in the uploaded documents."
-- Always cite which source ([Source 1], [Source 2]) you used.
-- Be concise.
-
-CONTEXT:
-{context}
-
-QUESTION: {request.question}
-
-ANSWER:"""
+        prompt, sources = _build_prompt(results, role, request.question)
 
         # Call Cerebras
-        client = Cerebras()
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b",
-            temperature=0.0
-        )
-
-        answer = chat_completion.choices[0].message.content
+        answer = await generate(prompt)
         
         # Log query
-        queries_collection = await get_queries_collection()
-        await queries_collection.insert_one({
-            "org_id": org_id,
-            "question": request.question,
-            "answer": answer,
-            "user_uid": user["uid"],
-            "has_answer": "Not mentioned" not in answer,
-            "timestamp": datetime.utcnow()
-        })
-
-        return AnswerResponse(
+        await _log_query(org_id, user, request.question, answer, started)
+
+        response = AnswerResponse(
             answer=answer,
             sources=sources
         )
+        await answer_cache.store(org_id, request.question, embedding, scope, response.model_dump(), corpus_version)
+
+        return response
 
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         import traceback
         print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
+
+
+@router.post("/{org_id}/chat/stream")
+async def ask_question_stream(
+    org_id: str,
+    request: QuestionRequest,
+    membership_info: tuple = Depends(verify_org_membership)
+):
+    """
+    Streaming variant of /chat using server-sent events.
+    Emits `sources` (citations), then `token` events as the answer is generated,
+    then `done` with the complete answer. The query is logged after the stream closes.
+    """
+    user, role = membership_info
+    scope = _cache_scope(role, request)
+    started = time.perf_counter()
+
+    try:
+        embedding = await embed_query(request.question)
+        # Read before retrieval: an answer is only cached if the corpus is unchanged when it's done
+        corpus_version = await answer_cache.corpus_version(org_id)
+        cached = await answer_cache.lookup(org_id, request.question, embedding, scope)
+        results = None
+        if not cached:
+            results = await _retrieve_context(org_id, request, embedding)
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
+
+    # Filled in by the generator, read by the logging task once the response is sent
+    state = {"answer": None, "cache_hit": bool(cached)}
+
+    async def event_stream():
+        if cached:
+            response = AnswerResponse(**cached[0])
+            yield _sse_event("sources", [s.model_dump() for s in response.sources])
+            yield _sse_event("token", {"text": response.answer})
+            state["answer"] = response.answer
+            yield _sse_event("done", response.model_dump())
+            return
+
+        if not results:
+            yield _sse_event("sources", [])
+            yield _sse_event("done", AnswerResponse(answer=NOT_MENTIONED, sources=[]).model_dump())
+            return
+
+        prompt, sources = _build_prompt(results, role, request.question)
+        yield _sse_event("sources", [s.model_dump() for s in sources])
+
+        answer_parts = []
+        try:
+            async for token in generate_stream(prompt):
+                answer_parts.append(token)
+                yield _sse_event("token", {"text": token})
+        except LLMUnavailableError as e:
+            yield _sse_event("error", {"detail": str(e)})
+            return
+        except Exception as e:
+            import traceback
+            print(traceback.format_exc())
+            yield _sse_event("error", {"detail": f"Error generating answer: {str(e)}"})
+            return
+
+        answer = "".join(answer_parts)
+        state["answer"] = answer
+        response = AnswerResponse(answer=answer, sources=sources)
+        await answer_cache.store(org_id, request.question, embedding, scope, response.model_dump(), corpus_version)
+        yield _sse_event("done", response.model_dump())
+
+    async def log_completed_stream():
+        if state["answer"] is not None:
+            await _log_query(org_id, user, request.question, state["answer"], started, cache_hit=state["cache_hit"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(log_completed_stream)
+    )
+
+
 @router.delete("/{org_id}/{filename}")
 async def delete_document(
     org_id: str,
@@ -283,28 +449,32 @@ async def delete_document(
     try:
         documents_collection = await get_documents_collection()
         
-        # Verify document belongs to org
-        doc = await documents_collection.find_one({
-            "org_id": org_id,
-            "filename": filename
-        })
-        
-        if not doc:
-            raise HTTPException(status_code=404, detail="Document not found")
+        async with ingestion_queue.document_lock(org_id, filename):
+            # Verify document belongs to org (read under the lock: a finishing job may have swapped its file)
+            doc = await documents_collection.find_one({
+                "org_id": org_id,
+                "filename": filename
+            })
             
-        # 1. Delete from Pinecone
-        # Note: Deleting by metadata might require specific index configuration or SDK calls.
-        # We will attempt best effort or skip if complex for now to avoid SDK crashes.
-        # In a production app, we would store vector IDs or use delete_by_metadata.
-        
-        # 2. Delete from MongoDB
-        await documents_collection.delete_one({"_id": doc["_id"]})
-        
-        # 3. Delete file from Disk
-        if "file_path" in doc and os.path.exists(doc["file_path"]):
-            os.remove(doc["file_path"])
+            if not doc:
+                raise HTTPException(status_code=404, detail="Document not found")
+            
+            # 1. Delete the document's vectors (batched by ID from the chunk registry)
+            vector_ids = list(await chunk_registry.load(org_id, filename))
+            await run_blocking(delete_document_vectors, org_id, filename, vector_ids)
+            await chunk_registry.remove(org_id, filename)
+
+            # 2. Delete from MongoDB
+            await documents_collection.delete_many({"org_id": org_id, "filename": filename})
+            await answer_cache.invalidate(org_id)
+
+            # 3. Delete the ingested version's file from Disk (queued re-uploads have their own)
+            if "file_path" in doc and os.path.exists(doc["file_path"]):
+                os.remove(doc["file_path"])
             
         return {"status": "success", "message": f"Document {filename} deleted"}
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
@@ -1,19 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from cerebras.cloud.sdk import Cerebras
-import sys
-import os
+import time
 from datetime import datetime
+from typing import Optional
 
-sys.path.insert(
-    0,
-    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-)
-
-from config import CEREBRAS_API_KEY
-from ..ingest.vectorstore import get_vectorstore
+from ..ingest.vectorstore import namespace_for
+from ..rag.pipeline import retrieve, generate
+from ..rag.llm import LLMUnavailableError
 from ..auth.firebase_auth import verify_firebase_token
-from ..db.mongodb import get_queries_collection, get_users_collection
+from ..db.mongodb import get_users_collection
+from ..db.query_log import query_log
 
 router = APIRouter()
 
@@ -35,6 +31,23 @@ class AnswerResponse(BaseModel):
     sources: list[SourceCitation]
 
 
+def _user_namespace(user: Optional[dict]) -> Optional[str]:
+    """
+    Namespace to search for a user of this org-less route. With per-org
+    namespaces (PINECONE_NAMESPACE_MODE=per_org or the local backend) that is
+    the user's org, so it only works for members of exactly one org.
+    """
+    org_ids = [role["org_id"] for role in (user or {}).get("org_roles", [])]
+    if not org_ids or namespace_for(org_ids[0]) is None:
+        return None
+    if len(org_ids) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="You belong to several organizations; ask through /documents/{org_id}/chat instead"
+        )
+    return namespace_for(org_ids[0])
+
+
 @router.post("/ask", response_model=AnswerResponse)
 async def ask_question(
     request: QuestionRequest,
@@ -47,33 +60,28 @@ async def ask_question(
     3. Returns answer with source citations
     Requires: User authentication
     """
+    started = time.perf_counter()
     try:
         # Get user info for logging
         users_collection = await get_users_collection()
         user = await users_collection.find_one({"uid": token_data["uid"]})
         
         # Step 1: Retrieve relevant chunks
-        vectorstore = get_vectorstore()
-        
         # Build filter if provided
-        search_kwargs = {"k": 3}
+        search_filter = None
         if request.document_filter:
-            search_kwargs["filter"] = {"document_name": {"$in": request.document_filter}}
+            search_filter = {"document_name": {"$in": request.document_filter}}
             
-        results = vectorstore.similarity_search_with_score(
-            request.question,
-            k=3,  # Top 3 most relevant chunks
-            filter=search_kwargs.get("filter")
-        )
+        results = await retrieve(request.question, filter=search_filter, namespace=_user_namespace(user))
 
         if not results:
             # Log query with no answer
-            queries_collection = await get_queries_collection()
-            await queries_collection.insert_one({
+            await query_log.log({
                 "question": request.question,
                 "user_uid": token_data["uid"],
                 "user_email": user.get("email") if user else "unknown",
                 "has_answer": False,
+                "latency_ms": (time.perf_counter() - started) * 1000,
                 "timestamp": datetime.utcnow()
             })
             
@@ -113,32 +121,18 @@ QUESTION: {request.question}
 
 ANSWER:"""
 
-        # Step 4: Call Cerebras LLM
-        # Cerebras SDK reads CEREBRAS_API_KEY from environment automatically
-        client = Cerebras()
-
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model="llama-3.3-70b",
-            temperature=0.0  # No creativity - stick to facts
-        )
-
-        answer = chat_completion.choices[0].message.content
+        # Step 4: Call Cerebras LLM (shared async client, temperature 0 - stick to facts)
+        answer = await generate(prompt)
         
         # Log successful query
-        queries_collection = await get_queries_collection()
-        await queries_collection.insert_one({
+        await query_log.log({
             "question": request.question,
             "answer": answer,
             "user_uid": token_data["uid"],
             "user_email": user.get("email") if user else "unknown",
             "has_answer": True,
             "sources_count": len(sources),
+            "latency_ms": (time.perf_counter() - started) * 1000,
             "timestamp": datetime.utcnow()
         })
 
@@ -147,6 +141,10 @@ ANSWER:"""
             sources=sources
         )
 
+    except HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
 
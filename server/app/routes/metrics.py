@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+
+from ..rag.embedding_cache import query_embedding_cache
+from ..rag.answer_cache import answer_cache
+from ..rag.lexical import lexical_index
+from ..rag.rerank import rerank_stage
+from ..rag.pipeline import get_llm_client
+from ..auth.firebase_auth import verify_admin
+from ..auth.membership import membership_cache
+from ..auth.token_cache import token_cache
+from ..db.query_log import query_log
+from ..db.analytics import analytics_counters
+from ..db.rollups import query_rollups
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics(token_data: dict = Depends(verify_admin)):
+    """
+    In-process cache and client counters for this worker (admin only).
+    """
+    return {
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "lexical_index": lexical_index.stats(),
+        "rerank": rerank_stage.stats(),
+        "llm": get_llm_client().stats(),
+        "membership_cache": membership_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "query_log": query_log.stats(),
+        "analytics": analytics_counters.stats(),
+        "query_rollups": query_rollups.stats()
+    }
@@ -2,10 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List
 from datetime import datetime
 import uuid
-from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from ..auth.firebase_auth import verify_firebase_token
+from ..auth.membership import membership_cache
 from ..db.mongodb import get_users_collection, get_organizations_collection
+from ..db.lookups import find_by_ids
 from ..models.organization import (
     Organization, OrganizationCreate, JoinOrganizationRequest, OrganizationResponse, RoleEnum
 )
@@ -13,6 +15,8 @@ from ..models.user import UserOrgRole
 
 router = APIRouter()
 
+ORG_CODE_ATTEMPTS = 5
+
 @router.post("", response_model=OrganizationResponse)
 async def create_organization(
     org_data: OrganizationCreate,
@@ -28,19 +32,25 @@ async def create_organization(
         
         user_uid = token_data["uid"]
         
-        # Generate a unique 6-character code
-        org_code = str(uuid.uuid4())[:6].upper()
-        
-        # Create Org Document
-        new_org = {
-            "name": org_data.name,
-            "code": org_code,
-            "created_by": user_uid,
-            "created_at": datetime.utcnow(),
-            "members": [user_uid] # List of member UIDs
-        }
-        
-        result = await orgs_collection.insert_one(new_org)
+        # Generate a unique 6-character code (the unique index on code rejects collisions)
+        for attempt in range(ORG_CODE_ATTEMPTS):
+            org_code = str(uuid.uuid4())[:6].upper()
+            
+            # Create Org Document
+            new_org = {
+                "name": org_data.name,
+                "code": org_code,
+                "created_by": user_uid,
+                "created_at": datetime.utcnow(),
+                "members": [user_uid] # List of member UIDs
+            }
+            
+            try:
+                result = await orgs_collection.insert_one(new_org)
+                break
+            except DuplicateKeyError:
+                if attempt == ORG_CODE_ATTEMPTS - 1:
+                    raise
         org_id = str(result.inserted_id)
         
         # Update User's Org Roles
@@ -53,6 +63,7 @@ async def create_organization(
             {"uid": user_uid},
             {"$push": {"org_roles": new_role.dict()}}
         )
+        membership_cache.invalidate(user_uid)
         
         return OrganizationResponse(
             id=org_id,
@@ -110,6 +121,7 @@ async def join_organization(
             {"uid": user_uid},
             {"$push": {"org_roles": new_role.dict()}}
         )
+        membership_cache.invalidate(user_uid)
         
         return OrganizationResponse(
             id=org_id,
@@ -140,9 +152,15 @@ async def list_user_organizations(
         if not user or "org_roles" not in user:
             return []
             
+        # One $in query for all memberships, joined in memory
+        orgs = await find_by_ids(
+            orgs_collection,
+            (user_role["org_id"] for user_role in user["org_roles"]),
+            projection={"name": 1, "code": 1}
+        )
         org_responses = []
         for user_role in user["org_roles"]:
-            org = await orgs_collection.find_one({"_id": ObjectId(user_role["org_id"])})
+            org = orgs.get(user_role["org_id"])
             if org:
                 # include code only if admin? spec doesn't strictly say, but usually admins handle invites/codes.
                 # Use simplified logic: return code if user is ADMIN.
@@ -169,16 +187,8 @@ async def get_org_dashboard(
     Get dashboard info and verify access/role.
     """
     try:
-        users_collection = await get_users_collection()
-        
-        user = await users_collection.find_one({"uid": token_data["uid"]})
-        
         # Check membership and get role
-        role = None
-        for r in user.get("org_roles", []):
-            if r["org_id"] == org_id:
-                role = r["role"]
-                break
+        user, role = await membership_cache.get_role(token_data["uid"], org_id)
         
         if not role:
             raise HTTPException(status_code=403, detail="Not a member of this organization")
@@ -0,0 +1,88 @@
+"""
+Dashboard analytics benchmark: recomputing from the query history on every
+load vs reading the incremental counters in app.db.analytics.
+
+For growing query histories, reports the documents each approach reads per
+dashboard load and the time to compute the common-questions and word-cloud
+results, plus the write-side price of the counters: the upserts and time
+needed to fold one query-log batch.
+
+Usage:
+    python benchmarks/analytics.py --history 10000 100000 1000000 --batch-size 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.analytics import AnalyticsCounters, question_terms
+
+TOPICS = ["vacation", "parental leave", "expense report", "remote work", "health insurance",
+          "laptop refresh", "travel per diem", "overtime pay", "dress code", "parking permit"]
+FORMS = ["How many days of {} do I get?", "What is the policy on {}?", "Who approves {}?",
+         "Is {} different for contractors?", "Where do I submit {} requests?"]
+
+
+def make_queries(count, orgs=20):
+    random.seed(0)
+    return [{
+        "org_id": f"org{random.randrange(orgs)}",
+        "question": random.choice(FORMS).format(random.choice(TOPICS)),
+        "has_answer": random.random() > 0.1,
+        "timestamp": datetime.utcnow()
+    } for _ in range(count)]
+
+
+def recompute(queries):
+    """What the dashboards did per load: $group over every question, word cloud over the last 1000."""
+    common = Counter(q["question"] for q in queries).most_common(20)
+    words = Counter(w for q in queries[-1000:] for w in question_terms(q["question"])).most_common(50)
+    return common, words
+
+
+def fold(batches):
+    """Apply counter upserts the way MongoDB would, keeping scope/kind/key -> count."""
+    counters = Counter()
+    for operations in batches:
+        for op in operations:
+            spec = op._filter
+            for field, amount in op._doc["$inc"].items():
+                counters[(spec["scope"], spec["kind"], spec["key"], field)] += amount
+    return counters
+
+
+def main(args):
+    print(f"batch size={args.batch_size}\n")
+    for history in args.history:
+        queries = make_queries(history)
+
+        start = time.perf_counter()
+        recompute(queries)
+        recompute_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        batches = [AnalyticsCounters._operations(queries[i:i + args.batch_size]) for i in range(0, history, args.batch_size)]
+        fold_ms = (time.perf_counter() - start) * 1000 / len(batches)
+        upserts = sum(len(ops) for ops in batches) / len(batches)
+
+        counters = fold(batches)
+        questions = {key: n for (scope, kind, key, field), n in counters.items() if scope == "_all" and kind == "question"}
+        assert dict(Counter(q["question"] for q in queries).most_common(20)) == dict(Counter(questions).most_common(20))
+
+        print(f"  history={history:<8}  recompute: reads={history:<8} {recompute_ms:8.1f}ms   "
+              f"counters: reads={20 + 50 + 1:<3} (top questions + top terms + summary)   "
+              f"write side: {upserts:5.0f} upserts / {fold_ms:5.2f}ms per batch")
+
+    print("\n✓ Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--batch-size", type=int, default=500, help="Query log entries per flush")
+    main(parser.parse_args())
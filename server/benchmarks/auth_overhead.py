@@ -0,0 +1,135 @@
+"""
+Microbenchmark of per-request auth overhead using a locally generated RSA key
+pair and Firebase-shaped RS256 ID tokens (no network, no Firebase project).
+
+Measures:
+  - inline: verifying the signature on every request, on the event loop (old path)
+  - cached: app.auth.token_cache.VerifiedTokenCache (verify once, then reuse until exp)
+and the worst event-loop stall while a burst of first-time tokens is verified.
+
+Usage:
+    python benchmarks/auth_overhead.py --requests 5000 --users 50
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# Loaded by path: importing the app.auth package initializes the Firebase Admin
+# SDK, which needs the service-account file this benchmark is meant to run without.
+_spec = importlib.util.spec_from_file_location(
+    "token_cache",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "auth", "token_cache.py")
+)
+token_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(token_cache)
+VerifiedTokenCache = token_cache.VerifiedTokenCache
+
+PROJECT_ID = "bench-project"
+
+
+def make_keys():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key, private_key.public_key()
+
+
+def make_token(private_key, uid):
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": uid,
+        "iat": now,
+        "exp": now + 3600,
+        "email": f"{uid}@example.com"
+    }
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": "bench"})
+
+
+def make_verifier(public_key):
+    def verify(token):
+        claims = jwt.decode(
+            token,
+            public_key,
+            algorithms=["RS256"],
+            audience=PROJECT_ID,
+            issuer=f"https://securetoken.google.com/{PROJECT_ID}"
+        )
+        claims["uid"] = claims["sub"]
+        return claims
+    return verify
+
+
+async def measure_lag(stop: asyncio.Event, samples: list, interval=0.001):
+    """Record how late a 1ms timer fires while other work runs."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def burst(handler, tokens):
+    stop = asyncio.Event()
+    lag = []
+    monitor = asyncio.create_task(measure_lag(stop, lag))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(token) for token in tokens))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+    return elapsed, max(lag) if lag else 0.0
+
+
+async def main(args):
+    private_key, public_key = make_keys()
+    verify = make_verifier(public_key)
+    tokens = [make_token(private_key, f"user-{i}") for i in range(args.users)]
+    traffic = [tokens[i % len(tokens)] for i in range(args.requests)]
+
+    print(f"{args.requests} requests from {args.users} users (RS256, 2048-bit key)")
+
+    # Inline verification on every request (the old dependency)
+    async def inline(token):
+        return verify(token)
+
+    start = time.perf_counter()
+    for token in traffic:
+        await inline(token)
+    inline_us = (time.perf_counter() - start) / len(traffic) * 1e6
+    print(f"inline    {inline_us:8.1f} µs/request")
+
+    cache = VerifiedTokenCache()
+
+    async def cached(token):
+        return await cache.verify(token, verify)
+
+    start = time.perf_counter()
+    for token in traffic:
+        await cached(token)
+    cached_us = (time.perf_counter() - start) / len(traffic) * 1e6
+    print(f"cached    {cached_us:8.1f} µs/request  ({cache.stats()['hit_rate']:.1%} hit rate)")
+    print(f"✓ Auth overhead reduced {inline_us / cached_us:.1f}x")
+
+    # Event-loop stall while first-time tokens are verified concurrently
+    fresh = [make_token(private_key, f"fresh-{i}") for i in range(args.users)]
+    _, inline_lag = await burst(inline, fresh)
+    _, thread_lag = await burst(lambda token: VerifiedTokenCache().verify(token, verify), fresh)
+    print(f"max loop stall, {args.users} cold tokens: inline={inline_lag * 1000:.1f}ms  "
+          f"off-loop={thread_lag * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
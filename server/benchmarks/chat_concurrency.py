@@ -0,0 +1,158 @@
+"""
+Load benchmark for the chat pipeline using local stub backends.
+
+Compares the old request path (blocking vector search + blocking LLM call inside
+an async handler) with app.rag.pipeline (async embed/generate, vector search on a
+bounded thread pool) when many chats arrive on one event loop at once.
+
+Usage:
+    python benchmarks/chat_concurrency.py --requests 200 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from app.ingest.vectorstore import vectorstore_manager
+from app.rag import pipeline
+
+
+class StubEmbeddings:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return [0.0] * 8
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.latency)
+        return [0.0] * 8
+
+
+class StubVectorStore:
+    """Pinecone stand-in: the SDK query call is synchronous, so it sleeps."""
+
+    def __init__(self, embed_latency, search_latency):
+        self.embeddings = StubEmbeddings(embed_latency)
+        self.search_latency = search_latency
+
+    def _results(self, k):
+        return [
+            (Document(page_content=f"Policy text {i}", metadata={"page": i, "document_name": "stub.pdf"}), 0.9)
+            for i in range(k)
+        ]
+
+    def similarity_search_with_score(self, query, k=3, filter=None):
+        self.embeddings.embed_query(query)
+        time.sleep(self.search_latency)
+        return self._results(k)
+
+    def similarity_search_by_vector_with_score(self, embedding, k=3, filter=None):
+        time.sleep(self.search_latency)
+        return self._results(k)
+
+
+def _completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class StubBlockingLLM:
+    def __init__(self, latency):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        return _completion("Stub answer [Source 1]")
+
+
+class StubAsyncLLM:
+    def __init__(self, latency):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return _completion("Stub answer [Source 1]")
+
+    async def close(self):
+        pass
+
+
+async def blocking_chat(store, llm, question):
+    """The pre-pipeline handler body: sync SDK calls inside async def."""
+    results = store.similarity_search_with_score(question, k=3, filter={"org_id": "bench"})
+    context = "\n".join(doc.page_content for doc, _ in results)
+    return llm.chat.completions.create(messages=[{"role": "user", "content": context}])
+
+
+async def pipeline_chat(question):
+    results = await pipeline.retrieve(question, filter={"org_id": "bench"})
+    context = "\n".join(doc.page_content for doc, _ in results)
+    return await pipeline.generate(context)
+
+
+async def run_load(handler, n_requests):
+    latencies = []
+
+    async def one(i):
+        start = time.perf_counter()
+        await handler(f"question {i}")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "wall_s": wall,
+        "throughput_rps": n_requests / wall,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000
+    }
+
+
+def report(name, stats):
+    print(
+        f"{name:<10} wall={stats['wall_s']:.2f}s  "
+        f"throughput={stats['throughput_rps']:.1f} req/s  "
+        f"p50={stats['p50_ms']:.0f}ms  p99={stats['p99_ms']:.0f}ms"
+    )
+
+
+async def main(args):
+    store = StubVectorStore(args.embed_latency, args.search_latency)
+    vectorstore_manager.vectorstore = store
+    pipeline._llm_client = StubAsyncLLM(args.llm_latency)
+    blocking_llm = StubBlockingLLM(args.llm_latency)
+
+    print(f"{args.requests} concurrent chats, embed={args.embed_latency}s "
+          f"search={args.search_latency}s llm={args.llm_latency}s")
+
+    # The blocking path serialises everything, so keep its sample small
+    baseline_n = min(args.requests, args.baseline_requests)
+    baseline = await run_load(lambda q: blocking_chat(store, blocking_llm, q), baseline_n)
+    report(f"blocking({baseline_n})", baseline)
+
+    async_stats = await run_load(pipeline_chat, args.requests)
+    report(f"pipeline({args.requests})", async_stats)
+
+    print(f"✓ Throughput gain: {async_stats['throughput_rps'] / baseline['throughput_rps']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--baseline-requests", type=int, default=20)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.03)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,119 @@
+"""
+Local fake LLM server for benchmarks.
+
+Serves an OpenAI-compatible /v1/chat/completions endpoint (what the Cerebras
+SDK calls) on localhost, streaming or not, with configurable latency and
+injected errors. The config can be changed while the server runs to simulate
+an outage and a recovery.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+
+
+class FakeLLMConfig:
+    def __init__(self, latency=0.2, token_delay=0.005, tokens=20, error_rate=0.0, error_status=503):
+        self.latency = latency  # Seconds before the first byte
+        self.token_delay = token_delay  # Seconds between streamed tokens
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data: str):
+        encoded = data.encode()
+        self.wfile.write(f"{len(encoded):x}\r\n".encode() + encoded + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        config = self.server.config
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.stats["requests"] += 1
+
+        if not self.path.endswith("/chat/completions"):
+            self._reply(404, {"error": "not found"})
+            return
+
+        time.sleep(config.latency)
+        if random.random() < config.error_rate:
+            self.server.stats["errors"] += 1
+            self._reply(config.error_status, {"error": {"message": "injected failure"}})
+            return
+
+        words = [f"word{i} " for i in range(config.tokens)]
+        base = {
+            "id": "fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload["model"],
+            "system_fingerprint": "fake"
+        }
+
+        if not payload.get("stream"):
+            time.sleep(config.token_delay * config.tokens)
+            self._reply(200, {
+                **base,
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "".join(words)}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": config.tokens, "total_tokens": config.tokens + 1}
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for word in words:
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+            self._chunk(f"data: {json.dumps(chunk)}\n\n")
+            time.sleep(config.token_delay)
+        self._chunk("data: [DONE]\n\n")
+        self._chunk("")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for a burst of new connections (the default backlog of 5 drops SYNs)
+    request_queue_size = 256
+
+
+class FakeLLMServer:
+    """Context manager that serves the fake LLM on a free localhost port."""
+
+    def __init__(self, config: FakeLLMConfig):
+        self.httpd = _Server(("127.0.0.1", 0), _Handler)
+        self.httpd.config = config
+        self.httpd.stats = {"requests": 0, "errors": 0}
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def config(self):
+        return self.httpd.config
+
+    @property
+    def stats(self):
+        return self.httpd.stats
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,126 @@
+"""
+Local fake embedding / vector index server for benchmarks.
+
+Runs a threaded HTTP server on localhost that imitates the latency (and,
+optionally, the transient errors) of Cohere embed and Pinecone upsert calls,
+plus thin clients exposing the same methods the ingestion code uses.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+
+import requests
+
+
+class FakeServiceConfig:
+    def __init__(self, embed_latency=0.15, embed_per_text=0.001, upsert_latency=0.05, error_rate=0.0, dimension=8):
+        self.embed_latency = embed_latency
+        self.embed_per_text = embed_per_text
+        self.upsert_latency = upsert_latency
+        self.error_rate = error_rate
+        self.dimension = dimension
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        config = self.server.config
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        if random.random() < config.error_rate:
+            self._reply(503, {"error": "injected failure"})
+            return
+
+        if self.path == "/embed":
+            texts = payload["texts"]
+            time.sleep(config.embed_latency + config.embed_per_text * len(texts))
+            self.server.stats["embed_calls"] += 1
+            self._reply(200, {"embeddings": [[random.random() for _ in range(config.dimension)] for _ in texts]})
+        elif self.path == "/upsert":
+            time.sleep(config.upsert_latency)
+            self.server.stats["upsert_calls"] += 1
+            self.server.stats["vectors"] += len(payload["vectors"])
+            self._reply(200, {"upserted_count": len(payload["vectors"])})
+        elif self.path in ("/update", "/delete"):
+            time.sleep(config.upsert_latency)
+            self.server.stats[f"{self.path[1:]}_calls"] += 1
+            self._reply(200, {})
+        else:
+            self._reply(404, {"error": "not found"})
+
+
+class FakeServiceServer:
+    """Context manager that serves the fake endpoints on a free localhost port."""
+
+    def __init__(self, config: FakeServiceConfig):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = config
+        self.httpd.stats = {"embed_calls": 0, "upsert_calls": 0, "update_calls": 0, "delete_calls": 0, "vectors": 0}
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def stats(self):
+        return self.httpd.stats
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeEmbeddings:
+    """Client with the CohereEmbeddings methods used by ingestion."""
+
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()
+
+    def embed_documents(self, texts):
+        response = self.session.post(f"{self.url}/embed", json={"texts": texts})
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class FakeIndex:
+    """Client with the Pinecone Index upsert / update / delete signatures used by ingestion."""
+
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()
+
+    def upsert(self, vectors, namespace=None, **kwargs):
+        response = self.session.post(f"{self.url}/upsert", json={"vectors": vectors, "namespace": namespace})
+        response.raise_for_status()
+        return response.json()
+
+    def update(self, id, set_metadata=None, namespace=None, **kwargs):
+        response = self.session.post(f"{self.url}/update", json={"id": id, "set_metadata": set_metadata})
+        response.raise_for_status()
+        return response.json()
+
+    def delete(self, ids=None, namespace=None, **kwargs):
+        response = self.session.post(f"{self.url}/delete", json={"ids": ids, "namespace": namespace})
+        response.raise_for_status()
+        return response.json()
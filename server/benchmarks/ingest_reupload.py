@@ -0,0 +1,69 @@
+"""
+Re-upload benchmark for content-hash deduplication: ingests a generated
+handbook, then re-ingests a revision with a few pages edited, against the local
+fake embedding / vector server in benchmarks/fake_services.py.
+
+The chunk registry normally lives in MongoDB; here the first run's result is
+passed straight back to ingest_pdf as the registered chunks.
+
+Usage:
+    python benchmarks/ingest_reupload.py --pages 300 --edited 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingest.ingestor import ingest_pdf
+from app.ingest.loader import shutdown_loader_pool
+from app.ingest.vectorstore import vectorstore_manager
+from benchmarks.fake_services import FakeEmbeddings, FakeIndex, FakeServiceConfig, FakeServiceServer
+from benchmarks.pdf_fixtures import page_text, write_pdf
+
+
+def run(name, server, path, existing):
+    embed_calls = server.stats["embed_calls"]
+    start = time.perf_counter()
+    result = ingest_pdf("bench", "handbook.pdf", path, existing)
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:<10} {result['chunks_created']} chunks  embedded={len(result['changed'])}  "
+          f"unchanged={result['chunks_unchanged']}  removed={len(result['removed'])}  "
+          f"embed calls={server.stats['embed_calls'] - embed_calls}  {elapsed:.2f}s")
+    return result, elapsed
+
+
+def main(args):
+    config = FakeServiceConfig(embed_latency=args.embed_latency, upsert_latency=args.upsert_latency)
+
+    with tempfile.TemporaryDirectory() as tmp, FakeServiceServer(config) as server:
+        vectorstore_manager.embeddings = FakeEmbeddings(server.url)
+        vectorstore_manager.index = FakeIndex(server.url)
+        vectorstore_manager.startup = lambda: None
+
+        path = os.path.join(tmp, "handbook.pdf")
+        pages = [page_text(i) for i in range(args.pages)]
+        write_pdf(path, pages)
+        first, first_s = run("initial", server, path, {})
+
+        # Revise a few pages spread through the document
+        for i in range(args.edited):
+            page = (i * args.pages) // max(1, args.edited)
+            pages[page] = page_text(page, seed=1)
+        write_pdf(path, pages)
+        _, revised_s = run("revision", server, path, first["changed"])
+
+    shutdown_loader_pool()
+    print(f"✓ Re-upload of a {args.edited}-page revision: {first_s / revised_s:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--edited", type=int, default=3)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--upsert-latency", type=float, default=0.02)
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+End-to-end ingestion benchmark: the old batch path (load every page, split every
+chunk, then embed + upsert) vs the streaming generator pipeline used by
+app.ingest.ingestor, on a generated PDF against the local fake embedding /
+vector server in benchmarks/fake_services.py.
+
+Reports wall time and peak Python heap (tracemalloc) for each path.
+
+Usage:
+    python benchmarks/ingest_stream.py --pages 400
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingest import ingestor
+from app.ingest.loader import load_pdf, shutdown_loader_pool
+from app.ingest.splitter import split_documents
+from app.ingest.vectorstore import vectorstore_manager
+from app.ingest.writer import VectorWriter
+from benchmarks.fake_services import FakeEmbeddings, FakeIndex, FakeServiceConfig, FakeServiceServer
+from benchmarks.pdf_fixtures import make_handbook
+
+
+def batch_ingest(file_path, embeddings, index):
+    documents = load_pdf(file_path)
+    chunks = split_documents(documents)
+    for chunk in chunks:
+        chunk.metadata["document_name"] = "bench.pdf"
+        chunk.metadata["org_id"] = "bench"
+
+    VectorWriter(embeddings, index).write(
+        (f"batch-{number}", chunk.page_content, {**chunk.metadata, "text": chunk.page_content})
+        for number, chunk in enumerate(chunks)
+    )
+    return {"pages": len(documents), "chunks_created": len(chunks)}
+
+
+def stream_ingest(file_path, embeddings, index):
+    return ingestor.ingest_pdf("bench", "bench.pdf", file_path)
+
+
+def measure(name, func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<9} {result['pages']} pages / {result['chunks_created']} chunks  "
+          f"{elapsed:.2f}s  peak heap {peak / 2**20:.1f} MiB")
+    return elapsed, peak
+
+
+def main(args):
+    config = FakeServiceConfig(embed_latency=args.embed_latency, upsert_latency=args.upsert_latency)
+
+    with tempfile.TemporaryDirectory() as tmp, FakeServiceServer(config) as server:
+        path = os.path.join(tmp, "handbook.pdf")
+        make_handbook(path, args.pages)
+
+        embeddings, index = FakeEmbeddings(server.url), FakeIndex(server.url)
+        # The streaming path goes through the shared manager; point it at the fakes
+        vectorstore_manager.embeddings = embeddings
+        vectorstore_manager.index = index
+        vectorstore_manager.startup = lambda: None
+
+        batch_s, batch_peak = measure("batch", batch_ingest, path, embeddings, index)
+        stream_s, stream_peak = measure("streaming", stream_ingest, path, embeddings, index)
+
+    shutdown_loader_pool()
+    print(f"✓ Streaming: {batch_s / stream_s:.2f}x faster, {batch_peak / stream_peak:.1f}x lower peak heap")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--upsert-latency", type=float, default=0.02)
+    main(parser.parse_args())
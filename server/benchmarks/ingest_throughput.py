@@ -0,0 +1,69 @@
+"""
+Ingestion write throughput benchmark (chunks/sec) against the local fake
+embedding / vector server in benchmarks/fake_services.py.
+
+Compares a serial embed -> upsert loop (one batch at a time) with the default
+VectorWriter settings from config.py.
+
+Usage:
+    python benchmarks/ingest_throughput.py --chunks 3000 --error-rate 0.02
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingest.writer import VectorWriter
+from benchmarks.fake_services import FakeEmbeddings, FakeIndex, FakeServiceConfig, FakeServiceServer
+
+
+def make_records(n):
+    text = "Employees accrue paid time off monthly. " * 12
+    return [
+        (f"bench-{i}", text, {"org_id": "bench", "document_name": "bench.pdf", "page": i // 6, "text": text})
+        for i in range(n)
+    ]
+
+
+def run(name, server, writer_kwargs, records):
+    writer = VectorWriter(FakeEmbeddings(server.url), FakeIndex(server.url), retry_backoff=0.05, **writer_kwargs)
+
+    start = time.perf_counter()
+    counts = writer.write(iter(records))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<10} {counts['vectors_upserted']} vectors in {elapsed:.2f}s  "
+        f"→ {counts['vectors_upserted'] / elapsed:.0f} chunks/sec"
+    )
+    return counts["vectors_upserted"] / elapsed
+
+
+def main(args):
+    config = FakeServiceConfig(
+        embed_latency=args.embed_latency,
+        upsert_latency=args.upsert_latency,
+        error_rate=args.error_rate
+    )
+    records = make_records(args.chunks)
+
+    print(f"{args.chunks} chunks, embed={args.embed_latency}s/call upsert={args.upsert_latency}s/call "
+          f"error_rate={args.error_rate}")
+
+    with FakeServiceServer(config) as server:
+        serial = run("serial", server, {"embed_concurrency": 1, "upsert_concurrency": 1}, records)
+        pipelined = run("pipelined", server, {}, records)
+        print(f"  server stats: {server.stats}")
+
+    print(f"✓ Speedup: {pipelined / serial:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=3000)
+    parser.add_argument("--embed-latency", type=float, default=0.15)
+    parser.add_argument("--upsert-latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    main(parser.parse_args())
@@ -0,0 +1,78 @@
+"""
+BM25 lexical index benchmark (app.rag.lexical) on synthetic policy-like chunks.
+
+For each corpus size, reports build time, index size and p50/p99 query latency
+against the LEXICAL_BUDGET_MS deadline hybrid retrieval gives the lexical side,
+and checks that an exact rare term (a form number) ranks its chunk first.
+
+Usage:
+    python benchmarks/lexical_search.py --sizes 10000 100000 --queries 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rag.lexical import BM25Index
+from config import HYBRID_CANDIDATES, LEXICAL_BUDGET_MS
+
+VOCABULARY_SIZE = 20000
+CHUNK_WORDS = 90  # ~500 characters, the ingestion chunk size
+
+
+def make_corpus(size, rng):
+    # Zipf-distributed words, like natural text: a few very common terms, a long tail
+    words = np.array([f"w{i}" for i in range(VOCABULARY_SIZE)])
+    ranks = np.minimum(rng.zipf(1.3, size=(size, CHUNK_WORDS)) - 1, VOCABULARY_SIZE - 1)
+    entries = [
+        {"_id": f"c{row}", "text": " ".join(words[ranks[row]]), "document_name": f"doc{row // 200}.pdf", "page": row % 50}
+        for row in range(size)
+    ]
+    needle = int(rng.integers(0, size))
+    entries[needle]["text"] += " Submit form HR-102 to claim per diem."
+    return entries, words, needle
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    print(f"k={HYBRID_CANDIDATES} queries={args.queries} budget={LEXICAL_BUDGET_MS}ms")
+
+    for size in args.sizes:
+        entries, words, needle = make_corpus(size, rng)
+
+        start = time.perf_counter()
+        index = BM25Index(entries)
+        build = time.perf_counter() - start
+
+        # Queries mix common and rare terms, 3-8 words each
+        queries = [
+            " ".join(words[np.minimum(rng.zipf(1.3, size=rng.integers(3, 9)) - 1, VOCABULARY_SIZE - 1)])
+            for _ in range(args.queries)
+        ]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, HYBRID_CANDIDATES)
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1000
+
+        top = index.search("what is form HR-102", 1)
+        found = bool(top) and top[0][0].id == entries[needle]["_id"]
+
+        print(f"\n{size} chunks (built in {build:.1f}s, {index.nbytes() / 2 ** 20:.1f} MiB postings, {len(index.vocabulary)} terms)")
+        print(f"  p50={np.percentile(latencies, 50):6.2f}ms  p99={np.percentile(latencies, 99):6.2f}ms  "
+              f"over budget={np.mean(latencies > LEXICAL_BUDGET_MS):.1%}")
+        print(f"  {'✓' if found else '✗'} exact term \"HR-102\" ranked first")
+
+    print("\n✓ Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    main(parser.parse_args())
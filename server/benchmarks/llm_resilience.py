@@ -0,0 +1,106 @@
+"""
+LLM client resilience benchmark against the fake LLM server.
+
+Runs concurrent chat completions through app.rag.llm.LLMClient while the
+fake provider is healthy, flaky (injected 503s), slow (latency past the
+per-attempt timeout), down, and recovering, and reports success rate, p50/p99
+latency, retries and circuit-breaker behaviour for each phase. Also compares
+the shared keep-alive pool against a fresh client per request.
+
+Usage:
+    python benchmarks/llm_resilience.py --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rag.llm import CircuitBreaker, LLMClient, LLMUnavailableError
+from benchmarks.fake_llm import FakeLLMConfig, FakeLLMServer
+
+
+async def run_phase(make_client, requests, concurrency, stream=False):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, outcomes = [], {"ok": 0, "unavailable": 0, "error": 0}
+
+    async def one():
+        async with semaphore:
+            client, owned = make_client()
+            start = time.perf_counter()
+            try:
+                if stream:
+                    tokens = [token async for token in client.stream("question")]
+                    assert tokens
+                else:
+                    await client.complete("question")
+                outcomes["ok"] += 1
+            except LLMUnavailableError:
+                outcomes["unavailable"] += 1
+            except Exception:
+                outcomes["error"] += 1
+            latencies.append(time.perf_counter() - start)
+            if owned:
+                await client.close()
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    latencies = np.array(latencies) * 1000
+    return outcomes, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def report(name, outcomes, p50, p99, client=None):
+    line = f"  {name:<28} ok={outcomes['ok']:<4} unavailable={outcomes['unavailable']:<4} error={outcomes['error']:<3} p50={p50:7.1f}ms p99={p99:7.1f}ms"
+    if client is not None:
+        stats = client.stats()
+        line += f"  retries={stats['retries']} rejected={stats['rejected']} breaker={stats['breaker']}"
+    print(line)
+
+
+async def main(args):
+    config = FakeLLMConfig(latency=0.05, token_delay=0.002)
+    with FakeLLMServer(config) as server:
+        def shared_client(**kwargs):
+            options = {"base_url": server.url, "api_key": "fake", "timeout": 1.0, "deadline": 3.0, "retry_backoff": 0.1}
+            options.update(kwargs)
+            return LLMClient(**options)
+
+        print(f"requests={args.requests} concurrency={args.concurrency}\n")
+        print("Connection reuse (healthy provider):")
+        client = shared_client()
+        report("shared pool", *await run_phase(lambda: (client, False), args.requests, args.concurrency))
+        report("shared pool, streaming", *await run_phase(lambda: (client, False), args.requests, args.concurrency, stream=True))
+        report("new client per request", *await run_phase(lambda: (shared_client(), True), args.requests, args.concurrency))
+        await client.close()
+
+        print("\nFailure modes:")
+        phases = [
+            ("flaky (20% 503)", {"error_rate": 0.2}),
+            ("slow (2s > 1s timeout)", {"latency": 2.0, "error_rate": 0.0}),
+            ("down (100% 503)", {"latency": 0.05, "error_rate": 1.0}),
+            ("recovered", {"error_rate": 0.0})
+        ]
+        client = shared_client(breaker=CircuitBreaker(reset_timeout=1.0))
+        for name, changes in phases:
+            for key, value in changes.items():
+                setattr(config, key, value)
+            if name == "recovered":
+                # Once the open circuit reaches its probe window, one call decides whether it closes
+                await asyncio.sleep(1.1)
+                report("recovery probe", *await run_phase(lambda: (client, False), 1, 1), client=client)
+            requests = args.requests if name != "slow (2s > 1s timeout)" else args.concurrency
+            report(name, *await run_phase(lambda: (client, False), requests, args.concurrency), client=client)
+        await client.close()
+
+        print(f"\nProvider saw {server.stats['requests']} requests ({server.stats['errors']} injected errors)")
+    print("\n✓ Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
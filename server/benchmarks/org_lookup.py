@@ -0,0 +1,85 @@
+"""
+Organization listing benchmark: one find_one per membership (N+1) vs a
+single batched $in lookup (app.db.lookups.find_by_ids).
+
+Runs both against a fake organizations collection with a fixed per-round-trip
+latency, for users in a growing number of organizations, and reports the
+MongoDB round trips and wall time each approach needs.
+
+Usage:
+    python benchmarks/org_lookup.py --memberships 1 10 50 200 --mongo-latency 0.002
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from bson.objectid import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.lookups import find_by_ids
+
+
+class FakeOrganizationsCollection:
+    """find_one / find($in) with a fixed round-trip latency."""
+
+    def __init__(self, documents, latency):
+        self.documents = {doc["_id"]: doc for doc in documents}
+        self.latency = latency
+        self.round_trips = 0
+
+    async def find_one(self, query):
+        await asyncio.sleep(self.latency)
+        self.round_trips += 1
+        return self.documents.get(query["_id"])
+
+    def find(self, query, projection=None):
+        async def cursor():
+            # One batch is enough for these sizes
+            await asyncio.sleep(self.latency)
+            self.round_trips += 1
+            for value in query["_id"]["$in"]:
+                if value in self.documents:
+                    yield self.documents[value]
+        return cursor()
+
+
+async def n_plus_one(collection, roles):
+    orgs = []
+    for role in roles:
+        org = await collection.find_one({"_id": ObjectId(role["org_id"])})
+        if org:
+            orgs.append(org)
+    return orgs
+
+
+async def batched(collection, roles):
+    orgs = await find_by_ids(collection, (role["org_id"] for role in roles))
+    return [orgs[role["org_id"]] for role in roles if role["org_id"] in orgs]
+
+
+async def main(args):
+    print(f"mongo latency={args.mongo_latency * 1000:.1f}ms\n")
+    for memberships in args.memberships:
+        documents = [{"_id": ObjectId(), "name": f"org {i}", "code": f"C{i:05d}"} for i in range(memberships)]
+        roles = [{"org_id": str(doc["_id"]), "role": "employee"} for doc in documents]
+        line = f"  memberships={memberships:<5}"
+        for name, lookup in (("find_one per org", n_plus_one), ("batched $in", batched)):
+            collection = FakeOrganizationsCollection(documents, args.mongo_latency)
+            start = time.perf_counter()
+            orgs = await lookup(collection, roles)
+            elapsed = (time.perf_counter() - start) * 1000
+            assert len(orgs) == memberships
+            line += f"  {name}: round trips={collection.round_trips:<4} {elapsed:8.1f}ms"
+        print(line)
+
+    print("\n✓ Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memberships", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--mongo-latency", type=float, default=0.002, help="Seconds per MongoDB round trip")
+    asyncio.run(main(parser.parse_args()))
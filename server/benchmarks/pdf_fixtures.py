@@ -0,0 +1,63 @@
+"""
+Generate synthetic text PDFs for ingestion benchmarks (no extra dependencies).
+"""
+import random
+
+_WORDS = (
+    "employee policy leave travel expense reimbursement manager approval remote work "
+    "per diem PTO benefits insurance holiday overtime compliance security laptop "
+    "onboarding training handbook section form request days annual notice"
+).split()
+
+
+def _escape(text: str) -> bytes:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1")
+
+
+def page_text(page_number: int, words: int = 450, seed: int = 0) -> str:
+    rng = random.Random(seed * 100003 + page_number)
+    return f"Section {page_number + 1}. " + " ".join(rng.choice(_WORDS) for _ in range(words)) + "."
+
+
+def write_pdf(path: str, pages: list):
+    """Write a PDF with one page per string in `pages` (Helvetica, ~90 chars per line)."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    # Page objects reference the Pages node, which is written after them
+    pages_id = 1 + 2 * len(pages) + 1
+
+    page_ids = []
+    for text in pages:
+        lines = [text[i:i + 90] for i in range(0, len(text), 90)]
+        content = b"BT /F1 9 Tf 40 760 Td 11 TL " + b" ".join(b"(" + _escape(line) + b") '" for line in lines) + b" ET"
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content_id, font_id)
+        ))
+
+    add(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids) + b"] /Count %d >>" % len(page_ids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref)
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def make_handbook(path: str, n_pages: int, seed: int = 0):
+    write_pdf(path, [page_text(i, seed=seed) for i in range(n_pages)])
@@ -0,0 +1,92 @@
+"""
+Query log write path benchmark: awaited insert_one per chat vs the
+write-behind buffer in app.db.query_log.
+
+Simulates chats arriving at a steady rate against a fake queries collection
+with a fixed per-operation latency, and reports the logging time each chat
+waits for, the MongoDB write operations issued per second, and whether every
+entry was written after shutdown.
+
+Usage:
+    python benchmarks/query_log.py --rate 500 --seconds 5 --mongo-latency 0.01
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.query_log import QueryLogBuffer
+
+
+class FakeQueriesCollection:
+    """insert_one / insert_many with a fixed round-trip latency."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.operations = 0
+        self.documents = 0
+
+    async def insert_one(self, document):
+        await asyncio.sleep(self.latency)
+        self.operations += 1
+        self.documents += 1
+
+    async def insert_many(self, documents, ordered=True):
+        await asyncio.sleep(self.latency)
+        self.operations += 1
+        self.documents += len(documents)
+
+
+async def run(args, log):
+    waits = []
+    interval = 1.0 / args.rate
+
+    async def chat(i):
+        start = time.perf_counter()
+        await log({"org_id": "bench", "question": f"question {i}", "answer": "answer", "timestamp": time.time()})
+        waits.append(time.perf_counter() - start)
+
+    tasks = []
+    started = time.perf_counter()
+    for i in range(int(args.rate * args.seconds)):
+        tasks.append(asyncio.create_task(chat(i)))
+        await asyncio.sleep(max(0.0, started + (i + 1) * interval - time.perf_counter()))
+    await asyncio.gather(*tasks)
+    return np.array(waits) * 1000, time.perf_counter() - started
+
+
+async def main(args):
+    total = int(args.rate * args.seconds)
+    print(f"rate={args.rate}/s seconds={args.seconds} mongo latency={args.mongo_latency * 1000:.0f}ms\n")
+
+    collection = FakeQueriesCollection(args.mongo_latency)
+    waits, elapsed = await run(args, collection.insert_one)
+    print(f"  insert_one per chat  wait p50={np.percentile(waits, 50):7.3f}ms p99={np.percentile(waits, 99):7.3f}ms  "
+          f"ops/s={collection.operations / elapsed:7.1f}  written={collection.documents}/{total}")
+
+    collection = FakeQueriesCollection(args.mongo_latency)
+
+    async def fake_collection():
+        return collection
+
+    buffer = QueryLogBuffer(get_collection=fake_collection)
+    await buffer.start()
+    waits, elapsed = await run(args, buffer.log)
+    await buffer.stop()
+    print(f"  write-behind buffer  wait p50={np.percentile(waits, 50):7.3f}ms p99={np.percentile(waits, 99):7.3f}ms  "
+          f"ops/s={collection.operations / elapsed:7.1f}  written={collection.documents}/{total}  dropped={buffer.dropped}")
+
+    print("\n✓ Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=int, default=500, help="Chats per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--mongo-latency", type=float, default=0.01, help="Seconds per MongoDB operation")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+"""
+Query analytics benchmark: summarizing raw query logs vs merging the hourly
+and daily rollups in app.db.rollups.
+
+For growing query histories (spread evenly over --days days), reports the
+documents read and the time to compute a range summary (counts, unanswered
+rate, latency percentiles, top terms) from the raw entries and from the daily
+buckets, and how far the rollup latency percentiles are from the exact ones.
+
+Usage:
+    python benchmarks/query_rollups.py --history 10000 100000 1000000 --days 90
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.rollups import RollupBucket
+
+QUESTIONS = ["How many vacation days do I get?", "What is the parental leave policy?",
+             "Who approves expense reports?", "Can I work remotely on Fridays?",
+             "How do I request a parking permit?", "What is the travel per diem?"]
+
+
+def make_queries(count, days):
+    random.seed(0)
+    start = datetime(2026, 1, 1)
+    return [{
+        "org_id": "bench",
+        "question": random.choice(QUESTIONS),
+        "has_answer": random.random() > 0.1,
+        "latency_ms": random.lognormvariate(6.5, 0.6),
+        "timestamp": start + timedelta(seconds=random.randrange(days * 86400))
+    } for _ in range(count)]
+
+
+def summarize(documents, add):
+    bucket = RollupBucket()
+    for document in documents:
+        add(bucket, document)
+    return bucket.document()
+
+
+def main(args):
+    print(f"days={args.days}\n")
+    for history in args.history:
+        queries = make_queries(history, args.days)
+
+        start = time.perf_counter()
+        raw = summarize(queries, RollupBucket.add_entry)
+        raw_ms = (time.perf_counter() - start) * 1000
+
+        # What the rollup task stores: hourly buckets, then daily merges of them
+        hours = defaultdict(RollupBucket)
+        for entry in queries:
+            hours[entry["timestamp"].replace(minute=0, second=0, microsecond=0)].add_entry(entry)
+        days = defaultdict(RollupBucket)
+        for hour, bucket in hours.items():
+            days[hour.date()].merge(bucket.document())
+        daily = [bucket.document() for bucket in days.values()]
+
+        start = time.perf_counter()
+        rolled = summarize(daily, RollupBucket.merge)
+        rolled_ms = (time.perf_counter() - start) * 1000
+
+        exact = np.percentile([q["latency_ms"] for q in queries], [50, 95, 99])
+        error = max(abs(rolled["latency_ms"][f"p{p}"] - e) / e for p, e in zip((50, 95, 99), exact))
+        assert rolled["count"] == raw["count"] == history
+        print(f"  history={history:<8} raw: reads={history:<8} {raw_ms:8.1f}ms   "
+              f"rollups: reads={len(daily):<4} {rolled_ms:6.2f}ms   "
+              f"latency percentile error={error * 100:4.1f}%  "
+              f"rollup p50/p95/p99={rolled['latency_ms']['p50']}/{rolled['latency_ms']['p95']}/{rolled['latency_ms']['p99']}ms")
+
+    print("\n✓ Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--days", type=int, default=90, help="Days the history is spread over")
+    main(parser.parse_args())
@@ -0,0 +1,92 @@
+"""
+Local vector backend search benchmark: exact (brute-force) vs IVF + PQ search
+in app.ingest.local_index, on clustered synthetic embeddings.
+
+For each corpus size, reports build time, recall@k of the ANN results against
+exact search, and p50/p99 query latency, for several nprobe settings.
+
+Usage:
+    python benchmarks/vector_search.py --sizes 20000 100000 --dim 256 --nprobe 4 16 64
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingest.local_index import LocalVectorBackend
+from config import LOCAL_ANN_PQ_M, LOCAL_ANN_RERANK
+
+
+def make_corpus(n, dim, clusters, rng):
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    return centers[rng.integers(0, clusters, n)] + rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def run_queries(backend, queries, k, **options):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        matches = backend.similarity_search_by_vector_with_score(query.tolist(), k=k, namespace="bench", **options)
+        latencies.append(time.perf_counter() - start)
+        results.append({document.id for document, _ in matches})
+    latencies = np.array(latencies) * 1000
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    print(f"dim={args.dim} k={args.k} queries={args.queries} pq_m={args.m} rerank={args.rerank}")
+
+    for size in args.sizes:
+        vectors = make_corpus(size, args.dim, max(16, size // 500), rng)
+        queries = vectors[rng.integers(0, size, args.queries)] + 0.3 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = LocalVectorBackend(tmp, args.dim, ann_settings={
+                "min_vectors": min(args.min_vectors, size),
+                "nlist": 0,
+                "m": args.m,
+                "nprobe": args.nprobe[0],
+                "rerank": args.rerank,
+                "retrain_growth": 4
+            })
+
+            start = time.perf_counter()
+            # Inserted incrementally, as ingestion does (the index trains at min_vectors)
+            for offset in range(0, size, args.batch):
+                backend.upsert([
+                    {"id": f"v{i}", "values": vectors[i].tolist(), "metadata": {"org_id": "bench", "text": ""}}
+                    for i in range(offset, min(offset + args.batch, size))
+                ], namespace="bench")
+            build_s = time.perf_counter() - start
+
+            exact, exact_p50, exact_p99 = run_queries(backend, queries, args.k, exact=True)
+            print(f"\n{size} vectors (built in {build_s:.1f}s)")
+            print(f"  exact        recall=1.000  p50={exact_p50:6.2f}ms  p99={exact_p99:6.2f}ms")
+
+            for nprobe in args.nprobe:
+                approximate, p50, p99 = run_queries(backend, queries, args.k, nprobe=nprobe)
+                recall = np.mean([len(a & e) / args.k for a, e in zip(approximate, exact)])
+                print(f"  nprobe={nprobe:<5} recall={recall:.3f}  p50={p50:6.2f}ms  p99={p99:6.2f}ms  "
+                      f"({exact_p50 / p50:.1f}x faster)")
+
+    print("\n✓ Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--m", type=int, default=LOCAL_ANN_PQ_M, help="PQ sub-quantizers")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--rerank", type=int, default=LOCAL_ANN_RERANK)
+    parser.add_argument("--min-vectors", type=int, default=10000, help="Vectors before the ANN index trains")
+    parser.add_argument("--batch", type=int, default=1000)
+    main(parser.parse_args())
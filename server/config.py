@@ -4,10 +4,92 @@ import os
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_ENV = os.getenv("PINECONE_ENV")
 PINECONE_INDEX_NAME = "rulebook-ai"
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "8"))  # Shared HTTP connection pool size
+# "shared": every org in the default namespace, isolated by an org_id filter
+# "per_org": one namespace per org (run migrate_namespaces.py before switching)
+PINECONE_NAMESPACE_MODE = os.getenv("PINECONE_NAMESPACE_MODE", "shared")
+
+# Vector Backend
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")  # "pinecone" or "local" (in-process, on disk; single worker only)
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "vector_index")  # One subdirectory per org namespace
+LOCAL_INDEX_COMPACT_RATIO = 0.3  # Compact a local namespace once this fraction of its rows are deleted
+# Local ANN (IVF + PQ): recall/latency knobs for large local namespaces
+LOCAL_ANN_ENABLED = os.getenv("LOCAL_ANN_ENABLED", "true").lower() == "true"
+LOCAL_ANN_MIN_VECTORS = int(os.getenv("LOCAL_ANN_MIN_VECTORS", "50000"))  # Exact search below this many vectors
+LOCAL_ANN_NLIST = int(os.getenv("LOCAL_ANN_NLIST", "0"))  # Coarse clusters; 0 = 4 * sqrt(vectors at training)
+LOCAL_ANN_PQ_M = 64  # PQ sub-quantizers (bytes per vector); must divide EMBEDDING_DIMENSION
+LOCAL_ANN_NPROBE = int(os.getenv("LOCAL_ANN_NPROBE", "16"))  # Clusters scanned per query (higher = better recall)
+LOCAL_ANN_RERANK = int(os.getenv("LOCAL_ANN_RERANK", "10"))  # k * this PQ candidates re-scored exactly
+LOCAL_ANN_RETRAIN_GROWTH = 4  # Retrain once a namespace is this many times its training size
+
+# Embeddings
+EMBEDDING_MODEL = "embed-english-v3.0"
+EMBEDDING_DIMENSION = 1024  # Cohere embed-english-v3.0 dimension
 
 # LLM APIs
 CEREBRAS_API_KEY = os.getenv("CEREBRAS_API_KEY")
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
+LLM_MODEL = "llama-3.3-70b"
+
+# LLM Client
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")  # None = Cerebras API (set for a proxy or the benchmark fake)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))  # Seconds per attempt
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "45"))  # Seconds per call, across all attempts
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))  # Retries of transient errors (429, 5xx, timeouts)
+LLM_RETRY_BACKOFF = 0.5  # Seconds; doubled on each retry, with jitter
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))  # Keep-alive pool size
+LLM_BREAKER_FAILURE_RATE = 0.5  # Share of recent calls failing that opens the circuit
+LLM_BREAKER_WINDOW = 20  # Recent calls the failure rate is measured over
+LLM_BREAKER_RESET = 30  # Seconds the circuit stays open before a probe call
+
+# RAG Pipeline
+RETRIEVAL_K = 3
+RAG_EXECUTOR_WORKERS = int(os.getenv("RAG_EXECUTOR_WORKERS", "32"))  # Threads for blocking SDK calls
+
+# Hybrid Retrieval (BM25 + dense, merged by reciprocal rank fusion)
+HYBRID_RETRIEVAL_ENABLED = os.getenv("HYBRID_RETRIEVAL_ENABLED", "true").lower() == "true"
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # Results taken from each retriever before fusion
+HYBRID_RRF_K = 60  # Reciprocal rank fusion constant: score = sum(1 / (HYBRID_RRF_K + rank))
+LEXICAL_BUDGET_MS = int(os.getenv("LEXICAL_BUDGET_MS", "50"))  # Lexical results arriving later are dropped
+LEXICAL_INDEX_MAX_ORGS = int(os.getenv("LEXICAL_INDEX_MAX_ORGS", "256"))  # Per-org BM25 indexes kept in memory
+BM25_K1 = 1.2  # Term-frequency saturation
+BM25_B = 0.75  # Document-length normalization
+
+# Reranking (second stage: best RETRIEVAL_K of RERANK_CANDIDATES go to the prompt)
+RERANKER = os.getenv("RERANKER", "cohere")  # "cohere", "local" (cross-encoder) or "none"
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))  # First-stage chunks scored by the reranker
+RERANK_MODEL = "rerank-english-v3.0"
+LOCAL_RERANK_MODEL = os.getenv("LOCAL_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))  # Candidates per scoring call; batches run concurrently
+RERANK_BUDGET_MS = int(os.getenv("RERANK_BUDGET_MS", "300"))  # Past this, the first-stage order is used
+
+# Prompt Context
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))  # Max context tokens sent to the LLM
+CONTEXT_CHARS_PER_TOKEN = 4  # Token estimate for English text
+
+# Query Embedding Cache
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "10000"))  # In-memory LRU entries
+QUERY_EMBEDDING_CACHE_TTL = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", str(24 * 3600)))  # Seconds
+QUERY_EMBEDDING_CACHE_SHARED = os.getenv("QUERY_EMBEDDING_CACHE_SHARED", "false").lower() == "true"  # Share via MongoDB
+
+# Answer Cache
+ANSWER_CACHE_SIZE_PER_ORG = int(os.getenv("ANSWER_CACHE_SIZE_PER_ORG", "500"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))  # Seconds
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))  # Cosine threshold for near-duplicates
+ANSWER_CACHE_VERSION_CHECK_INTERVAL = 5  # Seconds between corpus version checks per org
+
+# Query Log (write-behind buffer for chat query logs)
+QUERY_LOG_BATCH_SIZE = int(os.getenv("QUERY_LOG_BATCH_SIZE", "500"))  # Entries per insert_many
+QUERY_LOG_FLUSH_INTERVAL = float(os.getenv("QUERY_LOG_FLUSH_INTERVAL", "1.0"))  # Max seconds an entry waits
+QUERY_LOG_MAX_PENDING = int(os.getenv("QUERY_LOG_MAX_PENDING", "20000"))  # Buffer cap; entries past it are dropped
+QUERY_LOG_BACKPRESSURE_TIMEOUT = 0.05  # Seconds a chat waits for buffer room before dropping its log
+
+# Query Rollups (hourly/daily analytics buckets) and raw query retention
+QUERY_ROLLUP_INTERVAL = float(os.getenv("QUERY_ROLLUP_INTERVAL", "300"))  # Seconds between rollup runs
+QUERY_ROLLUP_GRACE = 300  # Seconds after an hour ends before its bucket is considered final
+QUERY_ROLLUP_TOP_TERMS = 50  # Terms kept per bucket
+QUERY_RETENTION_DAYS = int(os.getenv("QUERY_RETENTION_DAYS", "90"))  # TTL for raw query logs; 0 keeps them forever
+HOURLY_ROLLUP_RETENTION_DAYS = int(os.getenv("HOURLY_ROLLUP_RETENTION_DAYS", "90"))  # Daily buckets are kept forever
 
 # MongoDB Configuration
 MONGODB_URI = os.getenv(
@@ -22,9 +104,29 @@ FIREBASE_CREDENTIALS_PATH = os.path.join(
     "app/docg-9a14e-firebase-adminsdk-fbsvc-891e32e2b7.json"
 )
 
+# Token Verification
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))  # Verified ID tokens kept until their exp
+SIGNING_KEY_REFRESH_INTERVAL = 3600  # Seconds between background refreshes of Google's signing certs
+
+# Membership Cache
+MEMBERSHIP_CACHE_TTL = int(os.getenv("MEMBERSHIP_CACHE_TTL", "30"))  # Seconds a cached user/org_roles lookup stays valid
+
 # Document Processing
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))  # Processes for page-level parsing
+PDF_PARALLEL_MIN_PAGES = 32  # Smaller PDFs are parsed in-process
+PDF_PAGE_RANGE_MAX = 16  # Pages per parser task
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 100
+EMBED_BATCH_SIZE = 96  # Cohere embed accepts at most 96 texts per call
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))  # Embed batches in flight per document
+UPSERT_BATCH_SIZE = 100  # Pinecone recommends <= 100 vectors per upsert request
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "4"))  # Upsert requests in flight per document
+INGEST_MAX_RETRIES = 4
+INGEST_RETRY_BACKOFF = 0.5  # Seconds; doubled on each retry, with jitter
+INGEST_PREFETCH_CHUNKS = 512  # Chunks parsed ahead of the embedder (bounds ingestion memory)
+
+# Ingestion Jobs
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))  # Concurrent background ingestion jobs
 
 # Upload Configuration
 UPLOAD_DIR = "uploads"
@@ -0,0 +1,171 @@
+"""
+Garbage-collect orphaned vectors in the Pinecone index.
+
+A vector is live if its ID is in the chunk registry and its document still
+exists, or, for documents ingested before the chunk registry, if its
+org_id/document_name metadata matches an existing document that has no
+registered chunks. It must also sit in its org's namespace for the current
+PINECONE_NAMESPACE_MODE. Everything else (vectors of deleted documents, the
+pre-registry vectors of re-uploaded documents, copies left behind by
+migrate_namespaces.py) is an orphan. Every namespace in the index is scanned.
+
+The GC must not race ingestion: a job registers its chunks and writes the
+document record only after every vector is upserted, so until then its new
+vectors look orphaned. Documents with a queued or running ingest job are
+therefore skipped (checked again just before deleting), and unregistered
+vectors younger than --min-age seconds (ingested_at metadata) are left alone.
+Prefer running it when no uploads are in progress.
+
+With VECTOR_BACKEND=local, stop the server first: the local index is
+single-process and refuses to open while the server holds it.
+
+Dry run by default; pass --apply to delete.
+
+Usage:
+    python gc_vectors.py [--apply] [--prefix ORG_ID#] [--min-age 3600]
+"""
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.db.mongodb import get_chunks_collection, get_documents_collection, get_jobs_collection, close_mongodb_connection
+from app.ingest.jobs import JobStatus
+from app.ingest.vectorstore import namespace_for, vectorstore_manager
+from app.ingest.writer import VectorWriter
+
+FETCH_BATCH_SIZE = 100
+# Unregistered vectors younger than this may belong to a job still upserting
+DEFAULT_MIN_AGE = 3600
+
+
+async def _document_states(documents_collection, chunks_collection, keys: set) -> dict:
+    """(org_id, document_name) -> "registered" | "legacy" | None (document gone)."""
+    states = {}
+    for org_id, document_name in keys:
+        exists = await documents_collection.find_one({"org_id": org_id, "filename": document_name}, {"_id": 1})
+        if not exists:
+            states[(org_id, document_name)] = None
+            continue
+        registered = await chunks_collection.find_one({"org_id": org_id, "document_name": document_name}, {"_id": 1})
+        states[(org_id, document_name)] = "registered" if registered else "legacy"
+    return states
+
+
+async def _active_ingestions() -> set:
+    """(org_id, document_name) of documents with a queued or running ingest job."""
+    jobs_collection = await get_jobs_collection()
+    cursor = jobs_collection.find(
+        {"status": {"$in": [JobStatus.QUEUED, JobStatus.RUNNING]}},
+        {"org_id": 1, "filename": 1}
+    )
+    return {(job["org_id"], job["filename"]) async for job in cursor}
+
+
+async def find_orphans(index, namespace: str = "", prefix: str = None, min_age: float = DEFAULT_MIN_AGE):
+    """
+    Scan one namespace. Returns (orphan vector IDs, registry IDs to drop,
+    vector ID -> (org_id, document_name) of the orphans): registry entries are
+    only dropped when their document is gone, not when the vector is merely a
+    copy in the wrong namespace.
+    """
+    active = await _active_ingestions()
+    cutoff = time.time() - min_age
+    documents_collection = await get_documents_collection()
+    chunks_collection = await get_chunks_collection()
+    states = {}
+    orphans = []
+    dead_registered = []
+    orphan_owners = {}
+    skipped = 0
+    scanned = 0
+
+    # index.list pages through vector IDs (serverless indexes)
+    for page in index.list(prefix=prefix, limit=FETCH_BATCH_SIZE, namespace=namespace):
+        ids = list(page)
+        scanned += len(ids)
+
+        registered = {
+            doc["_id"]: (doc["org_id"], doc["document_name"])
+            async for doc in chunks_collection.find({"_id": {"$in": ids}}, {"org_id": 1, "document_name": 1})
+        }
+        unregistered = [vector_id for vector_id in ids if vector_id not in registered]
+        fetched = await asyncio.to_thread(index.fetch, ids=unregistered, namespace=namespace) if unregistered else None
+
+        owners = dict(registered)
+        recent = set()
+        for vector_id in unregistered:
+            vector = fetched.vectors.get(vector_id) if fetched else None
+            metadata = (vector.metadata or {}) if vector else {}
+            owners[vector_id] = (metadata.get("org_id"), metadata.get("document_name"))
+            if metadata.get("ingested_at", 0) > cutoff:
+                recent.add(vector_id)
+
+        new_keys = {key for key in owners.values() if key not in states}
+        states.update(await _document_states(documents_collection, chunks_collection, new_keys))
+
+        for vector_id in ids:
+            if owners[vector_id] in active or vector_id in recent:
+                # Possibly an ingestion in flight
+                skipped += 1
+                continue
+            org_id = owners[vector_id][0]
+            expected = "registered" if vector_id in registered else "legacy"
+            if states.get(owners[vector_id]) != expected:
+                orphans.append(vector_id)
+                orphan_owners[vector_id] = owners[vector_id]
+                if vector_id in registered:
+                    dead_registered.append(vector_id)
+            elif (namespace_for(org_id) or "") != namespace:
+                orphans.append(vector_id)
+                orphan_owners[vector_id] = owners[vector_id]
+
+    print(f"Namespace '{namespace}': scanned {scanned} vectors, {len(orphans)} orphaned, "
+          f"{skipped} skipped (ingestion in progress or newer than {min_age:.0f}s)")
+    return orphans, dead_registered, orphan_owners
+
+
+async def collect_garbage(apply: bool, prefix: str = None, min_age: float = DEFAULT_MIN_AGE):
+    vectorstore_manager.startup()
+    index = vectorstore_manager.index
+    try:
+        stats = await asyncio.to_thread(index.describe_index_stats)
+        # The default namespace is reported as "" or "__default__" depending on API version
+        namespaces = {"" if name == "__default__" else name for name in (stats.get("namespaces") or {""})}
+        for namespace in sorted(namespaces):
+            orphans, dead_registered, orphan_owners = await find_orphans(index, namespace, prefix, min_age)
+            if not orphans:
+                continue
+
+            for vector_id in orphans[:10]:
+                print(f"  {vector_id}")
+            if len(orphans) > 10:
+                print(f"  ... and {len(orphans) - 10} more")
+
+            if apply:
+                # Uploads may have started since the scan
+                active = await _active_ingestions()
+                orphans = [vector_id for vector_id in orphans if orphan_owners[vector_id] not in active]
+                dead_registered = [vector_id for vector_id in dead_registered if orphan_owners[vector_id] not in active]
+                writer = VectorWriter(vectorstore_manager.embeddings, index, namespace=namespace)
+                deleted = await asyncio.to_thread(writer.delete, orphans)
+                chunks_collection = await get_chunks_collection()
+                await chunks_collection.delete_many({"_id": {"$in": dead_registered}})
+                print(f"✓ Deleted {deleted} orphaned vectors from namespace '{namespace}'")
+
+        if not apply:
+            print("Dry run; re-run with --apply to delete")
+    finally:
+        await close_mongodb_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Delete the orphans (default: report only)")
+    parser.add_argument("--prefix", help="Only scan vector IDs with this prefix, e.g. an org's '{org_id}#'")
+    parser.add_argument("--min-age", type=float, default=DEFAULT_MIN_AGE,
+                        help="Seconds an unregistered vector must have existed before it can be collected")
+    args = parser.parse_args()
+    asyncio.run(collect_garbage(args.apply, args.prefix, args.min_age))
@@ -0,0 +1,81 @@
+"""
+Move vectors from the shared default namespace into per-org namespaces.
+
+Copies every vector in the default namespace to its org's namespace (from its
+org_id metadata). Copies are idempotent, so the script can be re-run after an
+interruption. Vectors without an org_id are reported and left in place.
+
+Migration steps:
+    1. python migrate_namespaces.py --apply
+    2. set PINECONE_NAMESPACE_MODE=per_org and restart the server
+    3. python migrate_namespaces.py --apply --delete-source
+       (or python gc_vectors.py --apply, which removes the shared copies too)
+
+With VECTOR_BACKEND=local, stop the server first: the local index is
+single-process and refuses to open while the server holds it.
+
+Dry run by default.
+
+Usage:
+    python migrate_namespaces.py [--apply] [--delete-source]
+"""
+import argparse
+from collections import defaultdict
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.ingest.vectorstore import org_namespace, vectorstore_manager
+from app.ingest.writer import VectorWriter
+
+BATCH_SIZE = 100
+
+
+def migrate(apply: bool, delete_source: bool):
+    vectorstore_manager.startup()
+    index = vectorstore_manager.index
+    copied = defaultdict(int)
+    skipped = 0
+    migrated_ids = []
+
+    for page in index.list(limit=BATCH_SIZE, namespace=""):
+        ids = list(page)
+        fetched = index.fetch(ids=ids, namespace="")
+
+        by_org = defaultdict(list)
+        for vector_id, vector in fetched.vectors.items():
+            org_id = (vector.metadata or {}).get("org_id")
+            if not org_id:
+                skipped += 1
+                continue
+            by_org[org_id].append({"id": vector_id, "values": vector.values, "metadata": vector.metadata})
+
+        for org_id, vectors in by_org.items():
+            copied[org_id] += len(vectors)
+            if not apply:
+                continue
+
+            writer = VectorWriter(vectorstore_manager.embeddings, index, namespace=org_namespace(org_id))
+            writer.upsert_vectors(vectors)
+            migrated_ids.extend(vector["id"] for vector in vectors)
+
+    # Deleted after the scan: removing IDs mid-listing would shift the pagination
+    if apply and delete_source:
+        VectorWriter(vectorstore_manager.embeddings, index).delete(migrated_ids)
+
+    for org_id, count in sorted(copied.items()):
+        print(f"  {org_id} -> {org_namespace(org_id)}: {count} vectors")
+    print(f"{sum(copied.values())} vectors in {len(copied)} orgs, {skipped} without org_id (left in place)")
+
+    if not apply:
+        print("Dry run; re-run with --apply to copy")
+    else:
+        print(f"✓ Migration {'and source cleanup ' if delete_source else ''}complete")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Copy the vectors (default: report only)")
+    parser.add_argument("--delete-source", action="store_true", help="Delete each vector from the default namespace once copied")
+    args = parser.parse_args()
+    migrate(args.apply, args.delete_source)
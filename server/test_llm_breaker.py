@@ -0,0 +1,58 @@
+"""
+Circuit breaker tests for the shared LLM client (app/rag/llm.py).
+No provider is contacted: attempts are plain coroutines.
+"""
+import asyncio
+
+from app.rag.llm import CircuitBreaker, LLMClient, LLMUnavailableError
+
+
+def _half_open_client():
+    breaker = CircuitBreaker(failure_rate=0.5, window=2, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == "open"
+    return LLMClient(api_key="test", max_retries=0, breaker=breaker), breaker
+
+
+def test_cancelled_probe_releases_half_open_breaker():
+    """A probe cancelled mid-call must not leave the breaker rejecting every later call."""
+    async def scenario():
+        client, breaker = _half_open_client()
+
+        async def hang(timeout):
+            await asyncio.sleep(60)
+
+        probe = asyncio.create_task(client._with_resilience(hang, deadline=30))
+        await asyncio.sleep(0.01)
+        assert breaker.state == "half_open"
+        probe.cancel()
+        try:
+            await probe
+        except asyncio.CancelledError:
+            pass
+
+        async def answer(timeout):
+            return "ok"
+
+        # The next call becomes the probe and closes the breaker
+        assert await client._with_resilience(answer, deadline=30) == "ok"
+        assert breaker.state == "closed"
+        await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_half_open_allows_single_probe():
+    async def scenario():
+        client, breaker = _half_open_client()
+        assert breaker.allow()
+        try:
+            await client._with_resilience(lambda timeout: asyncio.sleep(0), deadline=30)
+            raise AssertionError("second call should be rejected while the probe is out")
+        except LLMUnavailableError:
+            pass
+        breaker.record_success()
+        assert breaker.state == "closed"
+        await client.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+"""
+Rerank stage tests (app/rag/rerank.py).
+No model or API is used: rerankers are small in-process stand-ins.
+"""
+import asyncio
+import threading
+
+from langchain_core.documents import Document
+
+from app.rag import rerank
+from app.rag.rerank import Reranker, RerankStage
+
+
+def _results(count):
+    return [(Document(page_content=f"chunk {i}"), 1.0 - i / 10) for i in range(count)]
+
+
+def test_reranker_is_built_once_off_the_event_loop(monkeypatch):
+    """Concurrent first requests share one build, run on the RAG thread pool."""
+    built_on = []
+
+    class SlowReranker(Reranker):
+        name = "slow"
+
+        def __init__(self):
+            built_on.append(threading.get_ident())
+
+        async def score(self, query, texts):
+            return [float(len(text)) for text in texts]
+
+    monkeypatch.setitem(rerank._RERANKERS, "slow", SlowReranker)
+
+    async def scenario():
+        stage = RerankStage(reranker_name="slow")
+        rerankers = await asyncio.gather(*(stage.get_reranker() for _ in range(5)))
+        return stage, rerankers, threading.get_ident()
+
+    stage, rerankers, loop_thread = asyncio.run(scenario())
+    assert len(built_on) == 1
+    assert built_on[0] != loop_thread
+    assert all(reranker is rerankers[0] for reranker in rerankers)
+
+
+def test_none_keeps_first_stage_order_and_scores():
+    async def scenario():
+        stage = RerankStage(reranker_name="none")
+        assert await stage.get_reranker() is None
+        return await stage.rerank("question", _results(4), k=2)
+
+    results = asyncio.run(scenario())
+    assert results == _results(4)[:2]